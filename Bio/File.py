@@ -17,7 +17,11 @@ use.
 
 from __future__ import print_function
 
+import array
+import bisect
 import codecs
+import heapq
+import mmap
 import os
 import sys
 import contextlib
@@ -30,6 +34,16 @@ try:
 except ImportError:
     from UserDict import DictMixin as _dict_base
 
+# Typecodes for 64 bit integer arrays
+try:
+    array.array("q")
+    _array_int64 = "q"
+    _array_uint64 = "Q"
+except ValueError:
+    # Python 2, where long is 64 bit except on Windows
+    _array_int64 = "l"
+    _array_uint64 = "L"
+
 try:
     from sqlite3 import dbapi2 as _sqlite
     from sqlite3 import IntegrityError as _IntegrityError
@@ -90,16 +104,31 @@ def as_handle(handleish, mode='r', **kwargs):
         yield handleish
 
 
-def _open_for_random_access(filename):
+def _open_for_random_access(filename, memory_map=False):
     """Open a file in binary mode, spot if it is BGZF format etc (PRIVATE).
 
     This functionality is used by the Bio.SeqIO and Bio.SearchIO index
     and index_db functions.
+
+    If memory_map is True, an uncompressed file is mapped into memory
+    (read only) and the mmap object is returned, which supports the same
+    seek, tell, read and readline methods without a system call for each
+    read. BGZF files cannot be memory mapped.
     """
     handle = open(filename, "rb")
     from . import bgzf
+    if memory_map and os.fstat(handle.fileno()).st_size:
+        # Note can't memory map an empty file, so treat as normal below
+        if handle.read(4) == bgzf._bgzf_magic:
+            handle.close()
+            raise ValueError("Cannot memory map BGZF compressed file %r"
+                             % filename)
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        handle.close()
+        return mapped
     try:
-        return bgzf.BgzfReader(mode="rb", fileobj=handle)
+        return bgzf.BgzfReader(mode="rb", fileobj=handle,
+                               gzi=filename + ".gzi")
     except ValueError as e:
         assert "BGZF" in str(e)
         # Not a BGZF file after all, rewind to start:
@@ -405,6 +434,34 @@ class _IndexedSeqFileDict(_dict_base):
         # Pass the offset to the proxy
         return self._proxy.get_raw(self._offsets[key])
 
+    def _offset(self, key):
+        """Return the file offset for the key (PRIVATE)."""
+        return self._offsets[key]
+
+    def get_many(self, keys):
+        """Iterate over the (key, record) pairs for the requested keys.
+
+        This is intended for extracting a large subset of the records.
+        All the keys are looked up first (so if any key is not found, a
+        KeyError exception is raised before any records are returned),
+        then the records are read in the order they appear in the file.
+        This means the records are not returned in the order requested,
+        so the key is given with each record. Any repeated keys are only
+        returned once.
+        """
+        offsets = sorted((self._offset(key), key) for key in set(keys))
+        proxy = self._proxy
+        key_function = self._key_function
+        for offset, key in offsets:
+            record = proxy.get(offset)
+            if key_function:
+                key2 = key_function(record.id)
+            else:
+                key2 = record.id
+            if key != key2:
+                raise ValueError("Key did not match (%s vs %s)" % (key, key2))
+            yield key, record
+
     def __setitem__(self, key, value):
         """Would allow setting or replacing records, but not implemented.
 
@@ -474,6 +531,196 @@ class _IndexedSeqFileDict(_dict_base):
         self._proxy._handle.close()
 
 
+def _sort_by_hash(hashes, offsets, chunk_size=65536):
+    """Sort the arrays of hashes and offsets by hash (PRIVATE).
+
+    Returns the two sorted arrays. This avoids creating Python objects
+    for every record, which would take several times the memory of the
+    arrays themselves. With NumPy, both arrays are sorted in place.
+    Otherwise they are sorted in chunks of chunk_size records, which
+    are then merged into a new pair of arrays.
+    """
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+    if numpy is not None:
+        hash_view = numpy.frombuffer(hashes, "i%i" % hashes.itemsize)
+        offset_view = numpy.frombuffer(offsets, "u%i" % offsets.itemsize)
+        order = numpy.argsort(hash_view, kind="mergesort")
+        hash_view[:] = hash_view[order]
+        offset_view[:] = offset_view[order]
+        # Release the buffers, so that the arrays can be resized again
+        del hash_view, offset_view, order
+        return hashes, offsets
+    starts = range(0, len(hashes), chunk_size)
+    for start in starts:
+        end = min(start + chunk_size, len(hashes))
+        order = sorted(range(start, end), key=hashes.__getitem__)
+        hashes[start:end] = array.array(hashes.typecode,
+                                        [hashes[i] for i in order])
+        offsets[start:end] = array.array(offsets.typecode,
+                                         [offsets[i] for i in order])
+        del order
+    if len(starts) < 2:
+        return hashes, offsets
+
+    def run(start):
+        for i in range(start, min(start + chunk_size, len(hashes))):
+            yield hashes[i], offsets[i]
+
+    sorted_hashes = array.array(hashes.typecode)
+    sorted_offsets = array.array(offsets.typecode)
+    for h, offset in heapq.merge(*[run(start) for start in starts]):
+        sorted_hashes.append(h)
+        sorted_offsets.append(offset)
+    return sorted_hashes, sorted_offsets
+
+
+class _CompactIndexedSeqFileDict(_IndexedSeqFileDict):
+    """Read only dictionary interface to a sequential record file, low memory.
+
+    This is an alternative to the _IndexedSeqFileDict which does not keep
+    the keys in memory. Instead, a hash of each key and the associated file
+    offset are held in two sorted arrays of 64 bit integers, using about 16
+    bytes per record (rather than well over 100 bytes for a Python dict).
+
+    Looking up a key is a binary search on the hashes. If more than one
+    record shares the same hash value, this collision is resolved by
+    parsing the candidate records from the file to check their keys.
+    Iterating over the keys re-scans the file (using a second proxy from
+    the proxy_factory, a function which takes no arguments).
+
+    Note Python's hash function is used, which on 32 bit platforms gives
+    only a 32 bit hash, so false positives in membership tests (where a
+    missing key shares a hash with a key in the file) are more likely.
+    """
+
+    def __init__(self, random_access_proxy, key_function,
+                 repr, obj_repr, proxy_factory):
+        """Initialize the class."""
+        # Use key_function=None for default value
+        self._proxy = random_access_proxy
+        self._key_function = key_function
+        self._repr = repr
+        self._obj_repr = obj_repr
+        self._proxy_factory = proxy_factory
+        if key_function:
+            offset_iter = (
+                (key_function(k), o, l) for (k, o, l) in random_access_proxy)
+        else:
+            offset_iter = random_access_proxy
+        hashes = array.array(_array_int64)
+        offsets = array.array(_array_uint64)
+        for key, offset, length in offset_iter:
+            hashes.append(hash(key))
+            offsets.append(offset)
+        self._hashes, self._offsets = _sort_by_hash(hashes, offsets)
+        del hashes, offsets
+        # Any duplicates must be amongst the records with the same hash
+        hashes = self._hashes
+        for i in range(1, len(hashes)):
+            if hashes[i] == hashes[i - 1] and \
+                    (i == 1 or hashes[i - 2] != hashes[i]):
+                keys = set()
+                j = i - 1
+                while j < len(hashes) and hashes[j] == hashes[i]:
+                    key = self._key_at(self._offsets[j])
+                    if key in keys:
+                        self._proxy._handle.close()
+                        raise ValueError("Duplicate key '%s'" % key)
+                    keys.add(key)
+                    j += 1
+
+    def _key_at(self, offset):
+        """Parse the record at this offset and return its key (PRIVATE)."""
+        record = self._proxy.get(offset)
+        if self._key_function:
+            return self._key_function(record.id)
+        else:
+            return record.id
+
+    def _candidates(self, key):
+        """Return a list of offsets for records with the same hash (PRIVATE)."""
+        hashes = self._hashes
+        h = hash(key)
+        i = bisect.bisect_left(hashes, h)
+        j = i
+        while j < len(hashes) and hashes[j] == h:
+            j += 1
+        return self._offsets[i:j]
+
+    def _offset(self, key):
+        """Return the offset for the key, resolving any collisions (PRIVATE)."""
+        candidates = self._candidates(key)
+        if len(candidates) == 1:
+            return candidates[0]
+        for offset in candidates:
+            if self._key_at(offset) == key:
+                return offset
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        """Return True if the key is in the index."""
+        try:
+            self._offset(key)
+        except KeyError:
+            return False
+        return True
+
+    def __len__(self):
+        """Return the number of records."""
+        return len(self._offsets)
+
+    def __iter__(self):
+        """Iterate over the keys (in file order, by re-scanning the file)."""
+        random_access_proxy = self._proxy_factory()
+        key_function = self._key_function
+        try:
+            for key, offset, length in random_access_proxy:
+                if key_function:
+                    yield key_function(key)
+                else:
+                    yield key
+        finally:
+            random_access_proxy._handle.close()
+
+    def __getitem__(self, key):
+        """Return record for the specified key."""
+        for offset in self._candidates(key):
+            record = self._proxy.get(offset)
+            if self._key_function:
+                key2 = self._key_function(record.id)
+            else:
+                key2 = record.id
+            if key == key2:
+                return record
+        raise KeyError(key)
+
+    def get_raw(self, key):
+        """Return the raw record from the file as a bytes string.
+
+        If the key is not found, a KeyError exception is raised.
+        """
+        return self._proxy.get_raw(self._offset(key))
+
+
+def _scan_offsets(args):
+    """Return the offsets for all the records in a file (PRIVATE).
+
+    Used as the worker function when building an index using several
+    processes, where args is a tuple of the (picklable) proxy factory,
+    the file format and the filename. Returns a list of (identifier,
+    offset, length) tuples.
+    """
+    proxy_factory, format, filename = args
+    random_access_proxy = proxy_factory(format, filename)
+    try:
+        return list(random_access_proxy)
+    finally:
+        random_access_proxy._handle.close()
+
+
 class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
     """Read only dictionary interface to many sequential record files.
 
@@ -491,7 +738,7 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
 
     def __init__(self, index_filename, filenames,
                  proxy_factory, format,
-                 key_function, repr, max_open=10):
+                 key_function, repr, max_open=10, processes=1):
         """Initialize the class."""
         # TODO? - Don't keep filename list in memory (just in DB)?
         # Should save a chunk of memory if dealing with 1000s of files.
@@ -514,6 +761,7 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
         self._proxy_factory = proxy_factory
         self._repr = repr
         self._max_open = max_open
+        self._processes = processes
         self._proxies = {}
 
         # Note if using SQLite :memory: trick index filename, this will
@@ -581,7 +829,7 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
                         tmp.append(os.path.join(relative_path, f.replace("/", os.path.sep)))
                 self._filenames = tmp
                 del tmp
-            if filenames and len(filenames) != len(self._filenames):
+            if filenames and len(filenames) < len(self._filenames):
                 con.close()
                 raise ValueError("Index file says %i files, not %i"
                                  % (len(self._filenames), len(filenames)))
@@ -607,17 +855,28 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
         if not proxy_factory(self._format):
             con.close()
             raise ValueError("Unsupported format '%s'" % self._format)
+        if filenames and len(filenames) > len(self._filenames):
+            # Add the extra files to the existing index
+            new_filenames = filenames[len(self._filenames):]
+            try:
+                count = self._index_files(new_filenames, len(self._filenames))
+            except _IntegrityError as err:
+                con.rollback()
+                self.close()
+                con.close()
+                raise ValueError("Duplicate key? %s" % err)
+            self._filenames.extend(new_filenames)
+            self._length += count
+            con.execute("UPDATE meta_data SET value = ? WHERE key = ?;",
+                        (self._length, "count"))
+            con.commit()
 
     def _build_index(self):
         """Call from __init__ to create a new index (PRIVATE)."""
         index_filename = self._index_filename
-        relative_path = self._relative_path
         filenames = self._filenames
         format = self._format
-        key_function = self._key_function
         proxy_factory = self._proxy_factory
-        max_open = self._max_open
-        random_access_proxies = self._proxies
 
         if not format or not filenames:
             raise ValueError("Filenames to index and format required to build %r" % index_filename)
@@ -646,56 +905,14 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
             "CREATE TABLE file_data (file_number INTEGER, name TEXT);")
         con.execute("CREATE TABLE offset_data (key TEXT, "
                     "file_number INTEGER, offset INTEGER, length INTEGER);")
-        count = 0
-        for i, filename in enumerate(filenames):
-            # Default to storing as an absolute path,
-            f = os.path.abspath(filename)
-            if not os.path.isabs(filename) and not os.path.isabs(index_filename):
-                # Since user gave BOTH filename & index as relative paths,
-                # we will store this relative to the index file even though
-                # if it may now start ../ (meaning up a level)
-                # Note for cross platform use (e.g. shared drive over SAMBA),
-                # convert any Windows slash into Unix style for rel paths.
-                f = os.path.relpath(filename, relative_path).replace(os.path.sep, "/")
-            elif (os.path.dirname(os.path.abspath(filename)) +
-                  os.path.sep).startswith(relative_path + os.path.sep):
-                # Since sequence file is in same directory or sub directory,
-                # might as well make this into a relative path:
-                f = os.path.relpath(filename, relative_path).replace(os.path.sep, "/")
-                assert not f.startswith("../"), f
-            # print("DEBUG - storing %r as [%r] %r" % (filename, relative_path, f))
-            con.execute(
-                "INSERT INTO file_data (file_number, name) VALUES (?,?);",
-                (i, f))
-            random_access_proxy = proxy_factory(format, filename)
-            if key_function:
-                offset_iter = ((key_function(k), i, o, l)
-                               for (k, o, l) in random_access_proxy)
-            else:
-                offset_iter = ((k, i, o, l)
-                               for (k, o, l) in random_access_proxy)
-            while True:
-                batch = list(itertools.islice(offset_iter, 100))
-                if not batch:
-                    break
-                # print("Inserting batch of %i offsets, %s ... %s"
-                #       % (len(batch), batch[0][0], batch[-1][0]))
-                con.executemany(
-                    "INSERT INTO offset_data (key,file_number,offset,length) VALUES (?,?,?,?);",
-                    batch)
-                con.commit()
-                count += len(batch)
-            if len(random_access_proxies) < max_open:
-                random_access_proxies[i] = random_access_proxy
-            else:
-                random_access_proxy._handle.close()
+        con.commit()
+        count = self._index_files(filenames, 0)
         self._length = count
         # print("About to index %i entries" % count)
         try:
             con.execute("CREATE UNIQUE INDEX IF NOT EXISTS "
                         "key_index ON offset_data(key);")
         except _IntegrityError as err:
-            self._proxies = random_access_proxies
             self.close()
             con.close()
             raise ValueError("Duplicate key? %s" % err)
@@ -705,6 +922,90 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
         con.commit()
         # print("Index created")
 
+    def _stored_filename(self, filename):
+        """Return the filename as it should be recorded in the index (PRIVATE)."""
+        index_filename = self._index_filename
+        relative_path = self._relative_path
+        # Default to storing as an absolute path,
+        f = os.path.abspath(filename)
+        if not os.path.isabs(filename) and not os.path.isabs(index_filename):
+            # Since user gave BOTH filename & index as relative paths,
+            # we will store this relative to the index file even though
+            # if it may now start ../ (meaning up a level)
+            # Note for cross platform use (e.g. shared drive over SAMBA),
+            # convert any Windows slash into Unix style for rel paths.
+            f = os.path.relpath(filename, relative_path).replace(os.path.sep, "/")
+        elif (os.path.dirname(os.path.abspath(filename)) +
+              os.path.sep).startswith(relative_path + os.path.sep):
+            # Since sequence file is in same directory or sub directory,
+            # might as well make this into a relative path:
+            f = os.path.relpath(filename, relative_path).replace(os.path.sep, "/")
+            assert not f.startswith("../"), f
+        # print("DEBUG - storing %r as [%r] %r" % (filename, relative_path, f))
+        return f
+
+    def _index_files(self, filenames, first_file_number):
+        """Scan the files and insert their offsets into the database (PRIVATE).
+
+        Returns the number of records added. The caller should commit
+        the changes. If more than one process is being used, each file
+        is scanned in a worker process, while the offsets are inserted
+        into the database here (in order) as each file is done.
+        """
+        con = self._con
+        format = self._format
+        key_function = self._key_function
+        proxy_factory = self._proxy_factory
+        max_open = self._max_open
+        random_access_proxies = self._proxies
+
+        pool = None
+        if self._processes > 1 and len(filenames) > 1:
+            import multiprocessing
+            pool = multiprocessing.Pool(min(self._processes, len(filenames)))
+            scanned = pool.imap(_scan_offsets,
+                                [(proxy_factory, format, filename)
+                                 for filename in filenames])
+        count = 0
+        try:
+            for i, filename in enumerate(filenames, first_file_number):
+                con.execute(
+                    "INSERT INTO file_data (file_number, name) VALUES (?,?);",
+                    (i, self._stored_filename(filename)))
+                if pool is None:
+                    random_access_proxy = proxy_factory(format, filename)
+                    offsets = random_access_proxy
+                else:
+                    random_access_proxy = None
+                    offsets = next(scanned)
+                if key_function:
+                    offset_iter = ((key_function(k), i, o, l)
+                                   for (k, o, l) in offsets)
+                else:
+                    offset_iter = ((k, i, o, l)
+                                   for (k, o, l) in offsets)
+                while True:
+                    batch = list(itertools.islice(offset_iter, 1000))
+                    if not batch:
+                        break
+                    # print("Inserting batch of %i offsets, %s ... %s"
+                    #       % (len(batch), batch[0][0], batch[-1][0]))
+                    con.executemany(
+                        "INSERT INTO offset_data (key,file_number,offset,length) VALUES (?,?,?,?);",
+                        batch)
+                    count += len(batch)
+                if random_access_proxy is None:
+                    pass
+                elif len(random_access_proxies) < max_open:
+                    random_access_proxies[i] = random_access_proxy
+                else:
+                    random_access_proxy._handle.close()
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+        return count
+
     def __repr__(self):
         return self._repr
 
@@ -811,6 +1112,51 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
             else:
                 return proxy.get_raw(offset)
 
+    def get_many(self, keys):
+        """Iterate over the (key, record) pairs for the requested keys.
+
+        This is intended for extracting a large subset of the records.
+        All the keys are looked up first (using a few large SQL queries
+        rather than one per key, and raising a KeyError exception if any
+        key is not found), then the records are read sorted by file and
+        by offset within each file. This means the records are not
+        returned in the order requested, so the key is given with each
+        record. Any repeated keys are only returned once.
+        """
+        keys = list(set(keys))
+        rows = []
+        # Keep under SQLite's default limit of 999 host parameters
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            found = self._con.execute(
+                "SELECT key, file_number, offset FROM offset_data "
+                "WHERE key IN (%s);" % ",".join("?" * len(batch)),
+                batch).fetchall()
+            if len(found) < len(batch):
+                missing = set(batch).difference(str(row[0]) for row in found)
+                raise KeyError(sorted(missing)[0])
+            rows.extend((file_number, offset, str(key))
+                        for key, file_number, offset in found)
+        rows.sort()
+        key_function = self._key_function
+        proxies = self._proxies
+        for file_number, offset, key in rows:
+            if file_number not in proxies:
+                if len(proxies) >= self._max_open:
+                    # Close an old handle...
+                    proxies.popitem()[1]._handle.close()
+                # Open a new handle...
+                proxies[file_number] = self._proxy_factory(
+                    self._format, self._filenames[file_number])
+            record = proxies[file_number].get(offset)
+            if key_function:
+                key2 = key_function(record.id)
+            else:
+                key2 = record.id
+            if key != key2:
+                raise ValueError("Key did not match (%s vs %s)" % (key, key2))
+            yield key, record
+
     def close(self):
         """Close any open file handles."""
         proxies = self._proxies
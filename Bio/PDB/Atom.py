@@ -16,6 +16,18 @@ from Bio.Data import IUPACData
 
 
 class Atom(object):
+    # For atom sorting (protein backbone atoms first)
+    _sorting_keys = {'N': 0, 'CA': 1, 'C': 2, 'O': 3}
+
+    # A structure can have millions of atoms, so these are kept in slots
+    # rather than in a dictionary per atom. The __dict__ slot still allows
+    # other attributes, and the dictionary is only created when used.
+    __slots__ = ('level', 'parent', 'name', 'fullname', '_atom_array',
+                 '_atom_index', '_coord', '_bfactor', '_occupancy', 'altloc',
+                 'full_id', 'id', 'disordered_flag', 'anisou_array',
+                 'siguij_array', 'sigatm_array', 'serial_number', '_xtra',
+                 '_element', 'mass', '__dict__', '__weakref__')
+
     def __init__(self, name, coord, bfactor, occupancy, altloc, fullname, serial_number,
                  element=None):
         """Create Atom object.
@@ -53,9 +65,14 @@ class Atom(object):
         # the atomic data
         self.name = name  # eg. CA, spaces are removed from atom name
         self.fullname = fullname  # e.g. " CA ", spaces included
-        self.coord = coord
-        self.bfactor = bfactor
-        self.occupancy = occupancy
+        # New atoms are not in an AtomArray, so skip the properties
+        # (_atom_array is set when the coord, bfactor, occupancy and
+        # element are held in the columns of an AtomArray)
+        self._atom_array = None
+        self._atom_index = None
+        self._coord = coord
+        self._bfactor = bfactor
+        self._occupancy = occupancy
         self.altloc = altloc
         self.full_id = None  # (structure id, model id, chain id, residue id, atom id)
         self.id = name  # id of atom is the atom name (e.g. "CA")
@@ -64,14 +81,119 @@ class Atom(object):
         self.siguij_array = None
         self.sigatm_array = None
         self.serial_number = serial_number
-        # Dictionary that keeps additional properties
-        self.xtra = {}
+        # Dictionary that keeps additional properties, created when used
+        self._xtra = None
         assert not element or element == element.upper(), element
-        self.element = self._assign_element(element)
+        self._element = self._assign_element(element)
         self.mass = self._assign_atom_mass()
 
-        # For atom sorting (protein backbone atoms first)
-        self._sorting_keys = {'N': 0, 'CA': 1, 'C': 2, 'O': 3}
+    @property
+    def xtra(self):
+        """Dictionary that keeps additional properties."""
+        if self._xtra is None:
+            self._xtra = {}
+        return self._xtra
+
+    @xtra.setter
+    def xtra(self, xtra):
+        self._xtra = xtra
+
+    def __getstate__(self):
+        """Return the attributes to pickle, as a dictionary."""
+        state = dict(getattr(self, "__dict__", {}))
+        for name in Atom.__slots__:
+            if name not in ("__dict__", "__weakref__") and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        """Restore the pickled attributes (including from old pickles)."""
+        self._atom_array = None
+        self._atom_index = None
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    # Columnar data, see Bio.PDB.AtomArray
+
+    @property
+    def coord(self):
+        """Atomic coordinates (a row of the AtomArray, if the atom has one)."""
+        if self._atom_array is None:
+            return self._coord
+        return self._atom_array.coord[self._atom_index]
+
+    @coord.setter
+    def coord(self, coord):
+        if self._atom_array is None:
+            self._coord = coord
+        else:
+            self._atom_array.coord[self._atom_index] = coord
+
+    @property
+    def bfactor(self):
+        """Isotropic B factor."""
+        if self._atom_array is None:
+            return self._bfactor
+        return self._atom_array._get_float("bfactor", self._atom_index)
+
+    @bfactor.setter
+    def bfactor(self, bfactor):
+        if self._atom_array is None:
+            self._bfactor = bfactor
+        else:
+            self._atom_array._set_float("bfactor", self._atom_index, bfactor)
+
+    @property
+    def occupancy(self):
+        """Occupancy (0.0-1.0)."""
+        if self._atom_array is None:
+            return self._occupancy
+        return self._atom_array._get_float("occupancy", self._atom_index)
+
+    @occupancy.setter
+    def occupancy(self, occupancy):
+        if self._atom_array is None:
+            self._occupancy = occupancy
+        else:
+            self._atom_array._set_float("occupancy", self._atom_index,
+                                        occupancy)
+
+    @property
+    def element(self):
+        """Atom element, e.g. "C" for Carbon."""
+        if self._atom_array is None:
+            return self._element
+        return self._atom_array.element[self._atom_index]
+
+    @element.setter
+    def element(self, element):
+        if self._atom_array is None:
+            self._element = element
+        else:
+            self._atom_array.element[self._atom_index] = element
+
+    def _bind_atom_array(self, atom_array, index):
+        """Keep the columnar data in row index of atom_array (PRIVATE)."""
+        self._atom_array = atom_array
+        self._atom_index = index
+        # Free the copies, only the AtomArray is used from now on
+        for name in ("_coord", "_bfactor", "_occupancy", "_element"):
+            if hasattr(self, name):
+                delattr(self, name)
+
+    def _release_atom_array(self):
+        """Copy the columnar data back into the Atom object (PRIVATE)."""
+        if self._atom_array is not None:
+            coord = self.coord.copy()
+            bfactor = self.bfactor
+            occupancy = self.occupancy
+            element = self.element
+            self._atom_array = None
+            self._atom_index = None
+            self._coord = coord
+            self._bfactor = bfactor
+            self._occupancy = occupancy
+            self._element = element
 
     # Sorting Methods
     # standard across different objects and allows direct comparison
@@ -360,8 +482,10 @@ class Atom(object):
         # Do a shallow copy then explicitly copy what needs to be deeper.
         shallow = copy.copy(self)
         shallow.detach_parent()
+        shallow._release_atom_array()
         shallow.set_coord(copy.copy(self.get_coord()))
-        shallow.xtra = self.xtra.copy()
+        if self._xtra is not None:
+            shallow.xtra = self._xtra.copy()
         return shallow
 
 
@@ -409,3 +533,13 @@ class DisorderedAtom(DisorderedEntityWrapper):
         if occupancy > self.last_occupancy:
             self.last_occupancy = occupancy
             self.disordered_select(altloc)
+        if residue is not None:
+            residue._reset_atom_array()
+
+    def transform(self, rot, tran):
+        """Apply rotation and translation to all alternative locations.
+
+        See the documentation of Atom.transform for details.
+        """
+        for child in self:
+            child.transform(rot, tran)
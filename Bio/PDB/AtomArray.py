@@ -0,0 +1,215 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+
+"""Columnar storage of the atomic data of a Structure.
+
+An AtomArray keeps the coordinates of all atoms in an entity (a
+Structure, Model, Chain or Residue) in one contiguous N x 3 NumPy array,
+next to parallel arrays with the element, B factor, occupancy, residue
+index and chain index of every atom. The Atom objects stay in the
+hierarchy, but their coord, bfactor, occupancy and element attributes
+become views of the corresponding row:
+
+    >>> from Bio.PDB import PDBParser, AtomArray
+    >>> structure = PDBParser().get_structure("1A8O", "PDB/1A8O.pdb")
+    >>> atom_array = AtomArray(structure)
+    >>> len(atom_array)
+    644
+    >>> atom = structure[0]["A"][152]["N"]
+    >>> atom is atom_array.atoms[8]
+    True
+    >>> atom.bfactor = 10.0
+    >>> print(atom_array.bfactor[8])
+    10.0
+
+Entity.transform then rotates and translates all atoms of the entity
+with a single matrix multiplication, and code that works on many atoms
+at once can use the arrays directly:
+
+    >>> print(len(atom_array.coord[atom_array.element == "SE"]))
+    4
+
+All alternative locations of disordered atoms and all residues of
+disordered residues are included, so len(atom_array) can be larger
+than the number of atoms returned by get_atoms(). Adding or detaching
+children afterwards is fine; the affected entities simply go back to
+transforming their children one by one.
+"""
+
+import numpy
+
+from Bio.PDB.Entity import DisorderedEntityWrapper
+
+
+class AtomArray(object):
+    """Contiguous NumPy arrays holding the atoms of an entity.
+
+    Attributes:
+     - atoms - list of Atom objects, one per row
+     - residues - list of Residue objects
+     - chains - list of Chain objects
+     - coord - N x 3 array of coordinates
+     - element - array of element strings
+     - bfactor - array of B factors (NaN where unknown)
+     - occupancy - array of occupancies (NaN where unknown)
+     - residue_index - index into residues for every atom
+     - chain_index - index into chains for every atom
+
+    """
+
+    def __init__(self, entity):
+        """Move the atomic data of entity into contiguous arrays.
+
+        Arguments:
+         - entity - Structure, Model, Chain or Residue object
+
+        """
+        self.atoms = []
+        self.residues = []
+        self._residue_numbers = []
+        self._slices = []
+        self._collect(entity)
+        atoms = self.atoms
+
+        chains = []
+        chain_numbers = {}
+        residue_chain = []
+        for residue in self.residues:
+            chain = residue.get_parent()
+            if id(chain) not in chain_numbers:
+                chain_numbers[id(chain)] = len(chains)
+                chains.append(chain)
+            residue_chain.append(chain_numbers[id(chain)])
+        self.chains = chains
+
+        if atoms:
+            coord = numpy.array([atom.coord for atom in atoms])
+            if coord.dtype.kind != "f":
+                coord = coord.astype("d")
+        else:
+            coord = numpy.zeros((0, 3), "f")
+        self.coord = coord
+        self.element = numpy.array([atom.element for atom in atoms],
+                                   dtype=object)
+        self.bfactor = self._float_column([atom.bfactor for atom in atoms])
+        self.occupancy = self._float_column([atom.occupancy
+                                             for atom in atoms])
+        self.residue_index = numpy.array(self._residue_numbers, dtype=int)
+        self.chain_index = numpy.array(residue_chain,
+                                       dtype=int)[self.residue_index]
+        del self._residue_numbers
+
+        for index, atom in enumerate(atoms):
+            atom._bind_atom_array(self, index)
+        parent = entity.get_parent()
+        if parent is not None:
+            parent._reset_atom_array()
+        for child, atom_slice in self._slices:
+            child._atom_array = self
+            child._atom_slice = atom_slice
+        del self._slices
+
+    def __len__(self):
+        """Return the number of atoms."""
+        return len(self.atoms)
+
+    def __repr__(self):
+        return "<AtomArray atoms=%i residues=%i chains=%i>" \
+            % (len(self.atoms), len(self.residues), len(self.chains))
+
+    # Private methods
+
+    def _collect(self, entity):
+        """Append the atoms below entity, recording its slice (PRIVATE)."""
+        start = len(self.atoms)
+        if entity.get_level() == "R":
+            residue_number = len(self.residues)
+            self.residues.append(entity)
+            for atom in entity.child_list:
+                if isinstance(atom, DisorderedEntityWrapper):
+                    for altloc in atom.disordered_get_id_list():
+                        self.atoms.append(atom.disordered_get(altloc))
+                else:
+                    self.atoms.append(atom)
+            self._residue_numbers.extend(
+                [residue_number] * (len(self.atoms) - start))
+        else:
+            for child in entity.child_list:
+                if isinstance(child, DisorderedEntityWrapper):
+                    for resname in child.disordered_get_id_list():
+                        self._collect(child.disordered_get(resname))
+                else:
+                    self._collect(child)
+        self._slices.append((entity, slice(start, len(self.atoms))))
+
+    @staticmethod
+    def _float_column(values):
+        """Return values as a float array, with NaN for None (PRIVATE)."""
+        nan = float("nan")
+        return numpy.array([nan if value is None else value
+                            for value in values], "d")
+
+    def _get_float(self, name, index):
+        """Return a B factor or occupancy, None if unknown (PRIVATE)."""
+        value = getattr(self, name).item(index)
+        if value != value:
+            return None
+        return value
+
+    def _set_float(self, name, index, value):
+        """Store a B factor or occupancy, NaN if unknown (PRIVATE)."""
+        if value is None:
+            value = float("nan")
+        getattr(self, name)[index] = value
+
+    # Public methods
+
+    def transform(self, rot, tran, index=None):
+        """Apply rotation and translation to the coordinates.
+
+        :param rot: A right multiplying rotation matrix
+        :type rot: 3x3 Numeric array
+
+        :param tran: the translation vector
+        :type tran: size 3 Numeric array
+
+        :param index: optional slice or index array selecting the rows
+            to transform (default all)
+
+        As with Atom.transform, the coordinates are upcast if rot or
+        tran have a more precise type (e.g. float64 for PDB coordinates,
+        which are parsed as float32).
+        """
+        if index is None:
+            index = slice(None)
+        coord = self.coord
+        moved = numpy.dot(coord[index], rot) + tran
+        dtype = numpy.result_type(coord, moved)
+        if dtype != coord.dtype:
+            coord = self.coord = coord.astype(dtype)
+        coord[index] = moved
+
+
+def _transform_atoms(atoms, rot, tran):
+    """Apply rotation and translation to a list of atoms (PRIVATE).
+
+    Atoms held in an AtomArray are transformed with one matrix
+    multiplication per array, any others one by one.
+    """
+    rows = {}
+    for atom in atoms:
+        if isinstance(atom, DisorderedEntityWrapper):
+            children = atom.disordered_get_list()
+        else:
+            children = (atom,)
+        for child in children:
+            atom_array = child._atom_array
+            if atom_array is None:
+                child.transform(rot, tran)
+            else:
+                rows.setdefault(id(atom_array), (atom_array, []))[1].append(
+                    child._atom_index)
+    for atom_array, index in rows.values():
+        atom_array.transform(rot, tran, numpy.unique(index))
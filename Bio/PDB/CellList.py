@@ -0,0 +1,387 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+
+"""Neighbor search using a cell list, with results as NumPy arrays.
+
+A CellList sorts a set of points into cubic cells, so that the points
+within a given radius of each other only need to be looked for in
+neighboring cells. Queries return NumPy arrays of indices rather than
+lists of objects:
+
+    >>> from Bio.PDB import PDBParser
+    >>> from Bio.PDB.CellList import CellList, CellNeighborSearch
+    >>> structure = PDBParser().get_structure("1A8O", "PDB/1A8O.pdb")
+    >>> atoms = list(structure.get_atoms())
+    >>> cell_list = CellList([atom.coord for atom in atoms], 4.0)
+    >>> i, j = cell_list.search_all(4.0)
+    >>> len(i) == len(j)
+    True
+
+CellNeighborSearch offers the same search and search_all methods as
+NeighborSearch (which needs the compiled Bio.KDTree module) on top of
+this, plus versions returning index arrays into the atoms, residues,
+chains, models or structures. Going from atom pairs to residue pairs is
+then done on the arrays:
+
+    >>> search = CellNeighborSearch(atoms)
+    >>> residues = search.get_entities("R")
+    >>> i, j = search.search_all_indices(4.0, "R")
+    >>> print("%s %s" % (residues[i[0]].id[1], residues[j[0]].id[1]))
+    151 152
+
+"""
+
+import numpy
+
+from Bio.PDB.PDBExceptions import PDBException
+from Bio.PDB.Selection import entity_levels
+
+
+def _ranges(starts, counts):
+    """Return the concatenated ranges start:start+count (PRIVATE)."""
+    ends = numpy.cumsum(counts)
+    return numpy.arange(ends[-1] if len(ends) else 0) \
+        + numpy.repeat(starts - ends + counts, counts)
+
+
+def _cross(starts_a, counts_a, starts_b, counts_b):
+    """Return all pairs between ranges in a and ranges in b (PRIVATE).
+
+    For each n, every index in starts_a[n]:starts_a[n]+counts_a[n] is
+    paired with every index in starts_b[n]:starts_b[n]+counts_b[n].
+    """
+    sizes = counts_a * counts_b
+    number = numpy.repeat(numpy.arange(len(sizes)), sizes)
+    k = _ranges(numpy.zeros_like(sizes), sizes)
+    counts_b = counts_b[number]
+    return starts_a[number] + k // counts_b, starts_b[number] + k % counts_b
+
+
+class CellList(object):
+    """Points sorted into cubic cells, for fixed radius neighbor search.
+
+    Searching with a radius of about the cell size is the fastest; a
+    larger radius also works, but looks at more cells.
+    """
+
+    def __init__(self, coords, cell_size):
+        """Create the cell list.
+
+        Arguments:
+         - coords - N x 3 array (or list) of coordinates
+         - cell_size - float, the edge length of the cells
+
+        """
+        coords = numpy.asarray(coords, dtype="d")
+        if coords.size == 0:
+            coords = coords.reshape((0, 3))
+        if coords.ndim != 2 or coords.shape[1] != 3:
+            raise ValueError("Expected an N x 3 array of coordinates")
+        if not cell_size > 0:
+            raise ValueError("Need a positive cell size, not %r" % cell_size)
+        self.coords = coords
+        self.cell_size = float(cell_size)
+        if len(coords):
+            self._origin = coords.min(axis=0)
+            cells = numpy.floor((coords - self._origin) /
+                                self.cell_size).astype(numpy.int64)
+            self._shape = cells.max(axis=0) + 1
+        else:
+            self._origin = numpy.zeros(3)
+            cells = numpy.zeros((0, 3), numpy.int64)
+            self._shape = numpy.ones(3, numpy.int64)
+        if float(self._shape[0]) * self._shape[1] * self._shape[2] >= 2 ** 62:
+            raise ValueError("Cell size %r is too small for these coordinates"
+                             % cell_size)
+        keys = self._cell_keys(cells)
+        order = numpy.argsort(keys, kind="mergesort")
+        # The occupied cells, each holding the points
+        # order[start:start + count]
+        self._order = order
+        self._keys, self._starts, self._counts = numpy.unique(
+            keys[order], return_index=True, return_counts=True)
+        self._cells = cells[order[self._starts]]
+        self._sorted_coords = coords[order]
+
+    def __len__(self):
+        """Return the number of points."""
+        return len(self.coords)
+
+    def __repr__(self):
+        return "<CellList points=%i cells=%i cell_size=%r>" \
+            % (len(self.coords), len(self._keys), self.cell_size)
+
+    # Private methods
+
+    def _cell_keys(self, cells):
+        """Return a single integer for each cell (PRIVATE)."""
+        shape = self._shape
+        return (cells[:, 0] * shape[1] + cells[:, 1]) * shape[2] + cells[:, 2]
+
+    def _find_cells(self, cells):
+        """Return the numbers of the occupied cells among cells (PRIVATE).
+
+        Cells outside the grid or without any points are left out.
+        """
+        inside = numpy.all((cells >= 0) & (cells < self._shape), axis=1)
+        keys = self._cell_keys(cells[inside])
+        numbers = numpy.searchsorted(self._keys, keys)
+        numbers[numbers == len(self._keys)] = 0
+        found = self._keys[numbers] == keys if len(self._keys) else \
+            numpy.zeros(len(keys), bool)
+        return inside.nonzero()[0][found], numbers[found]
+
+    def _search_all_points(self, squared):
+        """Return all pairs within sqrt(squared), comparing all (PRIVATE).
+
+        The distances are computed for blocks of rows at a time, to limit
+        the memory used.
+        """
+        coords = self.coords
+        step = max(1, 2 ** 20 // max(len(coords), 1))
+        found_i = [numpy.zeros(0, numpy.intp)]
+        found_j = [numpy.zeros(0, numpy.intp)]
+        for start in range(0, len(coords), step):
+            delta = coords[start:start + step, None] - coords[None, start:]
+            near = numpy.einsum("ijk,ijk->ij", delta, delta) <= squared
+            i, j = near.nonzero()
+            keep = i < j
+            found_i.append(i[keep] + start)
+            found_j.append(j[keep] + start)
+        return numpy.concatenate(found_i), numpy.concatenate(found_j)
+
+    # Public methods
+
+    def search(self, center, radius):
+        """Return the indices of all points within radius of center.
+
+        Arguments:
+         - center - array of 3 coordinates
+         - radius - float
+
+        The indices are returned as a sorted NumPy array.
+        """
+        center = numpy.asarray(center, dtype="d")
+        low = numpy.floor((center - radius - self._origin) / self.cell_size)
+        high = numpy.floor((center + radius - self._origin) / self.cell_size)
+        low = numpy.maximum(low, 0).astype(numpy.int64)
+        high = numpy.minimum(high, self._shape - 1).astype(numpy.int64)
+        if not len(self.coords) or numpy.any(high < low):
+            return numpy.zeros(0, numpy.intp)
+        if numpy.prod(high - low + 1) > len(self._keys):
+            # Quicker to look at all occupied cells
+            candidates = numpy.arange(len(self.coords))
+        else:
+            grid = numpy.mgrid[low[0]:high[0] + 1, low[1]:high[1] + 1,
+                               low[2]:high[2] + 1].reshape(3, -1).T
+            numbers = self._find_cells(grid)[1]
+            candidates = _ranges(self._starts[numbers], self._counts[numbers])
+        delta = self._sorted_coords[candidates] - center
+        near = numpy.einsum("ij,ij->i", delta, delta) <= radius * radius
+        return numpy.sort(self._order[candidates[near]])
+
+    def search_all(self, radius):
+        """Return all pairs of points within radius of each other.
+
+        Arguments:
+         - radius - float
+
+        Returns two NumPy index arrays i and j, with i[n] < j[n] for each
+        pair, sorted by i and then j.
+        """
+        # Cells further apart than the grid is wide never hold any points
+        reach = numpy.minimum(int(numpy.ceil(radius / self.cell_size)),
+                              self._shape - 1).tolist()
+        squared = radius * radius
+        if numpy.prod(2 * numpy.array(reach) + 1) // 2 + 1 > len(self._keys):
+            # Quicker to look at all pairs of points
+            return self._search_all_points(squared)
+        coords = self._sorted_coords
+        found_i = []
+        found_j = []
+        # Each pair of cells is visited once, from the first cell
+        for dx in range(0, reach[0] + 1):
+            for dy in range(-reach[1] if dx else 0, reach[1] + 1):
+                for dz in range(-reach[2] if dx or dy else 0, reach[2] + 1):
+                    offset = numpy.array((dx, dy, dz), numpy.int64)
+                    cells_a, cells_b = self._find_cells(self._cells + offset)
+                    i, j = _cross(self._starts[cells_a],
+                                  self._counts[cells_a],
+                                  self._starts[cells_b],
+                                  self._counts[cells_b])
+                    if not (dx or dy or dz):
+                        # Pairs within a cell
+                        keep = i < j
+                        i = i[keep]
+                        j = j[keep]
+                    delta = coords[i] - coords[j]
+                    near = numpy.einsum("ij,ij->i", delta, delta) <= squared
+                    found_i.append(self._order[i[near]])
+                    found_j.append(self._order[j[near]])
+        i = numpy.concatenate(found_i)
+        j = numpy.concatenate(found_j)
+        first = numpy.minimum(i, j)
+        second = numpy.maximum(i, j)
+        order = numpy.lexsort((second, first))
+        return first[order], second[order]
+
+
+class CellNeighborSearch(object):
+    """Neighbor search on a list of atoms, using a CellList.
+
+    This can be used instead of NeighborSearch. The search and search_all
+    methods work the same, except that the entities are returned in the
+    order of the atom list. Entities are told apart by identity, rather
+    than by comparing their ids, so e.g. residues with the same id in
+    different chains are not merged.
+
+    The search_indices and search_all_indices methods return NumPy index
+    arrays into the list of atoms, residues, chains, models or structures
+    returned by get_entities instead, which avoids building a Python
+    object for every pair.
+    """
+
+    def __init__(self, atom_list, cell_size=None):
+        """Create the object.
+
+        Arguments:
+         - atom_list - list of atoms. This list is used in the queries.
+           It can contain atoms from different structures.
+         - cell_size - optional float, the edge length of the cells. By
+           default the radius of each query is used, which is the
+           fastest if most queries use the same radius.
+
+        """
+        self.atom_list = atom_list
+        self.coords = numpy.array([atom.get_coord() for atom in atom_list],
+                                  dtype="d").reshape((-1, 3))
+        if cell_size is not None and not cell_size > 0:
+            raise ValueError("Need a positive cell size, not %r" % cell_size)
+        self.cell_size = cell_size
+        self._cell_list = None
+        self._levels = {"A": (atom_list, numpy.arange(len(atom_list)))}
+
+    # Private
+
+    def _get_cell_list(self, radius):
+        """Return a CellList for searching with radius (PRIVATE)."""
+        cell_size = self.cell_size or radius
+        if self._cell_list is None or self._cell_list.cell_size != cell_size:
+            self._cell_list = CellList(self.coords, cell_size)
+        return self._cell_list
+
+    def _get_level(self, level):
+        """Return the entities at level and the entity of each atom (PRIVATE).
+
+        The parents of the entities one level down are numbered in order
+        of appearance, so this takes one Python loop over those entities,
+        after which the number of the parent of each atom is found with a
+        single array lookup.
+        """
+        if level not in entity_levels:
+            raise PDBException("%s: Unknown level" % level)
+        if level not in self._levels:
+            below = entity_levels[entity_levels.index(level) - 1]
+            children, child_index = self._get_level(below)
+            entities = []
+            numbers = {}
+            index = []
+            for child in children:
+                parent = child.get_parent()
+                key = id(parent)
+                if key not in numbers:
+                    numbers[key] = len(entities)
+                    entities.append(parent)
+                index.append(numbers[key])
+            index = numpy.array(index, dtype=numpy.intp)[child_index]
+            self._levels[level] = (entities, index)
+        return self._levels[level]
+
+    # Public
+
+    def get_entities(self, level="A"):
+        """Return the list of entities the index arrays refer to.
+
+        Arguments:
+         - level - char (A, R, C, M, S)
+
+        """
+        return self._get_level(level)[0]
+
+    def search_indices(self, center, radius, level="A"):
+        """Return the entities with an atom within radius of center.
+
+        Arguments:
+         - center - Numeric array
+         - radius - float
+         - level - char (A, R, C, M, S)
+
+        Returns a sorted NumPy array of indices into get_entities(level).
+        """
+        index = self._get_level(level)[1]
+        atoms = self._get_cell_list(radius).search(center, radius)
+        if level == "A":
+            return atoms
+        return numpy.unique(index[atoms])
+
+    def search_all_indices(self, radius, level="A"):
+        """Return all pairs of entities with atoms within radius.
+
+        Arguments:
+         - radius - float
+         - level - char (A, R, C, M, S)
+
+        Returns two NumPy index arrays i and j into get_entities(level),
+        with i[n] < j[n] for each pair, sorted by i and then j. Pairs of
+        atoms in the same entity are left out, and each pair of entities
+        is listed once.
+        """
+        entities, index = self._get_level(level)
+        i, j = self._get_cell_list(radius).search_all(radius)
+        if level == "A":
+            return i, j
+        i = index[i]
+        j = index[j]
+        different = i != j
+        first = numpy.minimum(i[different], j[different])
+        second = numpy.maximum(i[different], j[different])
+        pairs = numpy.unique(first.astype(numpy.int64) * len(entities) +
+                             second)
+        return pairs // len(entities), pairs % len(entities)
+
+    def search(self, center, radius, level="A"):
+        """Neighbor search.
+
+        Return all atoms/residues/chains/models/structures
+        that have at least one atom within radius of center.
+        What entity level is returned (e.g. atoms or residues)
+        is determined by level (A=atoms, R=residues, C=chains,
+        M=models, S=structures).
+
+        Arguments:
+         - center - Numeric array
+         - radius - float
+         - level - char (A, R, C, M, S)
+
+        """
+        entities = self.get_entities(level)
+        return [entities[i] for i in self.search_indices(center, radius,
+                                                         level)]
+
+    def search_all(self, radius, level="A"):
+        """All neighbor search.
+
+        Search all entities that have atoms pairs within
+        radius.
+
+        Arguments:
+         - radius - float
+         - level - char (A, R, C, M, S)
+
+        """
+        entities = self.get_entities(level)
+        i, j = self.search_all_indices(radius, level)
+        return [(entities[a], entities[b])
+                for a, b in zip(i.tolist(), j.tolist())]
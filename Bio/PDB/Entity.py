@@ -20,6 +20,10 @@ class Entity(object):
     It deals with storage and lookup.
     """
 
+    # Set when the atoms of the entity form a slice of an AtomArray
+    _atom_array = None
+    _atom_slice = None
+
     def __init__(self, id):
         """Initialize the class."""
         self._id = id
@@ -29,6 +33,10 @@ class Entity(object):
         self.child_dict = {}
         # Dictionary that keeps additional properties
         self.xtra = {}
+        # Set here (although the class defaults are the same) so that
+        # binding an AtomArray later does not enlarge the dictionary
+        self._atom_array = None
+        self._atom_slice = None
 
     # Special methods
 
@@ -112,6 +120,18 @@ class Entity(object):
                 pass  # Atoms do not cache their full ids.
         self.full_id = None
 
+    def _reset_atom_array(self):
+        """Forget the AtomArray slice of this entity and its parents.
+
+        Called whenever children are added or removed, after which
+        transform falls back to visiting the children one by one.
+        """
+        entity = self
+        while entity is not None and entity._atom_array is not None:
+            entity._atom_array = None
+            entity._atom_slice = None
+            entity = entity.parent
+
     # Public methods
 
     @property
@@ -164,6 +184,7 @@ class Entity(object):
         child.detach_parent()
         del self.child_dict[id]
         self.child_list.remove(child)
+        self._reset_atom_array()
 
     def add(self, entity):
         """Add a child to the Entity."""
@@ -174,6 +195,7 @@ class Entity(object):
         entity.set_parent(self)
         self.child_list.append(entity)
         self.child_dict[entity_id] = entity
+        self._reset_atom_array()
 
     def insert(self, pos, entity):
         """Add a child to the Entity at a specified position."""
@@ -184,6 +206,7 @@ class Entity(object):
         entity.set_parent(self)
         self.child_list[pos:pos] = [entity]
         self.child_dict[entity_id] = entity
+        self._reset_atom_array()
 
     def get_iterator(self):
         """Return iterator over children."""
@@ -251,7 +274,13 @@ class Entity(object):
 
         :param tran: the translation vector
         :type tran: size 3 Numeric array
+
+        If the atoms of the entity are held in an AtomArray, this is
+        a single matrix multiplication over its coordinate array.
         """
+        if self._atom_array is not None:
+            self._atom_array.transform(rot, tran, self._atom_slice)
+            return
         for o in self.get_list():
             o.transform(rot, tran)
 
@@ -261,6 +290,8 @@ class Entity(object):
         shallow.child_list = []
         shallow.child_dict = {}
         shallow.xtra = copy(self.xtra)
+        shallow._atom_array = None
+        shallow._atom_slice = None
 
         shallow.detach_parent()
 
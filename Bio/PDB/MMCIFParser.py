@@ -7,11 +7,14 @@
 
 from __future__ import print_function
 
-import numpy
+import re
 import warnings
 
+import numpy
+
 from Bio.File import as_handle
 from Bio._py3k import range
+from Bio._py3k import StringIO
 
 from Bio.PDB.MMCIF2Dict import MMCIF2Dict
 from Bio.PDB.StructureBuilder import StructureBuilder
@@ -19,10 +22,61 @@ from Bio.PDB.PDBExceptions import PDBConstructionException
 from Bio.PDB.PDBExceptions import PDBConstructionWarning
 
 
+# A token in a loop: quoted (the quote only ends if followed by
+# whitespace, so "O5'" is a valid quoted atom name) or bare
+_loop_token = re.compile(r"""'(.*?)'(?=\s|$)|"(.*?)"(?=\s|$)|(\S+)""")
+
+
+def _read_atom_site(text):
+    """Return the _atom_site loop of a mmCIF file as columns (PRIVATE).
+
+    This reads only the loop with the atomic data, column by column,
+    instead of tokenizing the whole file. Returns a dictionary of lists
+    as MMCIF2Dict would give for the _atom_site keys, or None if there
+    is no such loop or it uses syntax this shortcut does not handle
+    (multi-line text fields).
+    """
+    lines = iter(text.splitlines())
+    keys = []
+    previous = None
+    for line in lines:
+        if line.startswith("_atom_site."):
+            if previous is None or previous.strip() != "loop_":
+                # Not a loop, e.g. a single atom
+                return None
+            keys.append(line.strip())
+            break
+        previous = line
+    else:
+        return None
+    values = []
+    for line in lines:
+        if line.startswith("_atom_site.") and not values:
+            keys.append(line.strip())
+        elif line.startswith(("#", "_", "loop_", "data_")):
+            break
+        elif line.startswith(";"):
+            return None
+        else:
+            values.append(line)
+    if any(len(key.split()) != 1 for key in keys):
+        return None
+    values = "\n".join(values)
+    if "'" in values or '"' in values:
+        tokens = [match.group(match.lastindex)
+                  for match in _loop_token.finditer(values)]
+    else:
+        tokens = values.split()
+    n = len(keys)
+    if len(tokens) % n:
+        return None
+    return dict((key, tokens[i::n]) for i, key in enumerate(keys))
+
+
 class MMCIFParser(object):
     """Parse a mmCIF file and return a Structure object."""
 
-    def __init__(self, structure_builder=None, QUIET=False):
+    def __init__(self, structure_builder=None, QUIET=False, batch=False):
         """Create a PDBParser object.
 
         The mmCIF parser calls a number of standard methods in an aggregated
@@ -35,8 +89,17 @@ class MMCIFParser(object):
          - QUIET - Evaluated as a Boolean. If true, warnings issued in constructing
            the SMCRA data will be suppressed. If false (DEFAULT), they will be shown.
            These warnings might be indicative of problems in the mmCIF file!
+         - batch - Evaluated as a Boolean. If true, only the _atom_site loop is
+           read, column by column, and the structure is built in one step
+           rather than by calling the StructureBuilder for every atom. This
+           is much faster, and gives the same structure. Files which the
+           batch mode cannot read are parsed as usual. Cannot be used with
+           a structure_builder.
 
         """
+        if batch and structure_builder is not None:
+            raise ValueError("Batch mode cannot be used with a "
+                             "user implemented StructureBuilder")
         if structure_builder is not None:
             self._structure_builder = structure_builder
         else:
@@ -46,6 +109,7 @@ class MMCIFParser(object):
         self.line_counter = 0
         self.build_structure = None
         self.QUIET = bool(QUIET)
+        self.batch = bool(batch)
 
     # Public methods
 
@@ -60,13 +124,109 @@ class MMCIFParser(object):
         with warnings.catch_warnings():
             if self.QUIET:
                 warnings.filterwarnings("ignore", category=PDBConstructionWarning)
-            self._mmcif_dict = MMCIF2Dict(filename)
-            self._build_structure(structure_id)
+            if self.batch:
+                with as_handle(filename) as handle:
+                    text = handle.read()
+                if not self._build_structure_batch(structure_id, text):
+                    self._mmcif_dict = MMCIF2Dict(StringIO(text))
+                    self._build_structure(structure_id)
+            else:
+                self._mmcif_dict = MMCIF2Dict(filename)
+                self._build_structure(structure_id)
 
         return self._structure_builder.get_structure()
 
     # Private methods
 
+    def _build_structure_batch(self, structure_id, text):
+        """Build the structure from the _atom_site loop only (PRIVATE).
+
+        Returns False (without starting a structure) if the file needs
+        to be parsed as usual, e.g. to raise an exception for an invalid
+        value. The unit cell and space group are not read, as they are
+        not used by the default StructureBuilder.
+        """
+        atom_site = _read_atom_site(text)
+        if atom_site is None \
+                or "_atom_site.pdbx_PDB_model_num" not in atom_site:
+            return False
+        if "_atom_site.auth_seq_id" in atom_site:
+            seq_id_list = atom_site["_atom_site.auth_seq_id"]
+        else:
+            seq_id_list = atom_site["_atom_site.label_seq_id"]
+        aniso_keys = ["_atom_site.aniso_U[1][1]", "_atom_site.aniso_U[1][2]",
+                      "_atom_site.aniso_U[1][3]", "_atom_site.aniso_U[2][2]",
+                      "_atom_site.aniso_U[2][3]", "_atom_site.aniso_U[3][3]"]
+        try:
+            count = len(atom_site["_atom_site.label_atom_id"])
+            resnames = atom_site["_atom_site.label_comp_id"]
+            chain_ids = atom_site["_atom_site.auth_asym_id"]
+            altlocs = atom_site["_atom_site.label_alt_id"]
+            icodes = atom_site["_atom_site.pdbx_PDB_ins_code"]
+            group_pdb = atom_site["_atom_site.group_PDB"]
+            serials = numpy.array(
+                atom_site["_atom_site.pdbx_PDB_model_num"]).astype(int)
+            resseqs = numpy.array(seq_id_list).astype(int).tolist()
+            coords = numpy.empty((count, 3), "f")
+            for i, axis in enumerate("xyz"):
+                coords[:, i] = numpy.array(
+                    atom_site["_atom_site.Cartn_" + axis]).astype(float)
+            b_factors = numpy.array(
+                atom_site["_atom_site.B_iso_or_equiv"]).astype(float).tolist()
+            occupancies = numpy.array(
+                atom_site["_atom_site.occupancy"]).astype(float).tolist()
+            if all(key in atom_site for key in aniso_keys):
+                anisou = numpy.empty((count, 6), "f")
+                for i, key in enumerate(aniso_keys):
+                    anisou[:, i] = numpy.array(atom_site[key]).astype(float)
+            else:
+                anisou = None
+        except (KeyError, ValueError):
+            # Leave any exception to the usual parser
+            return False
+        fields = []
+        for fieldname, resname in zip(group_pdb, resnames):
+            if fieldname == "HETATM":
+                if resname == "HOH" or resname == "WAT":
+                    fields.append("W")
+                else:
+                    fields.append("H")
+            else:
+                fields.append(" ")
+        names = atom_site["_atom_site.label_atom_id"]
+        columns = {
+            "chain_id": chain_ids,
+            "segid": None,
+            "resname": resnames,
+            "field": fields,
+            "resseq": resseqs,
+            "icode": [" " if icode == "?" else icode for icode in icodes],
+            "name": names,
+            "fullname": names,
+            "coord": coords,
+            "b_factor": b_factors,
+            "occupancy": occupancies,
+            "altloc": [" " if altloc == "." else altloc for altloc in altlocs],
+            "serial_number": [None] * count,
+            "element": atom_site.get("_atom_site.type_symbol",
+                                     [None] * count),
+            "line": range(count),
+            "anisou": anisou,
+        }
+
+        structure_builder = self._structure_builder
+        structure_builder.init_structure(structure_id)
+        structure_builder.init_seg(" ")
+        # Historically, Biopython PDB parser uses model_id to mean array index
+        # so serial_id means the Model ID specified in the file
+        starts = numpy.flatnonzero(numpy.diff(serials)) + 1
+        starts = [0] + starts.tolist() + [count] if count else []
+        for model_id in range(len(starts) - 1):
+            start, stop = starts[model_id], starts[model_id + 1]
+            structure_builder.init_model(model_id, int(serials[start]))
+            structure_builder._init_atoms(columns, start, stop)
+        return True
+
     def _build_structure(self, structure_id):
         mmcif_dict = self._mmcif_dict
         atom_id_list = mmcif_dict["_atom_site.label_atom_id"]
@@ -28,11 +28,35 @@ from Bio.PDB.parse_pdb_header import _parse_pdb_header_list
 # If PDB spec says "COLUMNS 18-20" this means line[17:20]
 
 
+def _fixed_columns(lines, columns):
+    """Extract fixed width columns from lines as NumPy arrays (PRIVATE).
+
+    Arguments:
+     - lines - list of strings (ASCII only)
+     - columns - list of (name, start, end) tuples
+
+    Returns a record array of byte strings, with a field for each column.
+    Short lines are padded with spaces.
+    """
+    first = min(start for name, start, end in columns)
+    last = max(end for name, start, end in columns)
+    dtype = numpy.dtype({"names": [name for name, start, end in columns],
+                         "formats": ["S%i" % (end - start)
+                                     for name, start, end in columns],
+                         "offsets": [start - first
+                                     for name, start, end in columns],
+                         "itemsize": last - first})
+    if not lines:
+        return numpy.zeros(0, dtype)
+    data = "".join(line[first:last].ljust(last - first) for line in lines)
+    return numpy.frombuffer(data.encode("ascii"), dtype)
+
+
 class PDBParser(object):
     """Parse a PDB file and return a Structure object."""
 
     def __init__(self, PERMISSIVE=True, get_header=False,
-                 structure_builder=None, QUIET=False):
+                 structure_builder=None, QUIET=False, batch=False):
         """Create a PDBParser object.
 
         The PDB parser call a number of standard methods in an aggregated
@@ -50,9 +74,19 @@ class PDBParser(object):
          - QUIET - Evaluated as a Boolean. If true, warnings issued in constructing
            the SMCRA data will be suppressed. If false (DEFAULT), they will be shown.
            These warnings might be indicative of problems in the PDB file!
+         - batch - Evaluated as a Boolean. If true, the numeric columns of all
+           ATOM/HETATM records are converted at once using NumPy, and the
+           structure is built in one step rather than by calling the
+           StructureBuilder for every atom. This is much faster for large
+           files, and gives the same structure. Files which need the
+           special handling of the default mode for missing or invalid values
+           are parsed as usual. Cannot be used with a structure_builder.
 
         """
         # get_header is not used but is left in for API compatibility
+        if batch and structure_builder is not None:
+            raise ValueError("Batch mode cannot be used with a "
+                             "user implemented StructureBuilder")
         if structure_builder is not None:
             self.structure_builder = structure_builder
         else:
@@ -62,6 +96,7 @@ class PDBParser(object):
         self.line_counter = 0
         self.PERMISSIVE = bool(PERMISSIVE)
         self.QUIET = bool(QUIET)
+        self.batch = bool(batch)
 
     # Public methods
 
@@ -106,7 +141,12 @@ class PDBParser(object):
         # Extract the header; return the rest of the file
         self.header, coords_trailer = self._get_header(header_coords_trailer)
         # Parse the atomic data; return the PDB file trailer
-        self.trailer = self._parse_coordinates(coords_trailer)
+        trailer = None
+        if self.batch:
+            trailer = self._parse_coordinates_batch(coords_trailer)
+        if trailer is None:
+            trailer = self._parse_coordinates(coords_trailer)
+        self.trailer = trailer
 
     def _get_header(self, header_coords_trailer):
         """Get the header of the PDB file, return the rest (PRIVATE)."""
@@ -275,6 +315,179 @@ class PDBParser(object):
         self.line_counter = self.line_counter + local_line_counter
         return []
 
+    def _parse_coordinates_batch(self, coords_trailer):
+        """Parse the atomic data in the PDB file in batch mode (PRIVATE).
+
+        Returns the trailer, or None (without having changed the
+        structure) if the records need the checks done by
+        _parse_coordinates, e.g. for a missing occupancy.
+        """
+        atom_lines = []
+        line_numbers = []
+        # Models as [model_id, serial_num, start], with start the index
+        # of their first atom line
+        models = []
+        # ANISOU, SIGUIJ and SIGATM records, keyed by atom index
+        extras = {"anisou": {}, "siguij": {}, "sigatm": {}}
+        current_model_id = 0
+        model_open = 0
+        trailer = []
+        for i, line in enumerate(coords_trailer):
+            record_type = line[0:6]
+            if record_type == "ATOM  " or record_type == "HETATM":
+                if not model_open:
+                    models.append([current_model_id, None, len(atom_lines)])
+                    current_model_id += 1
+                    model_open = 1
+                atom_lines.append(line.rstrip("\n"))
+                line_numbers.append(self.line_counter + i + 1)
+            elif record_type in ("ANISOU", "SIGUIJ", "SIGATM"):
+                if not atom_lines:
+                    return None
+                extras[record_type.lower()][len(atom_lines) - 1] = line
+            elif record_type == "MODEL ":
+                try:
+                    serial_num = int(line[10:14])
+                except Exception:
+                    return None
+                models.append([current_model_id, serial_num, len(atom_lines)])
+                current_model_id += 1
+                model_open = 1
+            elif record_type == "END   " or record_type == "CONECT":
+                trailer = coords_trailer[i:]
+                break
+            elif record_type == "ENDMDL":
+                model_open = 0
+        if any(len(line) < 27 for line in atom_lines):
+            # Leave the IndexError to _parse_coordinates
+            return None
+
+        # Fixed column extraction of the numeric fields
+        try:
+            records = _fixed_columns(atom_lines, (("serial_number", 6, 11),
+                                                  ("resseq", 22, 26),
+                                                  ("x", 30, 38),
+                                                  ("y", 38, 46),
+                                                  ("z", 46, 54),
+                                                  ("occupancy", 54, 60),
+                                                  ("bfactor", 60, 66)))
+            resseqs = records["resseq"].astype(int).tolist()
+            coords = numpy.empty((len(atom_lines), 3), "f")
+            coords[:, 0] = records["x"].astype(float)
+            coords[:, 1] = records["y"].astype(float)
+            coords[:, 2] = records["z"].astype(float)
+            occupancies = records["occupancy"].astype(float)
+            bfactors = records["bfactor"].astype(float).tolist()
+            anisou = self._parse_records(
+                extras["anisou"], len(atom_lines),
+                ((28, 35), (35, 42), (43, 49), (49, 56), (56, 63), (63, 70)),
+                10000.0)
+            siguij = self._parse_records(
+                extras["siguij"], len(atom_lines),
+                ((28, 35), (35, 42), (42, 49), (49, 56), (56, 63), (63, 70)),
+                10000.0)
+            sigatm = self._parse_records(
+                extras["sigatm"], len(atom_lines),
+                ((30, 38), (38, 45), (46, 54), (54, 60), (60, 66)))
+        except (UnicodeError, ValueError):
+            return None
+        try:
+            serial_numbers = records["serial_number"].astype(int).tolist()
+        except ValueError:
+            serial_numbers = []
+            for value in records["serial_number"]:
+                try:
+                    serial_numbers.append(int(value))
+                except ValueError:
+                    serial_numbers.append(0)
+        if (occupancies < 0).any():
+            warnings.warn("Negative occupancy in one or more atoms",
+                          PDBConstructionWarning)
+
+        # The string fields take few distinct values, so cache them
+        names = {}
+        for fullname in set(line[12:16] for line in atom_lines):
+            split_list = fullname.split()
+            if len(split_list) != 1:
+                # atom name has internal spaces, e.g. " N B ", so
+                # we do not strip spaces
+                names[fullname] = fullname
+            else:
+                # atom name is like " CA ", so we can strip spaces
+                names[fullname] = split_list[0]
+        elements = dict((element, element.strip().upper())
+                        for element in set(line[76:78]
+                                           for line in atom_lines))
+        fields = []
+        for line in atom_lines:
+            if line[0:6] == "HETATM":  # hetero atom flag
+                resname = line[17:20]
+                if resname == "HOH" or resname == "WAT":
+                    fields.append("W")
+                else:
+                    fields.append("H")
+            else:
+                fields.append(" ")
+        columns = {
+            "chain_id": [line[21] for line in atom_lines],
+            "segid": [line[72:76] for line in atom_lines],
+            "resname": [line[17:20] for line in atom_lines],
+            "field": fields,
+            "resseq": resseqs,
+            "icode": [line[26] for line in atom_lines],
+            "name": [names[line[12:16]] for line in atom_lines],
+            "fullname": [line[12:16] for line in atom_lines],
+            "coord": coords,
+            "b_factor": bfactors,
+            "occupancy": occupancies.tolist(),
+            "altloc": [line[16] for line in atom_lines],
+            "serial_number": serial_numbers,
+            "element": [elements[line[76:78]] for line in atom_lines],
+            "line": line_numbers,
+            "anisou": anisou,
+            "siguij": siguij,
+            "sigatm": sigatm,
+        }
+
+        structure_builder = self.structure_builder
+        models.append([None, None, len(atom_lines)])
+        for i in range(len(models) - 1):
+            model_id, serial_num, start = models[i]
+            structure_builder.init_model(model_id, serial_num)
+            structure_builder._init_atoms(columns, start, models[i + 1][2],
+                                          self._handle_PDB_exception)
+        self.line_counter += len(coords_trailer) - len(trailer)
+        return trailer
+
+    def _parse_records(self, records, count, columns, scale=None):
+        """Parse ANISOU, SIGUIJ or SIGATM records for batch mode (PRIVATE).
+
+        Arguments:
+         - records - dictionary of lines, keyed by atom index
+         - count - number of atoms
+         - columns - list of (start, end) tuples of the values
+         - scale - optional divisor, e.g. 10^4 for the U's
+
+        Returns a list with an array of the values for each atom (None
+        for atoms without the record), or None if there are no records.
+        """
+        if not records:
+            return None
+        indices = sorted(records)
+        columns = [("%i" % i, start, end)
+                   for i, (start, end) in enumerate(columns)]
+        fields = _fixed_columns([records[index] for index in indices],
+                                columns)
+        array = numpy.empty((len(indices), len(columns)), "f")
+        for i, (name, start, end) in enumerate(columns):
+            array[:, i] = fields[name].astype(float)
+        if scale is not None:
+            array = (array / scale).astype("f")
+        values = [None] * count
+        for index, row in zip(indices, array):
+            values[index] = row
+        return values
+
     def _handle_PDB_exception(self, message, line_counter):
         """Handle exception (PRIVATE).
 
@@ -202,3 +202,13 @@ class DisorderedResidue(DisorderedEntityWrapper):
         assert(not self.disordered_has_id(resname))
         self[resname] = residue
         self.disordered_select(resname)
+        if chain is not None:
+            chain._reset_atom_array()
+
+    def transform(self, rot, tran):
+        """Apply rotation and translation to all child Residue objects.
+
+        See the documentation of Entity.transform for details.
+        """
+        for residue in self.disordered_get_list():
+            residue.transform(rot, tran)
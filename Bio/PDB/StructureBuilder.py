@@ -10,6 +10,8 @@ This is used by the PDBParser and MMCIFparser classes.
 
 import warnings
 
+from Bio.Data import IUPACData
+
 # SMCRA hierarchy
 from Bio.PDB.Structure import Structure
 from Bio.PDB.Model import Model
@@ -243,6 +245,102 @@ class StructureBuilder(object):
             # The atom is not disordered
             residue.add(self.atom)
 
+    def _init_atoms(self, columns, start, stop, handle_exception=None):
+        """Add a block of atoms to the current model (PRIVATE).
+
+        This is used by the parsers in batch mode, in place of calling
+        init_chain, init_residue and init_atom for every atom. The
+        columns argument is a dictionary with a list (or array) of values
+        for each argument of those methods, plus "chain_id", "segid"
+        (or None for a constant segid), "line" (the line counter) and
+        optionally "anisou", "siguij" and "sigatm" (None for atoms
+        without them). Only atoms start:stop are added.
+
+        Atoms with a blank altloc and a known element, which do not
+        clash with an atom already in the residue, are added directly.
+        Everything else goes through the usual methods, so the result
+        (including warnings and exceptions) is the same. Exceptions
+        from init_residue and init_atom are passed to handle_exception
+        together with the line counter, if given.
+        """
+        chain_ids = columns["chain_id"]
+        segids = columns["segid"]
+        resnames = columns["resname"]
+        fields = columns["field"]
+        resseqs = columns["resseq"]
+        icodes = columns["icode"]
+        names = columns["name"]
+        fullnames = columns["fullname"]
+        coords = columns["coord"]
+        b_factors = columns["b_factor"]
+        occupancies = columns["occupancy"]
+        altlocs = columns["altloc"]
+        serial_numbers = columns["serial_number"]
+        elements = columns["element"]
+        lines = columns["line"]
+        anisous = columns.get("anisou")
+        siguijs = columns.get("siguij")
+        sigatms = columns.get("sigatm")
+        atom_weights = IUPACData.atom_weights
+        current_segid = getattr(self, "segid", None)
+        current_chain_id = None
+        current_residue_id = None
+        current_resname = None
+        for i in range(start, stop):
+            if segids is not None and segids[i] != current_segid:
+                current_segid = segids[i]
+                self.init_seg(current_segid)
+            resname = resnames[i]
+            residue_id = (fields[i], resseqs[i], icodes[i])
+            if chain_ids[i] != current_chain_id:
+                current_chain_id = chain_ids[i]
+                self.set_line_counter(lines[i])
+                self.init_chain(current_chain_id)
+                current_residue_id = None
+            if current_residue_id != residue_id or current_resname != resname:
+                current_residue_id = residue_id
+                current_resname = resname
+                self.set_line_counter(lines[i])
+                try:
+                    self.init_residue(resname, fields[i], resseqs[i], icodes[i])
+                except PDBConstructionException as message:
+                    if handle_exception is None:
+                        raise
+                    handle_exception(message, lines[i])
+            residue = self.residue
+            name = names[i]
+            element = elements[i]
+            if residue is None:
+                # As in init_atom, an exception was generated during
+                # the construction of the residue
+                pass
+            elif altlocs[i] == " " and element \
+                    and element.capitalize() in atom_weights \
+                    and name not in residue.child_dict \
+                    and not residue.is_disordered() == 2:
+                atom = Atom(name, coords[i], b_factors[i], occupancies[i],
+                            " ", fullnames[i], serial_numbers[i], element)
+                atom.parent = residue
+                residue.child_list.append(atom)
+                residue.child_dict[name] = atom
+                self.atom = atom
+            else:
+                self.set_line_counter(lines[i])
+                try:
+                    self.init_atom(name, coords[i], b_factors[i],
+                                   occupancies[i], altlocs[i], fullnames[i],
+                                   serial_numbers[i], element)
+                except PDBConstructionException as message:
+                    if handle_exception is None:
+                        raise
+                    handle_exception(message, lines[i])
+            if anisous is not None and anisous[i] is not None:
+                self.set_anisou(anisous[i])
+            if siguijs is not None and siguijs[i] is not None:
+                self.set_siguij(siguijs[i])
+            if sigatms is not None and sigatms[i] is not None:
+                self.set_sigatm(sigatms[i])
+
     def set_anisou(self, anisou_array):
         """Set anisotropic B factor of current Atom."""
         self.atom.set_anisou(anisou_array)
@@ -0,0 +1,609 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+
+"""Bulk loading of structure files, with an on-disk cache.
+
+The load_structures function parses all PDB and mmCIF files in a
+directory (or a list of files), optionally using a pool of worker
+processes, and yields the Structure objects in order:
+
+    >>> from Bio.PDB.StructureCache import load_structures
+    >>> for filename, structure in load_structures(["PDB/1A8O.pdb"]):
+    ...     print("%s %i" % (structure.id, len(list(structure.get_atoms()))))
+    1A8O 644
+
+If a StructureCache is given, each parsed structure is stored in a
+compact binary file in the cache directory, keyed by the absolute path,
+modification time and size of the structure file and the parser
+options. Later runs load the structure from there, which is several
+times faster than parsing the file again. A maximum total size can be
+set for the cache; the least recently used entries are then removed
+once it grows larger:
+
+    >>> import shutil, tempfile
+    >>> from Bio.PDB.StructureCache import StructureCache
+    >>> directory = tempfile.mkdtemp()
+    >>> cache = StructureCache(directory, max_size=50000000)
+    >>> first = list(load_structures(["PDB/1A8O.pdb"], cache=cache))
+    >>> second = list(load_structures(["PDB/1A8O.pdb"], cache=cache))
+    >>> atom = second[0][1][0]["A"][152]["CA"]
+    >>> print("%s %0.3f" % (atom.get_full_id()[0], atom.bfactor))
+    1A8O 20.880
+    >>> shutil.rmtree(directory)
+
+Only the structure (with its header dictionary) is cached, so warnings
+from the parser are not repeated when it is loaded from the cache.
+Structures built by a user implemented StructureBuilder cannot be cached.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import warnings
+import zlib
+from io import BytesIO
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.PDB.")
+
+from Bio._py3k import basestring, unicode, _as_string
+
+from Bio.PDB.Atom import Atom, DisorderedAtom
+from Bio.PDB.Chain import Chain
+from Bio.PDB.MMCIFParser import MMCIFParser
+from Bio.PDB.Model import Model
+from Bio.PDB.PDBExceptions import PDBConstructionWarning
+from Bio.PDB.PDBParser import PDBParser
+from Bio.PDB.Residue import Residue, DisorderedResidue
+from Bio.PDB.Structure import Structure
+from Bio.PDB.StructureBuilder import StructureBuilder
+
+
+# Increase this whenever the encoding below changes, so that old cache
+# entries are no longer used.
+_FORMAT = 2
+
+# Start of each cache file
+_MAGIC = b"PDBCACHE"
+
+# File extensions picked up when loading a directory
+_EXTENSIONS = (".pdb", ".ent", ".cif")
+
+
+class StructureCache(object):
+    """Directory of parsed structures, stored in a compact binary format.
+
+    Each entry is a single file holding the layout of the hierarchy and
+    the atomic data as JSON, followed by the coordinates (and any
+    anisotropic B factors) as arrays in the NumPy .npy format, all
+    compressed with zlib. Nothing is unpickled, so whoever can write to
+    a shared cache directory cannot make later runs execute code.
+
+    Entries are keyed by the absolute path, modification time and size
+    of the structure file, together with the parser class and its
+    PERMISSIVE setting, so a changed file is parsed again.
+    """
+
+    suffix = ".pdbcache"
+
+    def __init__(self, directory, max_size=None):
+        """Create a StructureCache object.
+
+        Arguments:
+         - directory - name of the cache directory, created if needed
+         - max_size - optional maximum total size of the cache files in
+           bytes. When a new entry takes the cache over this size, the
+           least recently used entries are removed. Entries larger than
+           this on their own are not stored.
+
+        """
+        if max_size is not None and max_size < 0:
+            raise ValueError("Need a non-negative cache size, not %r"
+                             % max_size)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.directory = directory
+        self.max_size = max_size
+        self._size = None
+
+    def __repr__(self):
+        return "<StructureCache directory=%r max_size=%r>" \
+            % (self.directory, self.max_size)
+
+    # Private methods
+
+    def _key(self, filename, parser):
+        """Return the cache key for filename parsed by parser (PRIVATE)."""
+        builder = getattr(parser, "structure_builder",
+                          getattr(parser, "_structure_builder", None))
+        if type(builder) is not StructureBuilder:
+            raise ValueError("Structures built by a user implemented "
+                             "StructureBuilder cannot be cached")
+        stat = os.stat(filename)
+        return (_FORMAT, os.path.abspath(filename), stat.st_mtime,
+                stat.st_size, type(parser).__name__,
+                getattr(parser, "PERMISSIVE", None))
+
+    def _path(self, key):
+        """Return the name of the cache file for key (PRIVATE)."""
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest + self.suffix)
+
+    def _entries(self):
+        """Return (last use, size, path) for each cache file (PRIVATE)."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(self.suffix):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    # Removed by another process
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _read(self, key):
+        """Return the stored data for key, or None (PRIVATE).
+
+        The modification time of the cache file is updated, which is
+        used to find the least recently used entries.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as handle:
+                data = handle.read()
+            os.utime(path, None)
+        except (IOError, OSError):
+            return None
+        return data
+
+    def _write(self, key, data):
+        """Store data for key, then apply the size limit (PRIVATE)."""
+        if self.max_size is not None and len(data) > self.max_size:
+            # Would only remove all other entries, and then itself
+            return
+        path = self._path(key)
+        if self.max_size is not None and self._size is not None:
+            try:
+                # Replaced by the new entry
+                self._size -= os.path.getsize(path)
+            except OSError:
+                pass
+        handle, temp = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(handle, "wb") as output:
+                output.write(data)
+            try:
+                os.rename(temp, path)
+            except OSError:
+                # On Windows, rename does not replace an existing file
+                os.remove(path)
+                os.rename(temp, path)
+        except Exception:
+            if os.path.exists(temp):
+                os.remove(temp)
+            raise
+        if self.max_size is None:
+            return
+        if self._size is None:
+            self._size = sum(size for used, size, path in self._entries())
+        else:
+            self._size += len(data)
+        if self._size > self.max_size:
+            self._evict()
+
+    def _evict(self):
+        """Remove least recently used entries to fit max_size (PRIVATE)."""
+        entries = sorted(self._entries())
+        size = sum(entry[1] for entry in entries)
+        for used, entry_size, path in entries:
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # Removed by another process
+                pass
+            size -= entry_size
+        self._size = size
+
+    # Public methods
+
+    def get(self, filename, parser, structure_id=None):
+        """Return the cached structure for a file, or None.
+
+        Arguments:
+         - filename - name of the PDB or mmCIF file
+         - parser - the parser the structure would be parsed with
+         - structure_id - id for the structure (default the file name
+           without directory and extension)
+
+        """
+        if structure_id is None:
+            structure_id = _structure_id(filename)
+        key = self._key(filename, parser)
+        data = self._read(key)
+        if data is None:
+            return None
+        try:
+            return _loads(data, key, structure_id)
+        except Exception:
+            # Truncated, corrupted or from an incompatible version
+            return None
+
+    def put(self, filename, parser, structure):
+        """Store the structure parsed from a file in the cache.
+
+        Arguments:
+         - filename - name of the PDB or mmCIF file
+         - parser - the parser used for the file
+         - structure - the Structure object it returned
+
+        """
+        key = self._key(filename, parser)
+        self._write(key, _dumps(key, structure))
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        for used, size, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._size = 0
+
+
+def _structure_id(filename):
+    """Return the default structure id for a file name (PRIVATE)."""
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+def _default_parser(filename, parsers):
+    """Return a quiet batch mode parser for the file extension (PRIVATE)."""
+    if filename.lower().endswith(".cif"):
+        kind = "cif"
+    else:
+        kind = "pdb"
+    if kind not in parsers:
+        if kind == "cif":
+            parsers[kind] = MMCIFParser(QUIET=True, batch=True)
+        else:
+            parsers[kind] = PDBParser(QUIET=True, batch=True)
+    return parsers[kind]
+
+
+def _encode(structure):
+    """Return the content of a structure as lists and arrays (PRIVATE).
+
+    All atoms (including all alternative locations and all residues of
+    disordered residues) are numbered in order, and their data stored
+    in one list (or array) per attribute. The hierarchy refers to the
+    atoms and residues by their number, disordered atoms and residues
+    being given as a tuple of the selected id and the numbers of their
+    children.
+    """
+    atoms = []
+    residues = []
+
+    def encode_residue(residue):
+        children = []
+        for atom in residue.child_list:
+            if atom.is_disordered() == 2:
+                numbers = []
+                for child in atom.disordered_get_list():
+                    numbers.append(len(atoms))
+                    atoms.append(child)
+                children.append((atom.selected_child.altloc,
+                                 atom.last_occupancy, numbers))
+            else:
+                children.append(len(atoms))
+                atoms.append(atom)
+        residues.append((residue.id, residue.resname, residue.segid,
+                         residue.disordered, children))
+        return len(residues) - 1
+
+    models = []
+    for model in structure.child_list:
+        chains = []
+        for chain in model.child_list:
+            children = []
+            for residue in chain.child_list:
+                if residue.is_disordered() == 2:
+                    numbers = [encode_residue(child)
+                               for child in residue.disordered_get_list()]
+                    children.append((residue.selected_child.resname,
+                                     numbers))
+                else:
+                    children.append(encode_residue(residue))
+            chains.append((chain.id, children))
+        models.append((model.id, model.serial_num, chains))
+
+    columns = {}
+    for name in ("name", "fullname", "altloc", "serial_number", "element",
+                 "disordered_flag", "bfactor", "occupancy"):
+        columns[name] = [getattr(atom, name) for atom in atoms]
+    if atoms:
+        columns["coord"] = numpy.array([atom.coord for atom in atoms])
+    else:
+        columns["coord"] = numpy.zeros((0, 3), "f")
+    for name in ("anisou_array", "siguij_array", "sigatm_array"):
+        numbers = [i for i, atom in enumerate(atoms)
+                   if getattr(atom, name) is not None]
+        if numbers:
+            columns[name] = (numbers, numpy.array([getattr(atoms[i], name)
+                                                   for i in numbers]))
+    return structure.header, models, residues, columns
+
+
+def _decode(structure_id, header, models, residues, columns):
+    """Build a Structure from the output of _encode (PRIVATE)."""
+    names = columns["name"]
+    fullnames = columns["fullname"]
+    altlocs = columns["altloc"]
+    serial_numbers = columns["serial_number"]
+    elements = columns["element"]
+    flags = columns["disordered_flag"]
+    bfactors = columns["bfactor"]
+    occupancies = columns["occupancy"]
+    coords = columns["coord"]
+    with warnings.catch_warnings():
+        # Elements which could not be assigned are guessed again
+        warnings.simplefilter("ignore", PDBConstructionWarning)
+        atoms = [Atom(names[i], coords[i], bfactors[i], occupancies[i],
+                      altlocs[i], fullnames[i], serial_numbers[i],
+                      elements[i])
+                 for i in range(len(names))]
+    for i, flag in enumerate(flags):
+        if flag:
+            atoms[i].disordered_flag = flag
+    for name in ("anisou_array", "siguij_array", "sigatm_array"):
+        if name in columns:
+            numbers, values = columns[name]
+            for i, value in zip(numbers, values):
+                setattr(atoms[i], name, value)
+
+    def decode_residue(number):
+        res_id, resname, segid, disordered, children = residues[number]
+        residue = Residue(res_id, resname, segid)
+        residue.disordered = disordered
+        child_list = residue.child_list
+        child_dict = residue.child_dict
+        for child in children:
+            if isinstance(child, tuple):
+                altloc, last_occupancy, numbers = child
+                atom = DisorderedAtom(atoms[numbers[0]].name)
+                for i in numbers:
+                    atoms[i].parent = residue
+                    atom[atoms[i].altloc] = atoms[i]
+                atom.disordered_select(altloc)
+                atom.last_occupancy = last_occupancy
+            else:
+                atom = atoms[child]
+            atom.parent = residue
+            child_list.append(atom)
+            child_dict[atom.id] = atom
+        return residue
+
+    structure = Structure(structure_id)
+    for model_id, serial_num, chains in models:
+        model = Model(model_id, serial_num)
+        structure.add(model)
+        for chain_id, children in chains:
+            chain = Chain(chain_id)
+            model.add(chain)
+            for child in children:
+                if isinstance(child, tuple):
+                    resname, numbers = child
+                    residue = DisorderedResidue(
+                        residues[numbers[0]][0])
+                    chain.add(residue)
+                    for number in numbers:
+                        residue.disordered_add(decode_residue(number))
+                    residue.disordered_select(resname)
+                else:
+                    chain.add(decode_residue(child))
+    structure.header = header
+    return structure
+
+
+def _to_json(value):
+    """Return value with its tuples and dictionaries tagged (PRIVATE).
+
+    JSON would otherwise turn tuples into lists, and dictionary keys into
+    strings.
+    """
+    if isinstance(value, list):
+        return [_to_json(item) for item in value]
+    elif isinstance(value, tuple):
+        return {"tuple": [_to_json(item) for item in value]}
+    elif isinstance(value, dict):
+        return {"dict": [[_to_json(k), _to_json(v)]
+                         for k, v in value.items()]}
+    return value
+
+
+def _from_json(value):
+    """Undo _to_json, after loading the JSON (PRIVATE)."""
+    if isinstance(value, list):
+        return [_from_json(item) for item in value]
+    elif isinstance(value, dict):
+        if "tuple" in value:
+            return tuple(_from_json(item) for item in value["tuple"])
+        return dict((_from_json(k), _from_json(v)) for k, v in value["dict"])
+    elif isinstance(value, unicode):
+        # Python 2 strings were loaded as unicode
+        return _as_string(value)
+    return value
+
+
+def _json_default(value):
+    """Convert NumPy scalars for JSON (PRIVATE)."""
+    if isinstance(value, numpy.generic):
+        return value.item()
+    raise TypeError("Cannot cache a value of type %s" % type(value).__name__)
+
+
+def _dumps(key, structure):
+    """Return a structure encoded as bytes for the cache (PRIVATE).
+
+    This is the JSON text (preceded by its length) followed by the arrays
+    in the NumPy .npy format, all compressed with zlib.
+    """
+    header, models, residues, columns = _encode(structure)
+    arrays = [columns.pop("coord")]
+    for name in ("anisou_array", "siguij_array", "sigatm_array"):
+        if name in columns:
+            columns[name], values = columns[name]
+            arrays.append(values)
+    # The columns are flat lists, so these need no tagging
+    text = json.dumps([_to_json([key, header, models, residues]), columns,
+                       len(arrays)], default=_json_default).encode("utf-8")
+    handle = BytesIO()
+    handle.write(struct.pack("<Q", len(text)))
+    handle.write(text)
+    for array in arrays:
+        numpy.save(handle, array, allow_pickle=False)
+    return _MAGIC + zlib.compress(handle.getvalue(), 1)
+
+
+def _loads(data, key, structure_id):
+    """Return the structure in data, checking the key (PRIVATE)."""
+    if not data.startswith(_MAGIC):
+        raise ValueError("Not a structure cache entry")
+    handle = BytesIO(zlib.decompress(data[len(_MAGIC):]))
+    length, = struct.unpack("<Q", handle.read(8))
+    content, columns, count = json.loads(handle.read(length).decode("utf-8"))
+    stored_key, header, models, residues = _from_json(content)
+    if stored_key != key:
+        raise ValueError("Cache entry does not match %r" % (key,))
+    arrays = [numpy.load(handle, allow_pickle=False) for i in range(count)]
+    columns["coord"] = arrays.pop(0)
+    for name in ("anisou_array", "siguij_array", "sigatm_array"):
+        if name in columns:
+            columns[name] = (columns[name], arrays.pop(0))
+    if str is not unicode:
+        # Python 2, use plain strings as when parsing
+        for name in ("name", "fullname", "altloc", "element"):
+            columns[name] = _from_json(columns[name])
+    return _decode(structure_id, header, models, residues, columns)
+
+
+# Set in each worker process of load_structures
+_worker_state = None
+
+
+def _init_worker(parser, cache):
+    """Store the parser and cache in a worker process (PRIVATE)."""
+    global _worker_state
+    _worker_state = (parser, cache, {})
+
+
+def _load_encoded(filename):
+    """Return (key, data, cached) for a file, in a worker (PRIVATE).
+
+    The encoded structure is read from the cache if possible, and
+    otherwise parsed. It is returned in the compact cache format, which
+    is much faster to send to the main process than a pickled Structure.
+    """
+    parser, cache, parsers = _worker_state
+    if parser is None:
+        parser = _default_parser(filename, parsers)
+    if cache is not None:
+        key = cache._key(filename, parser)
+        data = cache._read(key)
+        if data is not None:
+            return key, data, True
+    else:
+        key = None
+    structure = parser.get_structure(_structure_id(filename), filename)
+    return key, _dumps(key, structure), False
+
+
+def _load_many(filenames, parser, cache, processes, chunksize):
+    """Yield (filename, structure) using a process pool (PRIVATE)."""
+    import multiprocessing
+    pool = multiprocessing.Pool(processes, _init_worker, (parser, cache))
+    try:
+        results = pool.imap(_load_encoded, filenames, chunksize)
+        for filename, (key, data, cached) in zip(filenames, results):
+            structure_id = _structure_id(filename)
+            structure = None
+            if cached:
+                try:
+                    structure = _loads(data, key, structure_id)
+                except Exception:
+                    # Unusable cache entry, parse the file here instead
+                    structure = _load(filename, parser, cache, {})
+            else:
+                structure = _loads(data, key, structure_id)
+                if cache is not None:
+                    cache._write(key, data)
+            yield filename, structure
+    finally:
+        pool.terminate()
+
+
+def _load(filename, parser, cache, parsers):
+    """Return the structure in a file, using the cache if any (PRIVATE)."""
+    if parser is None:
+        parser = _default_parser(filename, parsers)
+    structure_id = _structure_id(filename)
+    if cache is not None:
+        structure = cache.get(filename, parser, structure_id)
+        if structure is not None:
+            return structure
+    structure = parser.get_structure(structure_id, filename)
+    if cache is not None:
+        cache.put(filename, parser, structure)
+    return structure
+
+
+def load_structures(source, parser=None, cache=None, processes=1,
+                    chunksize=1):
+    """Parse many PDB or mmCIF files, as an iterator.
+
+    Arguments:
+     - source - name of a directory, in which case all files ending in
+       .pdb, .ent or .cif (in any case) are loaded in alphabetical
+       order, or a list of file names
+     - parser - the parser to use for all files. By default a
+       PDBParser or MMCIFParser is chosen from the file extension, both
+       with QUIET and batch set.
+     - cache - optional StructureCache object, or the name of a cache
+       directory
+     - processes - number of worker processes used to parse the files
+       (default 1, i.e. parse them here)
+     - chunksize - number of files sent to a worker process at a time
+
+    This yields a (filename, structure) tuple for each file, in order.
+    The id of each structure is its file name without the directory and
+    extension. With processes > 1 any parser given must be picklable,
+    and as usual with the multiprocessing module, on Windows this needs
+    to be called from within an ``if __name__ == "__main__":`` block.
+    """
+    if processes < 1:
+        raise ValueError("Need at least one process, not %r" % processes)
+    if chunksize < 1:
+        raise ValueError("Need a positive chunk size, not %r" % chunksize)
+    if isinstance(source, basestring):
+        filenames = sorted(os.path.join(source, name)
+                           for name in os.listdir(source)
+                           if name.lower().endswith(_EXTENSIONS))
+    else:
+        filenames = list(source)
+    if isinstance(cache, basestring):
+        cache = StructureCache(cache)
+    if processes == 1:
+        parsers = {}
+        return ((filename, _load(filename, parser, cache, parsers))
+                for filename in filenames)
+    return _load_many(filenames, parser, cache, processes, chunksize)
@@ -10,6 +10,7 @@ from __future__ import print_function
 import numpy
 
 from Bio.SVDSuperimposer import SVDSuperimposer
+from Bio.PDB.AtomArray import _transform_atoms
 from Bio.PDB.PDBExceptions import PDBException
 
 
@@ -46,11 +47,14 @@ class Superimposer(object):
         self.rotran = sup.get_rotran()
 
     def apply(self, atom_list):
-        """Rotate/translate a list of atoms."""
+        """Rotate/translate a list of atoms.
+
+        Atoms held in an AtomArray are transformed together with a
+        single matrix multiplication per array.
+        """
         if self.rotran is None:
             raise PDBException("No transformation has been calculated yet")
         rot, tran = self.rotran
         rot = rot.astype('f')
         tran = tran.astype('f')
-        for atom in atom_list:
-            atom.transform(rot, tran)
+        _transform_atoms(atom_list, rot, tran)
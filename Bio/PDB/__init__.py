@@ -35,6 +35,13 @@ from .PDBIO import PDBIO, Select
 # from a list of Atoms.
 from . import Selection
 
+# Columnar NumPy storage of the atoms in a Structure
+from .AtomArray import AtomArray
+
+from .StructureCache import StructureCache, load_structures
+
+from .CellList import CellList, CellNeighborSearch
+
 # Superimpose atom sets
 from .Superimposer import Superimposer
 
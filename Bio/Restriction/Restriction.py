@@ -84,11 +84,14 @@ Notes about the diverses class of the restriction enzyme implementation::
 
 from __future__ import print_function
 
+import sys
+import types
 import warnings
 
 from Bio._py3k import zip
 from Bio._py3k import filter
 from Bio._py3k import range
+from Bio._py3k import basestring
 
 import re
 import itertools
@@ -237,6 +240,231 @@ class FormattedSeq(object):
         return self.klass(self.data[i], self.alphabet)
 
 
+# Matches the recognition site pattern for one strand of an enzyme, e.g.
+# (?P<EcoRI>GAATTC) giving the site GAATTC
+_compsite_site = re.compile(r"^\(\?P<\w+>((?:\[[ACGT]+\]|[ACGT.])+)\)$")
+
+
+def _site_letters(site):
+    """Split a recognition site regular expression into positions (PRIVATE).
+
+    The compiled sites use only the letters ACGT, character classes such
+    as [AG], and the dot for any letter. Returns a list with a string of
+    the allowed letters for each position, or None for a dot.
+
+    >>> _site_letters("GA.TC")
+    ['G', 'A', None, 'T', 'C']
+    >>> _site_letters("[AG]AATT[CT]")
+    ['AG', 'A', 'A', 'T', 'T', 'CT']
+    """
+    return [None if letters == "." else letters.strip("[]")
+            for letters in re.findall(r"\[[ACGT]+\]|[ACGT.]", site)]
+
+
+class _SiteScanner(object):
+    """Find the sites of many recognition patterns in one pass (PRIVATE).
+
+    Rather than one regular expression search over the sequence for each
+    recognition site, this uses an Aho-Corasick automaton built from a
+    short unambiguous part (the anchor) of each site. Sites with some
+    ambiguity (e.g. [AG]AATT[CT]) are expanded into all their variants,
+    while for sites with any N (e.g. GAANNNNTTC) the anchor is the most
+    specific stretch of the site, and any matches are confirmed using
+    the site's regular expression.
+
+    The sites found are those the regular expression finditer method
+    would give, i.e. no overlapping sites for the same pattern.
+    """
+
+    # Maximum number of variants of an anchor when expanding ambiguities
+    max_variants = 16
+
+    def __init__(self, sites):
+        """Build the automaton from an iterable of site regular expressions."""
+        self.sites = set(sites)
+        self.size = 0
+        # Aho-Corasick trie, as a list of transition dictionaries,
+        # plus the list of (site, offset, verify) outputs for each node:
+        goto = [{}]
+        out = [[]]
+        for site in self.sites:
+            if not re.match(r"^(\[[ACGT]+\]|[ACGT.])+$", site):
+                raise ValueError("Unexpected recognition site %r" % site)
+            letters = _site_letters(site)
+            self.size = max(self.size, len(letters))
+            start, end = self._anchor(letters)
+            if start == 0 and end == len(letters):
+                # The variants are the complete site, no need to check them
+                verify = None
+            else:
+                verify = re.compile(site).match
+            for variant in itertools.product(*letters[start:end]):
+                node = 0
+                for letter in variant:
+                    try:
+                        node = goto[node][letter]
+                    except KeyError:
+                        goto.append({})
+                        out.append([])
+                        goto[node][letter] = len(goto) - 1
+                        node = len(goto) - 1
+                # Offset from the end of the anchor to the start of the site
+                out[node].append((site, end - 1, verify))
+        # Breadth first traversal to add the failure transitions, turning
+        # the trie into a deterministic automaton over the letters ACGT
+        # (any other letter, e.g. N, returns to the root node):
+        fail = [0] * len(goto)
+        queue = []
+        for letter in "ACGT":
+            if letter in goto[0]:
+                queue.append(goto[0][letter])
+            else:
+                goto[0][letter] = 0
+        for node in queue:
+            # Note this loop includes the nodes appended to the queue
+            out[node].extend(out[fail[node]])
+            for letter in "ACGT":
+                if letter in goto[node]:
+                    child = goto[node][letter]
+                    fail[child] = goto[fail[node]][letter]
+                    queue.append(child)
+                else:
+                    goto[node][letter] = goto[fail[node]][letter]
+        self._goto = goto
+        self._out = [tuple(o) for o in out]
+
+    def _anchor(self, letters):
+        """Choose the anchor for a site, returns start and end (PRIVATE).
+
+        This is the whole site if it has no N and expands to a small
+        enough number of variants, otherwise the longest stretch with
+        no N and only a few variants (preferring the less ambiguous).
+        """
+        max_variants = self.max_variants
+        if None not in letters:
+            variants = 1
+            for letter in letters:
+                variants *= len(letter)
+            if variants <= max_variants * 4:
+                return 0, len(letters)
+        best = None
+        for start in range(len(letters)):
+            variants = 1
+            end = start
+            while end < len(letters) and letters[end] is not None and \
+                    variants * len(letters[end]) <= max_variants:
+                variants *= len(letters[end])
+                end += 1
+            if end > start and (best is None or
+                                (end - start, -variants) > best[0]):
+                best = (end - start, -variants), start, end
+        return best[1:]
+
+    def scan(self, data):
+        """Return a dictionary of site pattern to list of start positions.
+
+        The positions are python indices in the data string. For each site
+        they are sorted and may overlap.
+        """
+        goto = self._goto
+        out = self._out
+        hits = dict((site, []) for site in self.sites)
+        node = 0
+        for index, letter in enumerate(data):
+            try:
+                node = goto[node][letter]
+            except KeyError:
+                # Not ACGT, e.g. an ambiguous base or the leading space
+                node = 0
+                continue
+            if out[node]:
+                for site, offset, verify in out[node]:
+                    start = index - offset
+                    if start >= 0 and (verify is None or verify(data, start)):
+                        hits[site].append(start)
+        return hits
+
+
+def _non_overlapping(starts, size, limit):
+    """Filter sorted site positions as done by the finditer method (PRIVATE).
+
+    Only positions where the site ends before the limit are used, and
+    any which overlap the previous site are skipped.
+
+    >>> _non_overlapping([1, 2, 5, 6, 9, 12], 4, 14)
+    [1, 5, 9]
+    """
+    result = []
+    next_start = 0
+    for start in starts:
+        if start + size > limit:
+            break
+        if start >= next_start:
+            result.append(start)
+            next_start = start + size
+    return result
+
+
+_chunk_scanner = None
+
+
+def _scan_chunk(args):
+    """Find the recognition sites in a chunk of a sequence (PRIVATE).
+
+    Used by RestrictionBatch.search_many (in worker processes when running
+    in parallel), where args is a tuple of the site patterns, the chunk of
+    the sequence string, the offset of the chunk in the sequence, and how
+    many bases of the chunk to report sites from (the rest of the chunk
+    overlaps with the next one). Returns a dictionary of site pattern to
+    list of all the (possibly overlapping) site locations in the sequence.
+    """
+    global _chunk_scanner
+    sites, data, offset, step = args
+    if len(sites) < RestrictionBatch._min_scanner_size:
+        # Simpler and faster to use a regular expression for each site,
+        # using a lookahead to find any overlapping sites too:
+        hits = dict((site, [m.start() for m in
+                            re.finditer("(?=%s)" % site, data)])
+                    for site in sites)
+    else:
+        if _chunk_scanner is None or _chunk_scanner.sites != set(sites):
+            _chunk_scanner = _SiteScanner(sites)
+        hits = _chunk_scanner.scan(data)
+    return dict((site, [offset + s for s in starts if s < step])
+                for site, starts in hits.items() if starts)
+
+
+class _SequenceShape(object):
+    """The length and topology of a FormattedSeq (PRIVATE).
+
+    Working out the cutting sites from the locations of the recognition
+    sites only needs these, so RestrictionBatch.search_many sends this to
+    its worker processes rather than the (possibly very long) sequence.
+    """
+
+    def __init__(self, fseq):
+        self.length = len(fseq)
+        self.linear = fseq.is_linear()
+
+    def __len__(self):
+        return self.length
+
+    def is_linear(self):
+        return self.linear
+
+
+def _cut_group(args):
+    """Find the cutting sites of a group of enzymes in a sequence (PRIVATE).
+
+    Used by RestrictionBatch.search_many in worker processes, where args is
+    a tuple of the _SequenceShape of the sequence, a dictionary of the
+    enzymes and their site patterns, and the locations of the site
+    patterns in the sequence (as found by the _scan_chunk function).
+    """
+    shape, enzyme_sites, hits = args
+    return RestrictionBatch._cuts_from_sites(shape, enzyme_sites, [], hits)
+
+
 class RestrictionType(type):
     """RestrictionType. Type from which all enzyme classes are derived.
 
@@ -568,7 +796,7 @@ class AbstractCut(RestrictionType):
         Equischizomer: same site, same position of restriction.
         """
         if not batch:
-            batch = AllEnzymes
+            batch = _all_enzymes()
         r = [x for x in batch if not cls != x]
         i = r.index(cls)
         del r[i]
@@ -585,7 +813,7 @@ class AbstractCut(RestrictionType):
         Neoschizomer: same site, different position of restriction.
         """
         if not batch:
-            batch = AllEnzymes
+            batch = _all_enzymes()
         r = sorted(x for x in batch if cls >> x)
         return r
 
@@ -597,7 +825,7 @@ class AbstractCut(RestrictionType):
         If batch is supplied it is used instead of the default AllEnzymes.
         """
         if not batch:
-            batch = AllEnzymes
+            batch = _all_enzymes()
         r = [x for x in batch if (cls >> x) or (not cls != x)]
         i = r.index(cls)
         del r[i]
@@ -910,7 +1138,19 @@ class Palindromic(AbstractCut):
         Implement the search method for palindromic enzymes.
         """
         siteloc = cls.dna.finditer(cls.compsite, cls.size)
-        cls.results = [r for s, g in siteloc for r in cls._modify(s)]
+        return cls._cut_sites([s for s, g in siteloc])
+
+    @classmethod
+    def _cut_sites(cls, sites, rev_sites=()):
+        """Return a list of cutting sites given the site locations (PRIVATE).
+
+        For internal use only.
+
+        Turns the locations of the recognition sites in cls.dna into the
+        cutting sites of the enzyme. Palindromic sites have no separate
+        matches on the reverse strand, so rev_sites is ignored.
+        """
+        cls.results = [r for s in sites for r in cls._modify(s)]
         if cls.results:
             cls._drop()
         return cls.results
@@ -941,19 +1181,27 @@ class NonPalindromic(AbstractCut):
         compsite_for, compsite_rev = cls.compsite.pattern.split('|')
         iterator_for = cls.dna.finditer(compsite_for, cls.size)
         iterator_rev = cls.dna.finditer(compsite_rev, cls.size)
-        cls.results = []
+        s = str(cls)
+        sites = [start for start, group in iterator_for if group(s)]
+        s += '_as'
+        rev_sites = [start for start, group in iterator_rev if group(s)]
+        return cls._cut_sites(sites, rev_sites)
+
+    @classmethod
+    def _cut_sites(cls, sites, rev_sites):
+        """Return a list of cutting sites given the site locations (PRIVATE).
+
+        For internal use only.
+
+        Turns the locations of the recognition sites in cls.dna, on the
+        forward strand (sites) and on the reverse strand (rev_sites), into
+        the cutting sites of the enzyme.
+        """
         modif = cls._modify
         revmodif = cls._rev_modify
-        s = str(cls)
         cls.on_minus = []
-
-        for start, group in iterator_for:
-            if group(s):
-                cls.results += [r for r in modif(start)]
-        s += '_as'
-        for start, group in iterator_rev:
-            if group(s):
-                cls.results += [r for r in revmodif(start)]
+        cls.results = [r for start in sites for r in modif(start)]
+        cls.results += [r for start in rev_sites for r in revmodif(start)]
 
         if cls.results:
             cls.results.sort()
@@ -1172,8 +1420,8 @@ class Blunt(AbstractCut):
     def compatible_end(cls, batch=None):
         """List all enzymes that produce compatible ends for the enzyme."""
         if not batch:
-            batch = AllEnzymes
-        r = sorted(x for x in iter(AllEnzymes) if x.is_blunt())
+            batch = _all_enzymes()
+        r = sorted(x for x in iter(_all_enzymes()) if x.is_blunt())
         return r
 
     @staticmethod
@@ -1300,8 +1548,8 @@ class Ov5(AbstractCut):
     def compatible_end(cls, batch=None):
         """List all enzymes that produce compatible ends for the enzyme."""
         if not batch:
-            batch = AllEnzymes
-        r = sorted(x for x in iter(AllEnzymes) if x.is_5overhang() and
+            batch = _all_enzymes()
+        r = sorted(x for x in iter(_all_enzymes()) if x.is_5overhang() and
                    x % cls)
         return r
 
@@ -1432,8 +1680,8 @@ class Ov3(AbstractCut):
     def compatible_end(cls, batch=None):
         """List all enzymes that produce compatible ends for the enzyme."""
         if not batch:
-            batch = AllEnzymes
-        r = sorted(x for x in iter(AllEnzymes) if x.is_3overhang() and
+            batch = _all_enzymes()
+        r = sorted(x for x in iter(_all_enzymes()) if x.is_3overhang() and
                    x % cls)
         return r
 
@@ -1991,10 +2239,14 @@ class Not_available(AbstractCut):
 class RestrictionBatch(set):
     """Class for operations on more than one enzyme."""
 
+    # Below this many enzymes, search for each enzyme's sites separately
+    _min_scanner_size = 20
+
     def __init__(self, first=(), suppliers=()):
         """Initialize empty RB or pre-fill with enzymes (from supplier)."""
         first = [self.format(x) for x in first]
-        first += [eval(x) for n in suppliers for x in suppliers_dict[n][1]]
+        first += [_get_enzyme(x)
+                  for n in suppliers for x in suppliers_dict[n][1]]
         set.__init__(self, first)
         self.mapping = dict.fromkeys(self)
         self.already_mapped = None
@@ -2079,7 +2331,7 @@ class RestrictionBatch(set):
         supplier = suppliers_dict[letter]
         self.suppliers.append(letter)
         for x in supplier[1]:
-            self.add_nocheck(eval(x))
+            self.add_nocheck(_get_enzyme(x))
         return
 
     def current_suppliers(self):
@@ -2141,6 +2393,8 @@ class RestrictionBatch(set):
         try:
             if isinstance(y, RestrictionType):
                 return y
+            elif str(y) in _enzyme_types:
+                return _get_enzyme(str(y))
             elif isinstance(eval(str(y)), RestrictionType):
                 return eval(y)
             else:
@@ -2154,7 +2408,7 @@ class RestrictionBatch(set):
 
         True if y or eval(y) is a RestrictionType.
         """
-        return (isinstance(y, RestrictionType) or
+        return (isinstance(y, RestrictionType) or str(y) in _enzyme_types or
                 isinstance(eval(str(y)), RestrictionType))
 
     def split(self, *classes, **bool):
@@ -2233,18 +2487,181 @@ class RestrictionBatch(set):
             else:
                 self.already_mapped = str(dna), linear
                 fseq = FormattedSeq(dna, linear)
-                self.mapping = dict((x, x.search(fseq)) for x in self)
+                self.mapping = self._search_all(fseq)
                 return self.mapping
         elif isinstance(dna, FormattedSeq):
             if (str(dna), dna.linear) == self.already_mapped:
                 return self.mapping
             else:
                 self.already_mapped = str(dna), dna.linear
-                self.mapping = dict((x, x.search(dna)) for x in self)
+                self.mapping = self._search_all(dna)
                 return self.mapping
         raise TypeError("Expected Seq or MutableSeq instance, got %s instead"
                         % type(dna))
 
+    def _search_all(self, fseq):
+        """Return a dic of cutting sites in the FormattedSeq (PRIVATE).
+
+        Rather than searching the sequence once for each enzyme (a regular
+        expression search for each recognition site), with enough enzymes
+        all the sites are found in one pass over the sequence using a
+        _SiteScanner, which is reused while the batch is unchanged.
+        """
+        if len(self) < self._min_scanner_size:
+            return dict((x, x.search(fseq)) for x in self)
+        enzyme_sites, others = self._enzyme_sites()
+        key = frozenset(site for sites in enzyme_sites.values()
+                        for site in sites)
+        scanner = getattr(self, "_scanner", None)
+        if scanner is None or scanner.sites != key:
+            scanner = self._scanner = _SiteScanner(key)
+        data = fseq.data
+        if not fseq.is_linear():
+            data += data[1:scanner.size]
+        hits = scanner.scan(data)
+        return self._cuts_from_sites(fseq, enzyme_sites, others, hits)
+
+    def _enzyme_sites(self):
+        """Return the site patterns of each enzyme for a _SiteScanner (PRIVATE).
+
+        Returns a dictionary of enzymes to their list of recognition site
+        patterns (one for palindromic enzymes, else forward and reverse),
+        and a list of any other enzymes which must be searched separately.
+        """
+        enzyme_sites = {}
+        others = []
+        for enzyme in self:
+            sites = [_compsite_site.match(pattern)
+                     for pattern in enzyme.compsite.pattern.split("|")]
+            expected = 1 if enzyme.is_palindromic() else 2
+            if None in sites or len(sites) != expected:
+                # Not a pattern we expect, search this enzyme separately
+                others.append(enzyme)
+            else:
+                enzyme_sites[enzyme] = [site.group(1) for site in sites]
+        return enzyme_sites, others
+
+    @staticmethod
+    def _cuts_from_sites(fseq, enzyme_sites, others, hits):
+        """Return a dic of cutting sites given the recognition sites (PRIVATE).
+
+        The hits are a dictionary of site patterns to sorted lists of all
+        the (possibly overlapping) locations of that site in fseq. Only the
+        other enzymes are searched for in fseq, so for the rest this can be
+        a _SequenceShape.
+        """
+        mapping = dict((x, x.search(fseq)) for x in others)
+        for enzyme, sites in enzyme_sites.items():
+            # Sites must end within the sequence (which in the data string
+            # follows a leading space), or within the start of the
+            # sequence repeated after it if circular
+            limit = len(fseq) + 1
+            if not fseq.is_linear():
+                limit += min(enzyme.size - 1, len(fseq))
+            enzyme.dna = fseq
+            mapping[enzyme] = enzyme._cut_sites(
+                *[_non_overlapping(hits.get(site, []),
+                                   len(_site_letters(site)), limit)
+                  for site in sites])
+        return mapping
+
+    def search_many(self, records, linear=True, processes=1,
+                    chunk_size=1000000):
+        """Search many sequences, iterating over (record, dic) pairs.
+
+        This is intended for digesting many (possibly long) sequences, such
+        as whole genome assemblies. The records can be an iterable of
+        SeqRecord objects, or a FASTA filename or handle. For each record
+        this yields the record and a dictionary of the cutting sites of
+        each enzyme in the batch (as given by the search method).
+
+        Long sequences are split into overlapping chunks of about
+        chunk_size bases, and with processes > 1 these are searched in
+        parallel using a pool of worker processes. As usual with the
+        multiprocessing module, on Windows this needs to be called from
+        within an ``if __name__ == "__main__":`` block.
+
+        Unlike the search method, the results are not cached.
+        """
+        if processes < 1:
+            raise ValueError("Need at least one process, not %r" % processes)
+        if chunk_size < 1:
+            raise ValueError("Need a positive chunk size, not %r" % chunk_size)
+        if isinstance(records, basestring) or hasattr(records, "read"):
+            from Bio import SeqIO
+            records = SeqIO.parse(records, "fasta")
+        enzyme_sites, others = self._enzyme_sites()
+        sites = tuple(sorted(set(site for sites in enzyme_sites.values()
+                                 for site in sites)))
+        size = max([len(_site_letters(site)) for site in sites] + [1])
+
+        def merge(record, fseq, jobs):
+            hits = {}
+            for job in jobs:
+                if pool is None:
+                    job = _scan_chunk(job)
+                else:
+                    job = job.get()
+                for site, starts in job.items():
+                    hits.setdefault(site, []).extend(starts)
+            if pool is None:
+                return record, self._cuts_from_sites(fseq, enzyme_sites,
+                                                     others, hits)
+            # Working out the cuts from the sites takes as long as finding
+            # them, so split this up too (in groups of enzymes). This only
+            # needs the length of the sequence, not the sequence itself:
+            shape = _SequenceShape(fseq)
+            groups = [{} for i in range(processes)]
+            for i, enzyme in enumerate(sorted(enzyme_sites, key=str)):
+                groups[i % processes][enzyme] = enzyme_sites[enzyme]
+            jobs = []
+            for group in groups:
+                group_hits = dict((site, hits[site])
+                                  for sites in group.values()
+                                  for site in sites if site in hits)
+                jobs.append(pool.apply_async(_cut_group,
+                                             ((shape, group, group_hits),)))
+            # Any other enzymes are searched for in the whole sequence here
+            mapping = dict((x, x.search(fseq)) for x in others)
+            for job in jobs:
+                mapping.update(job.get())
+            return record, mapping
+
+        if processes == 1:
+            pool = None
+        else:
+            import multiprocessing
+            pool = multiprocessing.Pool(processes)
+        try:
+            pending = []
+            queued = 0
+            for record in records:
+                fseq = FormattedSeq(record.seq, linear)
+                data = fseq.data
+                if not linear:
+                    data += data[1:size]
+                # Each chunk overlaps the next by enough for any site which
+                # starts in this chunk (sites starting in the overlap are
+                # left for the next chunk):
+                jobs = [(sites, data[start:start + chunk_size + size - 1],
+                         start, chunk_size)
+                        for start in range(0, len(data), chunk_size)]
+                if pool is not None:
+                    jobs = [pool.apply_async(_scan_chunk, (job,))
+                            for job in jobs]
+                pending.append((record, fseq, jobs))
+                queued += len(jobs)
+                # Limit how many records and chunks are held in memory
+                while pending and (pool is None or queued > 2 * processes):
+                    record, fseq, jobs = pending.pop(0)
+                    queued -= len(jobs)
+                    yield merge(record, fseq, jobs)
+            for record, fseq, jobs in pending:
+                yield merge(record, fseq, jobs)
+        finally:
+            if pool is not None:
+                pool.terminate()
+
 ###############################################################################
 #                                                                             #
 #                       Restriction Analysis                                  #
@@ -2447,7 +2864,7 @@ class Analysis(RestrictionBatch, PrintFormat):
     def with_name(self, names, dct=None):
         """Return only results from enzymes which names are listed."""
         for i, enzyme in enumerate(names):
-            if enzyme not in AllEnzymes:
+            if enzyme not in _all_enzymes():
                 warnings.warn("no data for the enzyme: %s" % enzyme,
                               BiopythonWarning)
                 del names[i]
@@ -2564,9 +2981,8 @@ class Analysis(RestrictionBatch, PrintFormat):
 
 
 #
-#   The restriction enzyme classes are created dynamically when the module is
-#   imported. Here is the magic which allow the creation of the
-#   restriction-enzyme classes.
+#   The restriction enzyme classes are created dynamically. Here is the magic
+#   which allow the creation of the restriction-enzyme classes.
 #
 #   The reason for the two dictionaries in Restriction_Dictionary
 #   one for the types (which will be called pseudo-type as they really
@@ -2574,74 +2990,140 @@ class Analysis(RestrictionBatch, PrintFormat):
 #   and one for the enzymes is efficiency as the bases are evaluated
 #   once per pseudo-type.
 #
-#   However Restriction is still a very inefficient module at import. But
-#   remember that around 660 classes (which is more or less the size of Rebase)
-#   have to be created dynamically. However, this processing take place only
-#   once.
+#   Creating the 800 or so classes (which is more or less the size of Rebase)
+#   takes much longer than loading the dictionaries, and most scripts only
+#   use a handful of enzymes. Therefore each class is only created the first
+#   time it is used, i.e. when it is imported or accessed as an attribute of
+#   this module (or Bio.Restriction), or when a RestrictionBatch is given its
+#   name. AllEnzymes, CommOnly and NonComm create all the classes the first
+#   time they are used.
+#
 #   This inefficiency is however largely compensated by the use of metaclass
 #   which provide a very efficient layout for the class themselves mostly
 #   alleviating the need of if/else loops in the class methods.
 #
-#   It is essential to run Restriction with doc string optimisation (-OO
-#   switch) as the doc string of 660 classes take a lot of processing.
+#   The keys of typedict are the pseudo-types TYPE (stored as type1, type2...)
+#   The names are not important and are only present to differentiate
+#   the keys in the dict. All the pseudo-types are in fact RestrictionType.
+#   These names will not be used after and the pseudo-types are not
+#   kept in the module namespace. It is therefore impossible to
+#   import them.
+#   Now, if you have look at the dictionary, you will see that not all the
+#   types are present as those without corresponding enzymes have been
+#   removed by Dictionary_Builder().
 #
-CommOnly = RestrictionBatch()    # commercial enzymes
-NonComm = RestrictionBatch()     # not available commercially
-for TYPE, (bases, enzymes) in typedict.items():
-    #
-    #   The keys are the pseudo-types TYPE (stored as type1, type2...)
-    #   The names are not important and are only present to differentiate
-    #   the keys in the dict. All the pseudo-types are in fact RestrictionType.
-    #   These names will not be used after and the pseudo-types are not
-    #   kept in the locals() dictionary. It is therefore impossible to
-    #   import them.
-    #   Now, if you have look at the dictionary, you will see that not all the
-    #   types are present as those without corresponding enzymes have been
-    #   removed by Dictionary_Builder().
-    #
-    #   The values are tuples which contain
-    #   as first element a tuple of bases (as string) and
-    #   as second element the names of the enzymes.
+#   The values are tuples which contain
+#   as first element a tuple of bases (as string) and
+#   as second element the names of the enzymes.
+#
+#   _enzyme_types maps each enzyme name to its pseudo-type TYPE.
+#
+_enzyme_types = dict((k, TYPE) for TYPE, (bases, enzymes) in typedict.items()
+                     for k in enzymes)
+_pseudo_types = {}
+
+
+def _get_enzyme(name):
+    """Return the restriction enzyme class with this name (PRIVATE).
+
+    The class is created the first time it is needed, and added to the
+    module namespace. Raises a KeyError for unknown enzyme names.
+    """
+    try:
+        return globals()[name]
+    except KeyError:
+        TYPE = _enzyme_types[name]
+    try:
+        bases, T = _pseudo_types[TYPE]
+    except KeyError:
+        #
+        #   First eval the bases, then create the particular value of
+        #   RestrictionType for the classes of this pseudo-type.
+        #
+        bases = tuple(globals()[x] for x in typedict[TYPE][0])
+        T = type.__new__(RestrictionType, 'RestrictionType', bases, {})
+        _pseudo_types[TYPE] = bases, T
     #
-    #   First eval the bases.
+    #   enzymedict[name] contains the values of the attributes for this
+    #   particular class (self.site, self.ovhg,....).
     #
-    bases = tuple(eval(x) for x in bases)
+    enzyme = globals()[name] = T(name, bases, enzymedict[name])
+    return enzyme
+
+
+def _all_enzymes():
+    """Return AllEnzymes, creating all the enzyme classes if needed (PRIVATE).
+
+    Also defines CommOnly and NonComm.
+    """
+    try:
+        return globals()['AllEnzymes']
+    except KeyError:
+        pass
+    comm_only = RestrictionBatch()    # commercial enzymes
+    non_comm = RestrictionBatch()     # not available commercially
+    for TYPE, (bases, enzymes) in typedict.items():
+        for k in enzymes:
+            #
+            #   No need to verify the enzyme is a RestrictionType
+            #   -> add_nocheck
+            #
+            newenz = _get_enzyme(k)
+            if newenz.is_comm():
+                comm_only.add_nocheck(newenz)
+            else:
+                non_comm.add_nocheck(newenz)
     #
-    #   now create the particular value of RestrictionType for the classes
-    #   in enzymes.
+    #   AllEnzymes is a RestrictionBatch with all the enzymes from Rebase.
     #
-    T = type.__new__(RestrictionType, 'RestrictionType', bases, {})
-    for k in enzymes:
-        #
-        #   Now, we go through all the enzymes and assign them their type.
-        #   enzymedict[k] contains the values of the attributes for this
-        #   particular class (self.site, self.ovhg,....).
-        #
-        newenz = T(k, bases, enzymedict[k])
-        #
-        #   we add the enzymes to the corresponding batch.
-        #
-        #   No need to verify the enzyme is a RestrictionType -> add_nocheck
-        #
-        if newenz.is_comm():
-            CommOnly.add_nocheck(newenz)
+    all_enzymes = RestrictionBatch(comm_only)
+    all_enzymes.update(non_comm)
+    globals().update(CommOnly=comm_only, NonComm=non_comm,
+                     AllEnzymes=all_enzymes)
+    return all_enzymes
+
+
+class _EnzymeModule(types.ModuleType):
+    """Module creating the enzyme classes on first use (PRIVATE).
+
+    This replaces Bio.Restriction.Restriction (and Bio.Restriction) in
+    sys.modules, with a copy of the module namespace. Any enzymes and
+    batches not yet in that namespace are created by __getattr__, which
+    (unlike a module level __getattr__, see PEP 562) works with all the
+    supported versions of Python.
+    """
+
+    def __init__(self, module):
+        """Initialize the module from the namespace of the original one."""
+        types.ModuleType.__init__(self, module.__name__, module.__doc__)
+        self.__dict__.update(module.__dict__)
+        # Python 2 clears the namespace of a module when it is deleted,
+        # which would break the functions and classes defined in it
+        self.__dict__['_original_module'] = module
+
+    def __getattr__(self, name):
+        """Create the enzyme or batch called name (PRIVATE).
+
+        This is only called for names which are not yet in the module
+        namespace.
+        """
+        if name in _enzyme_types:
+            value = _get_enzyme(name)
+        elif name in ('AllEnzymes', 'CommOnly', 'NonComm'):
+            _all_enzymes()
+            value = globals()[name]
         else:
-            NonComm.add_nocheck(newenz)
-#
-#   AllEnzymes is a RestrictionBatch with all the enzymes from Rebase.
-#
-AllEnzymes = RestrictionBatch(CommOnly)
-AllEnzymes.update(NonComm)
-#
-#   Now, place the enzymes in locals so they can be imported.
-#
-names = [str(x) for x in AllEnzymes]
-try:
-    del x  # noqa
-except NameError:
-    # Scoping changed in Python 3, the variable isn't leaked
-    pass
-locals().update(dict(zip(names, AllEnzymes)))
+            raise AttributeError("module %r has no attribute %r"
+                                 % (self.__name__, name))
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self):
+        """List the module attributes, including the enzymes (PRIVATE)."""
+        return sorted(set(self.__dict__) | set(self.__all__))
+
+
 __all__ = ('FormattedSeq', 'Analysis', 'RestrictionBatch', 'AllEnzymes',
-           'CommOnly', 'NonComm') + tuple(names)
-del k, enzymes, TYPE, bases, names
+           'CommOnly', 'NonComm') + tuple(sorted(_enzyme_types))
+
+sys.modules[__name__] = _EnzymeModule(sys.modules[__name__])
@@ -54,7 +54,17 @@ Example:
 
 """
 
-from Bio.Restriction.Restriction import *  # noqa (legacy module arrangement)
+import sys
+
+from Bio.Restriction import Restriction as _Restriction
+from Bio.Restriction.Restriction import (  # noqa: F401 (re-exported)
+    FormattedSeq, Analysis, RestrictionBatch)
+
+__all__ = _Restriction.__all__
+
+# The enzymes and batches are only created when first used, as in
+# Bio.Restriction.Restriction (see there for details).
+sys.modules[__name__] = _Restriction._EnzymeModule(sys.modules[__name__])
 
 
 #
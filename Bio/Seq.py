@@ -20,6 +20,7 @@ from __future__ import print_function
 
 import string  # for maketrans only
 import array
+import binascii
 import sys
 import warnings
 
@@ -61,6 +62,28 @@ def _maketrans(complement_mapping):
 _dna_complement_table = _maketrans(ambiguous_dna_complement)
 _rna_complement_table = _maketrans(ambiguous_rna_complement)
 
+# PackedSeq stores each letter of IUPAC DNA as a 4-bit mask of the bases
+# it stands for (A=1, C=2, G=4, T=8, and 0 for a gap), two letters per byte.
+# Thus the hexadecimal digits of the packed bytes are the letters' masks,
+# and the complement of a mask is its bits reversed.
+_packed_letters = "-ACMGRSVTWYHKDBN"
+_packed_complements = "".join(
+    _packed_letters[int("{0:04b}".format(mask)[::-1], 2)]
+    for mask in range(16))
+if sys.version_info[0] == 3:
+    _pack_table = str.maketrans(
+        _packed_letters + "EF0123456789abcdef", "0123456789abcdef" + "x" * 18)
+    _unpack_table = bytes.maketrans(b"0123456789abcdef",
+                                    _packed_letters.encode("ascii"))
+    _unpack_complement_table = bytes.maketrans(
+        b"0123456789abcdef", _packed_complements.encode("ascii"))
+else:
+    _pack_table = string.maketrans(
+        _packed_letters + "EF0123456789abcdef", "0123456789abcdef" + "x" * 18)
+    _unpack_table = string.maketrans("0123456789abcdef", _packed_letters)
+    _unpack_complement_table = string.maketrans("0123456789abcdef",
+                                                _packed_complements)
+
 
 class Seq(object):
     """Read-only sequence object (essentially a string with an alphabet).
@@ -83,6 +106,10 @@ class Seq(object):
     not applicable to sequences with a protein alphabet).
     """
 
+    # No per instance dictionary (subclasses may still add one), which
+    # matters when holding millions of sequences in memory
+    __slots__ = ("_data", "alphabet")
+
     def __init__(self, data, alphabet=Alphabet.generic_alphabet):
         """Create a Seq object.
 
@@ -140,6 +167,19 @@ class Seq(object):
         """
         return self._data
 
+    def __getstate__(self):
+        """Return the attributes to pickle, as a dictionary."""
+        state = dict(getattr(self, "__dict__", {}))
+        for name in Seq.__slots__:
+            if hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        """Restore the pickled attributes (including from old pickles)."""
+        for name, value in state.items():
+            setattr(self, name, value)
+
     def __hash__(self):
         """Hash for comparison.
 
@@ -1062,62 +1102,14 @@ class Seq(object):
         if isinstance(Alphabet._get_base_alphabet(self.alphabet),
                       Alphabet.ProteinAlphabet):
             raise ValueError("Proteins cannot be translated!")
-        try:
-            table_id = int(table)
-        except ValueError:
-            # Assume its a table name
-            if self.alphabet == IUPAC.unambiguous_dna:
-                # Will use standard IUPAC protein alphabet, no need for X
-                codon_table = CodonTable.unambiguous_dna_by_name[table]
-            elif self.alphabet == IUPAC.unambiguous_rna:
-                # Will use standard IUPAC protein alphabet, no need for X
-                codon_table = CodonTable.unambiguous_rna_by_name[table]
-            else:
-                # This will use the extended IUPAC protein alphabet with X etc.
-                # The same table can be used for RNA or DNA (we use this for
-                # translating strings).
-                codon_table = CodonTable.ambiguous_generic_by_name[table]
-        except (AttributeError, TypeError):
-            # Assume its a CodonTable object
-            if isinstance(table, CodonTable.CodonTable):
-                codon_table = table
-            else:
-                raise ValueError('Bad table argument')
-        else:
-            # Assume its a table ID
-            if self.alphabet == IUPAC.unambiguous_dna:
-                # Will use standard IUPAC protein alphabet, no need for X
-                codon_table = CodonTable.unambiguous_dna_by_id[table_id]
-            elif self.alphabet == IUPAC.unambiguous_rna:
-                # Will use standard IUPAC protein alphabet, no need for X
-                codon_table = CodonTable.unambiguous_rna_by_id[table_id]
-            else:
-                # This will use the extended IUPAC protein alphabet with X etc.
-                # The same table can be used for RNA or DNA (we use this for
-                # translating strings).
-                codon_table = CodonTable.ambiguous_generic_by_id[table_id]
+        codon_table = _get_codon_table(table, self.alphabet)
 
         # Deal with gaps for translation
-        if hasattr(self.alphabet, "gap_char"):
-            if not gap:
-                gap = self.alphabet.gap_char
-            elif gap != self.alphabet.gap_char:
-                raise ValueError(
-                    "Gap {0!r} does not match {1!r} from alphabet".format(
-                        gap, self.alphabet.gap_char))
+        gap = _get_gap(self.alphabet, gap)
 
         protein = _translate_str(str(self), codon_table, stop_symbol, to_stop,
                                  cds, gap=gap)
-
-        if gap and gap in protein:
-            alphabet = Alphabet.Gapped(codon_table.protein_alphabet, gap)
-        else:
-            alphabet = codon_table.protein_alphabet
-
-        if stop_symbol in protein:
-            alphabet = Alphabet.HasStopCodon(alphabet, stop_symbol)
-
-        return Seq(protein, alphabet)
+        return _protein_seq(protein, codon_table, stop_symbol, gap)
 
     def ungap(self, gap=None):
         """Return a copy of the sequence without the gap character(s).
@@ -1697,6 +1689,197 @@ class UnknownSeq(Seq):
             return Seq("", s.alphabet)
 
 
+class PackedSeq(Seq):
+    """Read-only DNA sequence object stored in 4 bits per letter.
+
+    This holds IUPAC DNA sequences (upper case, including the ambiguous
+    bases such as N, and the gap character "-") in half a byte per letter,
+    rather than one byte as in an ordinary Seq object. With the fixed
+    overhead of each object, a 150 base read takes about a third less
+    memory, which is useful when holding millions of reads in memory. It
+    otherwise behaves like a Seq object:
+
+    >>> from Bio.Seq import PackedSeq
+    >>> my_dna = PackedSeq("ACGTNNRYAC-GT")
+    >>> my_dna
+    PackedSeq('ACGTNNRYAC-GT', DNAAlphabet())
+    >>> len(my_dna)
+    13
+    >>> print(my_dna)
+    ACGTNNRYAC-GT
+    >>> my_dna == "ACGTNNRYAC-GT"
+    True
+
+    Slices (with a step of 1 or -1), the complement and the reverse
+    complement are views sharing the packed data with the original, so
+    no copy of the sequence is made:
+
+    >>> my_dna[2:9]
+    PackedSeq('GTNNRYA', DNAAlphabet())
+    >>> my_dna.reverse_complement()
+    PackedSeq('AC-GTRYNNACGT', DNAAlphabet())
+    >>> my_dna.complement()[::-1] == my_dna.reverse_complement()
+    True
+
+    Most other methods, such as translate, return ordinary Seq objects.
+    Other letters, including lower case DNA, cannot be stored:
+
+    >>> PackedSeq("ACGTacgt")
+    Traceback (most recent call last):
+       ...
+    ValueError: PackedSeq can only hold upper case IUPAC DNA and gaps.
+    """
+
+    # No per instance dictionary, to keep millions of short reads small.
+    # The packed bytes go in the _data slot of Seq (as _data itself is
+    # replaced by a property below), and only views of another PackedSeq
+    # need the _start, _reverse and _complement slots of _PackedSeqView.
+    __slots__ = ("_length",)
+    _packed = Seq._data
+    _start = 0
+    _reverse = False
+    _complement = False
+
+    def __init__(self, data, alphabet=Alphabet.generic_dna):
+        """Create a PackedSeq object from a string of IUPAC DNA."""
+        if not isinstance(data, basestring):
+            raise TypeError("The sequence data given to a PackedSeq object "
+                            "should be a string (not another Seq object etc)")
+        if isinstance(Alphabet._get_base_alphabet(alphabet),
+                      (Alphabet.ProteinAlphabet, Alphabet.RNAAlphabet)):
+            raise ValueError("PackedSeq can only hold DNA, not %r"
+                             % alphabet)
+        masks = data.translate(_pack_table)
+        if len(masks) % 2:
+            masks += "0"
+        try:
+            self._packed = binascii.unhexlify(masks)
+        except (TypeError, ValueError, binascii.Error):
+            raise ValueError("PackedSeq can only hold upper case IUPAC DNA "
+                             "and gaps.")
+        self.alphabet = alphabet
+        self._length = len(data)
+
+    def _view(self, start, length, reverse, complement):
+        """Return a PackedSeq sharing the packed data of this one (PRIVATE).
+
+        The view holds the letters start to start + length of the packed
+        data, reversed and/or complemented as given.
+        """
+        view = _PackedSeqView.__new__(_PackedSeqView)
+        view.alphabet = self.alphabet
+        view._packed = self._packed
+        view._start = start
+        view._length = length
+        view._reverse = reverse
+        view._complement = complement
+        return view
+
+    @property
+    def _data(self):
+        """Return the sequence as a string, as held by Seq objects (PRIVATE)."""
+        return str(self)
+
+    def __len__(self):
+        """Return the length of the sequence, use len(my_seq)."""
+        return self._length
+
+    def __str__(self):
+        """Return the full sequence as a python string, use str(my_seq)."""
+        start, end = self._start, self._start + self._length
+        # Only unpack the bytes holding this part of the packed data
+        masks = binascii.hexlify(
+            memoryview(self._packed)[start // 2:(end + 1) // 2])
+        if self._complement:
+            letters = masks.translate(_unpack_complement_table)
+        else:
+            letters = masks.translate(_unpack_table)
+        if sys.version_info[0] == 3:
+            letters = letters.decode("ascii")
+        letters = letters[start % 2:start % 2 + self._length]
+        if self._reverse:
+            return letters[::-1]
+        return letters
+
+    def __repr__(self):
+        """Return (truncated) representation of the sequence for debugging."""
+        if len(self) > 60:
+            return "PackedSeq('{0}...{1}', {2!r})".format(
+                str(self[:54]), str(self[-3:]), self.alphabet)
+        return "PackedSeq({0!r}, {1!r})".format(str(self), self.alphabet)
+
+    def __reduce__(self):
+        """Pickle only the letters of this (possibly view) sequence."""
+        return (PackedSeq, (str(self), self.alphabet))
+
+    def __getitem__(self, index):
+        """Return a single letter, or a subsequence, use my_seq[index].
+
+        >>> my_dna = PackedSeq("ACGTTGCA")
+        >>> my_dna[1]
+        'C'
+        >>> my_dna[-2:1:-1]
+        PackedSeq('CGTTG', DNAAlphabet())
+        >>> my_dna[::2]
+        PackedSeq('AGTC', DNAAlphabet())
+        """
+        if isinstance(index, int):
+            if index < 0:
+                index += self._length
+            if not 0 <= index < self._length:
+                raise IndexError("sequence index out of range")
+            return str(self[index:index + 1])
+        start, stop, step = index.indices(self._length)
+        if step == -1:
+            # The same letters as the slice [stop + 1:start + 1], reversed
+            start, stop = stop + 1, start + 1
+        elif step != 1:
+            return PackedSeq(str(self)[index], self.alphabet)
+        length = max(0, stop - start)
+        if self._reverse:
+            start = self._length - start - length
+        return self._view(self._start + start, length,
+                          self._reverse != (step == -1), self._complement)
+
+    def __add__(self, other):
+        """Add another sequence or string to this sequence.
+
+        This returns an ordinary Seq object:
+
+        >>> PackedSeq("ACGT") + "AC"
+        Seq('ACGTAC', DNAAlphabet())
+        """
+        return Seq(str(self), self.alphabet) + other
+
+    def __radd__(self, other):
+        """Add a sequence on the left."""
+        return other + Seq(str(self), self.alphabet)
+
+    def complement(self):
+        """Return the complement sequence, sharing the packed data.
+
+        >>> PackedSeq("CCCCCGATAGNR").complement()
+        PackedSeq('GGGGGCTATCNY', DNAAlphabet())
+        """
+        return self._view(self._start, self._length, self._reverse,
+                          not self._complement)
+
+    def reverse_complement(self):
+        """Return the reverse complement sequence, sharing the packed data.
+
+        >>> PackedSeq("CCCCCGATAGNR").reverse_complement()
+        PackedSeq('YNCTATCGGGGG', DNAAlphabet())
+        """
+        return self._view(self._start, self._length, not self._reverse,
+                          not self._complement)
+
+
+class _PackedSeqView(PackedSeq):
+    """A slice and/or (reverse) complement of a PackedSeq (PRIVATE)."""
+
+    __slots__ = ("_start", "_reverse", "_complement")
+
+
 class MutableSeq(object):
     """An editable sequence object (with an alphabet).
 
@@ -2310,6 +2493,75 @@ def back_transcribe(rna):
         return rna.replace('U', 'T').replace('u', 't')
 
 
+def _get_codon_table(table, alphabet):
+    """Return the CodonTable to translate a sequence with (PRIVATE).
+
+    The table can be given as a name, an NCBI identifier or a CodonTable
+    object, as for the translate method of the Seq object, where alphabet
+    is the alphabet of the sequence.
+    """
+    try:
+        table_id = int(table)
+    except ValueError:
+        # Assume its a table name
+        if alphabet == IUPAC.unambiguous_dna:
+            # Will use standard IUPAC protein alphabet, no need for X
+            codon_table = CodonTable.unambiguous_dna_by_name[table]
+        elif alphabet == IUPAC.unambiguous_rna:
+            # Will use standard IUPAC protein alphabet, no need for X
+            codon_table = CodonTable.unambiguous_rna_by_name[table]
+        else:
+            # This will use the extended IUPAC protein alphabet with X etc.
+            # The same table can be used for RNA or DNA (we use this for
+            # translating strings).
+            codon_table = CodonTable.ambiguous_generic_by_name[table]
+    except (AttributeError, TypeError):
+        # Assume its a CodonTable object
+        if isinstance(table, CodonTable.CodonTable):
+            codon_table = table
+        else:
+            raise ValueError('Bad table argument')
+    else:
+        # Assume its a table ID
+        if alphabet == IUPAC.unambiguous_dna:
+            # Will use standard IUPAC protein alphabet, no need for X
+            codon_table = CodonTable.unambiguous_dna_by_id[table_id]
+        elif alphabet == IUPAC.unambiguous_rna:
+            # Will use standard IUPAC protein alphabet, no need for X
+            codon_table = CodonTable.unambiguous_rna_by_id[table_id]
+        else:
+            # This will use the extended IUPAC protein alphabet with X etc.
+            # The same table can be used for RNA or DNA (we use this for
+            # translating strings).
+            codon_table = CodonTable.ambiguous_generic_by_id[table_id]
+    return codon_table
+
+
+def _get_gap(alphabet, gap):
+    """Return the gap character to translate a sequence with (PRIVATE)."""
+    if hasattr(alphabet, "gap_char"):
+        if not gap:
+            gap = alphabet.gap_char
+        elif gap != alphabet.gap_char:
+            raise ValueError(
+                "Gap {0!r} does not match {1!r} from alphabet".format(
+                    gap, alphabet.gap_char))
+    return gap
+
+
+def _protein_seq(protein, codon_table, stop_symbol, gap):
+    """Return a translated protein string as a Seq object (PRIVATE)."""
+    if gap and gap in protein:
+        alphabet = Alphabet.Gapped(codon_table.protein_alphabet, gap)
+    else:
+        alphabet = codon_table.protein_alphabet
+
+    if stop_symbol in protein:
+        alphabet = Alphabet.HasStopCodon(alphabet, stop_symbol)
+
+    return Seq(protein, alphabet)
+
+
 def _translate_str(sequence, table, stop_symbol="*", to_stop=False,
                    cds=False, pos_stop="X", gap=None):
     """Translate nucleotide string into a protein string (PRIVATE).
@@ -2523,6 +2775,257 @@ def translate(sequence, table="Standard", stop_symbol="*", to_stop=False,
                               gap=gap)
 
 
+def translate_many(sequences, table="Standard", stop_symbol="*",
+                   to_stop=False, cds=False, gap=None,
+                   frames=(1, 2, 3, -1, -2, -3)):
+    """Translate many nucleotide sequences in several reading frames.
+
+    This is an iterator, yielding for each of the sequences a list of the
+    translations of the given frames, by default all six frames. Frames 1,
+    2 and 3 start at the first, second and third letter of the sequence,
+    and frames -1, -2 and -3 likewise on its reverse complement.
+
+    The translations are the same as those of the translate function (for
+    strings) or method (for Seq and MutableSeq objects, giving Seq objects)
+    using the same arguments. Unless cds is True, each frame is first
+    trimmed to whole codons, so there are no partial codon warnings.
+
+    >>> for frames in translate_many(["GTGGCCATTGTAATGGGCCGCTGA", "ATGCCC"]):
+    ...     print(frames)
+    ['VAIVMGR*', 'WPL*WAA', 'GHCNGPL', 'SAAHYNGH', 'QRPITMA', 'SGPLQWP']
+    ['MP', 'C', 'A', 'GH', 'G', 'A']
+    >>> print(next(translate_many(["GTGGCCATTGTAATGGGCCGCTGA"], table=2,
+    ...                           to_stop=True, frames=[1, -1])))
+    ['VAIVMGRW', 'SAAHYNGH']
+
+    If NumPy is installed, the codons of many sequences are translated at
+    once using a lookup array compiled for each codon table, which is much
+    faster than translating each sequence in turn.
+    """
+    if gap is not None:
+        if not isinstance(gap, basestring):
+            raise TypeError("Gap character should be a single character "
+                            "string.")
+        elif len(gap) > 1:
+            raise ValueError("Gap character should be a single character "
+                             "string.")
+    for frame in frames:
+        if frame not in (1, 2, 3, -1, -2, -3):
+            raise ValueError("Frame should be 1, 2, 3, -1, -2 or -3, not %r"
+                             % frame)
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+    batch = []
+    size = 0
+    for sequence in sequences:
+        if isinstance(sequence, MutableSeq):
+            sequence = sequence.toseq()
+        if isinstance(sequence, Seq):
+            if isinstance(Alphabet._get_base_alphabet(sequence.alphabet),
+                          Alphabet.ProteinAlphabet):
+                raise ValueError("Proteins cannot be translated!")
+            codon_table = _get_codon_table(table, sequence.alphabet)
+            seq_gap = _get_gap(sequence.alphabet, gap)
+            data = str(sequence).upper()
+        else:
+            codon_table = _get_codon_table(table, None)
+            seq_gap = gap
+            data = sequence.upper()
+        fragments = []
+        reverse = None
+        for frame in frames:
+            if frame < 0:
+                if reverse is None:
+                    if isinstance(sequence, Seq):
+                        reverse = str(sequence.reverse_complement()).upper()
+                    else:
+                        reverse = reverse_complement(data)
+                fragment = reverse[-frame - 1:]
+            else:
+                fragment = data[frame - 1:]
+            if not cds:
+                fragment = fragment[:len(fragment) - len(fragment) % 3]
+            fragments.append(fragment)
+        batch.append((sequence, codon_table, seq_gap, fragments))
+        size += len(data)
+        # Translate about a million bases at a time
+        if size >= 1000000:
+            for result in _translate_batch(batch, numpy, stop_symbol,
+                                           to_stop, cds):
+                yield result
+            batch = []
+            size = 0
+    for result in _translate_batch(batch, numpy, stop_symbol, to_stop, cds):
+        yield result
+
+
+def _translate_batch(batch, numpy, stop_symbol, to_stop, cds):
+    """Return the translations of a batch of sequences (PRIVATE).
+
+    Used by translate_many, where batch is a list of the sequences, their
+    codon tables and gap characters, and the nucleotide strings of the
+    frames to translate. This returns a list of the translations of each
+    sequence's frames, as strings for strings, else as Seq objects.
+    """
+    if numpy is None:
+        proteins = [[_translate_str(fragment, codon_table, stop_symbol,
+                                    to_stop, cds, gap=gap)
+                     for fragment in fragments]
+                    for sequence, codon_table, gap, fragments in batch]
+    else:
+        proteins = _translate_batch_numpy(batch, numpy, stop_symbol,
+                                          to_stop, cds)
+    results = []
+    for (sequence, codon_table, gap, fragments), translations in \
+            zip(batch, proteins):
+        if isinstance(sequence, Seq):
+            translations = [_protein_seq(protein, codon_table, stop_symbol,
+                                         gap)
+                            for protein in translations]
+        results.append(translations)
+    return results
+
+
+# The codon lookup arrays of the codon tables used by translate_many
+_codon_lookups = {}
+
+
+def _codon_lookup(codon_table, numpy):
+    """Return the codon lookup array of a CodonTable (PRIVATE).
+
+    The letters of the codons are coded as A=0, C=1, G=2, T=3, U=4, or 5
+    for any other letter (including ambiguous bases and gaps), giving the
+    index 36 * first + 6 * second + third into the lookup array. It holds
+    the (ASCII coded) amino acid of each codon, 1 for stop codons, or 0 for
+    any others which need to be translated by _translate_str.
+    """
+    try:
+        return _codon_lookups[id(codon_table)][1]
+    except KeyError:
+        pass
+    lookup = numpy.zeros(216, numpy.uint8)
+    letters = "ACGTU"
+    for i, first in enumerate(letters):
+        for j, second in enumerate(letters):
+            for k, third in enumerate(letters):
+                codon = first + second + third
+                try:
+                    amino_acid = codon_table.forward_table[codon]
+                except (KeyError, CodonTable.TranslationError):
+                    if codon in codon_table.stop_codons:
+                        lookup[36 * i + 6 * j + k] = 1
+                    continue
+                if len(amino_acid) == 1 and 1 < ord(amino_acid) < 128:
+                    lookup[36 * i + 6 * j + k] = ord(amino_acid)
+    # Keep the table itself too, so that its id is not reused
+    _codon_lookups[id(codon_table)] = (codon_table, lookup)
+    return lookup
+
+
+def _translate_batch_numpy(batch, numpy, stop_symbol, to_stop, cds):
+    """Translate a batch of sequences using NumPy (PRIVATE).
+
+    All the codons of the frames using the same codon table are looked up
+    in one go. Only the codons the lookup array cannot translate are then
+    looked at one by one, in the same way as in _translate_str.
+    """
+    codes = numpy.full(256, 5, numpy.uint8)
+    for code, letter in enumerate("ACGTU"):
+        codes[ord(letter)] = code
+    proteins = [[None] * len(entry[3]) for entry in batch]
+    by_table = {}
+    for index, (sequence, codon_table, gap, fragments) in enumerate(batch):
+        by_table.setdefault(id(codon_table), []).append(index)
+    for indices in by_table.values():
+        codon_table = batch[indices[0]][1]
+        lookup = _codon_lookup(codon_table, numpy)
+        # Single codons which need a closer look, with any gap character
+        special = {}
+        jobs = []
+        for index in indices:
+            sequence, codon_table, gap, fragments = batch[index]
+            for number, fragment in enumerate(fragments):
+                start = ""
+                if cds:
+                    # The same checks as in _translate_str
+                    if fragment[:3] not in codon_table.start_codons:
+                        raise CodonTable.TranslationError(
+                            "First codon '{0}' is not a start codon".format(
+                                fragment[:3]))
+                    if len(fragment) % 3 != 0:
+                        raise CodonTable.TranslationError(
+                            "Sequence length {0} is not a multiple of "
+                            "three".format(len(fragment)))
+                    if fragment[-3:] not in codon_table.stop_codons:
+                        raise CodonTable.TranslationError(
+                            "Final codon '{0}' is not a stop codon".format(
+                                fragment[-3:]))
+                    start = "M"
+                    fragment = fragment[3:-3]
+                jobs.append((index, number, gap, start, fragment))
+        data = "".join(job[4] for job in jobs)
+        if sys.version_info[0] == 3:
+            data = data.encode("ascii", "replace")
+        letters = codes[numpy.frombuffer(data, numpy.uint8)]
+        amino_acids = lookup[36 * letters[0::3].astype(numpy.intp) +
+                             6 * letters[1::3] + letters[2::3]]
+        unknown = numpy.flatnonzero(amino_acids == 0).tolist()
+        amino_acids = amino_acids.tobytes()
+        if sys.version_info[0] == 3:
+            amino_acids = amino_acids.decode("ascii", "replace")
+        start = 0
+        u = 0
+        for index, number, gap, first, fragment in jobs:
+            end = start + len(fragment) // 3
+            # Any codons to look at are before the first stop codon, if
+            # that ends the translation (or is an error)
+            last = end
+            if to_stop or cds:
+                stop = amino_acids.find("\x01", start, end)
+                if stop >= 0:
+                    last = stop
+            parts = [first]
+            position = start
+            while u < len(unknown) and unknown[u] < last:
+                codon_number = unknown[u] - start
+                codon = fragment[3 * codon_number:3 * codon_number + 3]
+                key = (codon, gap)
+                try:
+                    amino_acid = special[key]
+                except KeyError:
+                    # Translated as "" if this is a stop codon
+                    amino_acid = _translate_str(codon, codon_table,
+                                                to_stop=True, gap=gap)
+                    special[key] = amino_acid
+                parts.append(amino_acids[position:unknown[u]])
+                position = unknown[u] + 1
+                u += 1
+                if amino_acid:
+                    parts.append(amino_acid)
+                else:
+                    # An ambiguous stop codon, like TAR
+                    if not (to_stop or cds):
+                        parts.append("\x01")
+                    else:
+                        last = position - 1
+                        break
+            if last < end and cds:
+                raise CodonTable.TranslationError(
+                    "Extra in frame stop codon found.")
+            parts.append(amino_acids[position:last])
+            protein = "".join(parts)
+            if not to_stop:
+                protein = protein.replace("\x01", stop_symbol)
+            proteins[index][number] = protein
+            # Skip any other codons of this frame to look at
+            while u < len(unknown) and unknown[u] < end:
+                u += 1
+            start = end
+    return proteins
+
+
 def reverse_complement(sequence):
     """Return the reverse complement sequence of a nucleotide string.
 
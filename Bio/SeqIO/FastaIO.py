@@ -14,7 +14,11 @@ You are expected to use this module via the Bio.SeqIO functions.
 
 from __future__ import print_function
 
+import os
+
+from Bio._py3k import _bytes_to_string
 from Bio.Alphabet import single_letter_alphabet
+from Bio.File import _open_for_random_access
 from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
 from Bio.SeqIO.Interfaces import SequentialSequenceWriter
@@ -211,6 +215,194 @@ class FastaWriter(SequentialSequenceWriter):
             self.handle.write(data + "\n")
 
 
+def _build_fai(handle):
+    """Scan a FASTA file opened in binary mode for a faidx index (PRIVATE).
+
+    Returns a list of (name, length, offset, line bases, line bytes)
+    tuples, one for each record. The offsets are counted from the lines
+    read (rather than using handle.tell()) so that this also works on a
+    BGZF file, where the offsets are into the uncompressed data.
+    """
+    entries = []
+    names = set()
+    name = None
+    offset = seq_offset = 0
+    length = line_bases = line_bytes = 0
+    last_line = False
+    for line in iter(handle.readline, b""):
+        offset += len(line)
+        if line[:1] == b">":
+            if name is not None:
+                entries.append((name, length, seq_offset, line_bases, line_bytes))
+            try:
+                name = _bytes_to_string(line[1:].split(None, 1)[0])
+            except IndexError:
+                raise ValueError("Missing FASTA identifier at offset %i"
+                                 % (offset - len(line)))
+            if name in names:
+                raise ValueError("Duplicate key '%s'" % name)
+            names.add(name)
+            seq_offset = offset
+            length = line_bases = line_bytes = 0
+            last_line = False
+            continue
+        elif name is None:
+            # Ignore any text before the first record
+            continue
+        bases = len(line.rstrip(b"\r\n"))
+        if not bases:
+            # Blank line, only allowed at the end of the record
+            last_line = True
+            continue
+        elif last_line:
+            raise ValueError("Different line length in FASTA record '%s'"
+                             % name)
+        if not line_bases:
+            line_bases = bases
+            line_bytes = len(line)
+        elif bases > line_bases:
+            raise ValueError("Different line length in FASTA record '%s'"
+                             % name)
+        if bases != line_bases or len(line) != line_bytes:
+            # Short line, must be the last line of the record
+            last_line = True
+        length += bases
+    if name is not None:
+        entries.append((name, length, seq_offset, line_bases, line_bytes))
+    return entries
+
+
+def _read_fai(filename):
+    """Load a samtools style FASTA .fai index file (PRIVATE)."""
+    entries = []
+    with open(filename) as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            parts = line.rstrip("\r\n").split("\t")
+            if len(parts) < 5:
+                raise ValueError("Expected 5 tab separated columns in %s, "
+                                 "got: %r" % (filename, line))
+            entries.append((parts[0],) + tuple(int(x) for x in parts[1:5]))
+    return entries
+
+
+def _write_fai(filename, entries):
+    """Save a samtools style FASTA .fai index file (PRIVATE)."""
+    with open(filename, "w") as handle:
+        for entry in entries:
+            handle.write("%s\t%i\t%i\t%i\t%i\n" % entry)
+
+
+class FaidxIndex(object):
+    """Random access to regions of FASTA sequences using a faidx index.
+
+    This uses a samtools faidx style index, recording for each record the
+    sequence length, the offset of the start of the sequence, and the
+    number of bases and bytes per line. This allows fetching any part of
+    a sequence by seeking directly to it, without reading the rest of the
+    record. All the sequence lines in a record (except the last) must be
+    the same length.
+
+    The index is loaded from the .fai file (by default the FASTA filename
+    plus the extension .fai) if it exists, otherwise the FASTA file is
+    scanned and the .fai file is written.
+
+    BGZF compressed FASTA files are also supported (using the .gzi block
+    index if present, see Bio.bgzf), where as with samtools the offsets
+    in the .fai file are for the uncompressed data.
+
+    >>> fasta = FaidxIndex("GenBank/NC_005816.fna", "GenBank/NC_005816.fna.fai")
+    >>> len(fasta)
+    1
+    >>> fasta.length("gi|45478711|ref|NC_005816.1|")
+    9609
+    >>> print(fasta.fetch("gi|45478711|ref|NC_005816.1|", 70, 80))
+    TGATTCAGGA
+    >>> fasta.close()
+
+    This should give the same as slicing the full record parsed with
+    Bio.SeqIO, i.e. ``record.seq[start:end]`` (only a step of one is
+    supported).
+    """
+
+    def __init__(self, filename, fai_filename=None,
+                 alphabet=single_letter_alphabet):
+        """Load or create the index, and open the FASTA file."""
+        if fai_filename is None:
+            fai_filename = filename + ".fai"
+        self._handle = _open_for_random_access(filename)
+        self._alphabet = alphabet
+        if os.path.isfile(fai_filename):
+            entries = _read_fai(fai_filename)
+        else:
+            try:
+                entries = _build_fai(self._handle)
+            except ValueError:
+                self._handle.close()
+                raise
+            _write_fai(fai_filename, entries)
+        self._names = [entry[0] for entry in entries]
+        self._entries = dict((entry[0], entry[1:]) for entry in entries)
+        if hasattr(self._handle, "seek_uncompressed"):
+            # BGZF, .fai offsets are in the uncompressed data
+            self._seek = self._handle.seek_uncompressed
+        else:
+            self._seek = self._handle.seek
+
+    def __len__(self):
+        """Return the number of records."""
+        return len(self._names)
+
+    def __iter__(self):
+        """Iterate over the record names, in file order."""
+        return iter(self._names)
+
+    def __contains__(self, name):
+        """Return True if this record name is in the index."""
+        return name in self._entries
+
+    def length(self, name):
+        """Return the length of the named sequence."""
+        return self._entries[name][0]
+
+    def fetch(self, name, start=None, end=None):
+        """Return the named sequence, or part of it, as a Seq object.
+
+        The start and end follow the Python slicing conventions (zero
+        based, end exclusive, negative values count from the end).
+        """
+        length, offset, line_bases, line_bytes = self._entries[name]
+        start, end, step = slice(start, end).indices(length)
+        if end <= start:
+            return Seq("", self._alphabet)
+        # Any newline characters will be removed below
+        start_offset = offset + (start // line_bases) * line_bytes + \
+            start % line_bases
+        end_offset = offset + ((end - 1) // line_bases) * line_bytes + \
+            (end - 1) % line_bases + 1
+        self._seek(start_offset)
+        data = self._handle.read(end_offset - start_offset)
+        data = data.replace(b"\n", b"").replace(b"\r", b"")
+        if len(data) != end - start:
+            raise ValueError("Expected %i bases from FASTA record '%s', "
+                             "got %i; is the .fai index out of date?"
+                             % (end - start, name, len(data)))
+        return Seq(_bytes_to_string(data), self._alphabet)
+
+    def close(self):
+        """Close the FASTA file handle."""
+        self._handle.close()
+
+    def __enter__(self):
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, type, value, traceback):
+        """Close the file when leaving the context manager."""
+        self.close()
+
+
 if __name__ == "__main__":
     from Bio._utils import run_doctest
     run_doctest(verbose=0)
@@ -363,6 +363,8 @@ are approximately equal.
 """
 from __future__ import print_function
 
+from Bio._py3k import _as_bytes
+
 from Bio.Alphabet import single_letter_alphabet
 from Bio.Seq import Seq, UnknownSeq
 from Bio.SeqRecord import SeqRecord
@@ -537,6 +539,118 @@ def _get_phred_quality(record):
                          % record.id)
 
 
+class _LazyPhredQualities(object):
+    """List like sequence of PHRED scores, decoded from FASTQ on demand (PRIVATE).
+
+    Holds the ASCII encoded quality string from a FASTQ file, and only turns
+    this into a list of integers when the scores are first accessed. If the
+    scores are never used (for example when just filtering reads on their
+    sequence and writing them out again as FASTQ), the original encoding can
+    be written out directly, avoiding decoding and re-encoding entirely:
+
+    >>> q = _LazyPhredQualities(";;3;;", SANGER_SCORE_OFFSET)
+    >>> len(q)
+    5
+    >>> q._encoded_as(SANGER_SCORE_OFFSET)
+    ';;3;;'
+
+    Otherwise it acts like a list of integers:
+
+    >>> q
+    [26, 26, 18, 26, 26]
+    >>> q[2]
+    18
+    >>> q == [26, 26, 18, 26, 26]
+    True
+    >>> q[2] = 40
+    >>> print(q)
+    [26, 26, 40, 26, 26]
+
+    After any modification the original encoding is no longer used:
+
+    >>> print(q._encoded_as(SANGER_SCORE_OFFSET))
+    None
+
+    Slicing (as done when slicing or taking the reverse complement of a
+    SeqRecord) gives another lazy sequence, without decoding the scores.
+    """
+
+    def __init__(self, encoded, offset):
+        """Create from the quality string and its ASCII offset."""
+        self._encoded = encoded
+        self._offset = offset
+        self._decoded = None
+
+    def _decode(self):
+        """Return the scores as a list of integers, decoding if needed (PRIVATE)."""
+        if self._decoded is None:
+            offset = self._offset
+            self._decoded = [ord(letter) - offset for letter in self._encoded]
+        return self._decoded
+
+    def _encoded_as(self, offset):
+        """Return the original quality string if unmodified, else None (PRIVATE).
+
+        Only returns the string if it uses the requested ASCII offset.
+        """
+        if self._encoded is not None and self._offset == offset:
+            return self._encoded
+        return None
+
+    def __len__(self):
+        if self._encoded is not None:
+            return len(self._encoded)
+        return len(self._decoded)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice) and self._encoded is not None:
+            return _LazyPhredQualities(self._encoded[index], self._offset)
+        return self._decode()[index]
+
+    def __setitem__(self, index, value):
+        self._decode()[index] = value
+        # The original encoding is now out of date
+        self._encoded = None
+
+    def __iter__(self):
+        return iter(self._decode())
+
+    def __contains__(self, value):
+        return value in self._decode()
+
+    def __eq__(self, other):
+        if isinstance(other, _LazyPhredQualities):
+            other = other._decode()
+        return self._decode() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __add__(self, other):
+        if isinstance(other, _LazyPhredQualities) and self._offset == \
+                other._offset and self._encoded is not None and \
+                other._encoded is not None:
+            return _LazyPhredQualities(self._encoded + other._encoded,
+                                       self._offset)
+        return self._decode() + list(other)
+
+    def __radd__(self, other):
+        return list(other) + self._decode()
+
+    def __repr__(self):
+        return repr(self._decode())
+
+    def count(self, value):
+        """Return the number of occurrences of value."""
+        return self._decode().count(value)
+
+    def index(self, value, *args):
+        """Return the first index of value."""
+        return self._decode().index(value, *args)
+
+
 # Only map 0 to 93, we need to give a warning on truncating at 93
 _phred_to_sanger_quality_str = dict((qp, chr(min(126, qp + SANGER_SCORE_OFFSET)))
                                     for qp in range(0, 93 + 1))
@@ -616,6 +730,11 @@ def _get_sanger_quality_str(record):
         # Fall back on solexa scores...
         pass
     else:
+        if isinstance(qualities, _LazyPhredQualities):
+            # Can we just use the original encoding from the input file?
+            encoded = qualities._encoded_as(SANGER_SCORE_OFFSET)
+            if encoded is not None:
+                return encoded
         # Try and use the precomputed mapping:
         try:
             return "".join(_phred_to_sanger_quality_str[qp]
@@ -685,6 +804,11 @@ def _get_illumina_quality_str(record):
         # Fall back on solexa scores...
         pass
     else:
+        if isinstance(qualities, _LazyPhredQualities):
+            # Can we just use the original encoding from the input file?
+            encoded = qualities._encoded_as(SOLEXA_SCORE_OFFSET)
+            if encoded is not None:
+                return encoded
         # Try and use the precomputed mapping:
         try:
             return "".join(_phred_to_illumina_quality_str[qp]
@@ -953,7 +1077,275 @@ def FastqGeneralIterator(handle):
         yield (title_line, seq_string, quality_string)
 
 
-def FastqPhredIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
+class _PushBackHandle(object):
+    """Minimal handle giving some pushed back lines first (PRIVATE).
+
+    Used to hand over the remainder of a file to FastqGeneralIterator,
+    which only needs the readline method. The lines should include their
+    newline characters, while the partial line (if any) is the start of
+    the next line still to be read from the handle.
+    """
+
+    def __init__(self, handle, lines, partial=""):
+        self._handle = handle
+        self._lines = lines[::-1]
+        self._partial = partial
+
+    def readline(self):
+        if self._lines:
+            return self._lines.pop()
+        if self._partial:
+            line = self._partial + self._handle.readline()
+            self._partial = ""
+            return line
+        return self._handle.readline()
+
+
+def _fastq_simple_records(lines, m):
+    """Split the first m lines into FASTQ string tuples if simple (PRIVATE).
+
+    Returns None unless all the records are in the common four line layout
+    with no line wrapping and no title on the "+" lines. The checks are all
+    done via string methods and map (i.e. without a Python level loop over
+    the lines), making this much faster than checking each record in turn.
+    """
+    if lines[2:m:4].count("+") != m // 4:
+        return None
+    titles = "\n" + "\n".join(lines[0:m:4]) + "\n"
+    if titles.count("\n@") != m // 4 or "\r" in titles:
+        return None
+    if " \n" in titles or "\t\n" in titles:
+        # Rare, trailing whitespace to remove
+        titles = "\n".join(t.rstrip() for t in titles.split("\n"))
+    titles = titles.replace("\n@", "\n")[1:-1].split("\n")
+    seqs = lines[1:m:4]
+    quals = lines[3:m:4]
+    if list(map(len, seqs)) != list(map(len, quals)):
+        return None
+    joined = "".join(seqs)
+    if " " in joined or "\t" in joined or "\r" in joined:
+        return None
+    if "\r" in "".join(quals):
+        return None
+    return list(zip(titles, seqs, quals))
+
+
+def _fastq_blocks(handle, block_size=1048576):
+    """Iterate over FASTQ records as lists of string tuples (PRIVATE).
+
+    This gives the same (title, sequence, quality) tuples as the function
+    FastqGeneralIterator, but reads large blocks of text at once (of about
+    block_size characters) rather than calling readline four or more times
+    per record, and returns the records in lists (one per block).
+
+    Records using the common four line layout (with no line wrapping) are
+    split directly from each block. On meeting anything else, for example
+    wrapped sequence or quality lines, the rest of the file is handed over
+    to FastqGeneralIterator (which copes with all the ambiguities of the
+    FASTQ format).
+    """
+    read = handle.read
+    partial = ""
+    started = False
+    while True:
+        block = read(block_size)
+        if block and isinstance(block[0], int):
+            raise ValueError("Is this handle in binary mode not text mode?")
+        lines = (partial + block).split("\n")
+        if block:
+            # Last entry is an incomplete line (or empty), keep for later
+            partial = lines.pop()
+        else:
+            # End of file, any final line without a newline is complete
+            partial = ""
+            if not lines[-1]:
+                lines.pop()
+        i = 0
+        n = len(lines) - 3
+        records = _fastq_simple_records(lines, n + 3 - (n + 3) % 4)
+        if records is not None:
+            i = 4 * len(records)
+            started = started or bool(records)
+        else:
+            records = []
+        append = records.append
+        while i < n:
+            title_line = lines[i]
+            if title_line[:1] != "@":
+                if started and not title_line.rstrip():
+                    # Blank line between records, allowed by FastqGeneralIterator
+                    i += 1
+                    continue
+                break
+            plus_line = lines[i + 2]
+            if plus_line[:1] != "+":
+                # Perhaps a line wrapped sequence...
+                break
+            title_line = title_line[1:].rstrip()
+            seq_string = lines[i + 1].rstrip()
+            quality_string = lines[i + 3].rstrip()
+            if len(seq_string) != len(quality_string):
+                # Perhaps a line wrapped quality string...
+                break
+            second_title = plus_line[1:].rstrip()
+            if second_title and second_title != title_line:
+                raise ValueError("Sequence and quality captions differ.")
+            if " " in seq_string or "\t" in seq_string:
+                raise ValueError("Whitespace is not allowed in the sequence.")
+            append((title_line, seq_string, quality_string))
+            started = True
+            i += 4
+        if records:
+            yield records
+        if not block:
+            if i < len(lines) and (not started or
+                                   "".join(lines[i:]).strip()):
+                # Incomplete or otherwise unusual final record(s)
+                break
+            return
+        if i < n:
+            # Anything tricky is left to FastqGeneralIterator
+            break
+        # Carry any incomplete record over to the next block
+        partial = "\n".join(lines[i:] + [partial])
+    remaining = FastqGeneralIterator(_PushBackHandle(
+        handle, [line + "\n" for line in lines[i:]], partial))
+    records = []
+    for record in remaining:
+        records.append(record)
+        if len(records) >= 1000:
+            yield records
+            records = []
+    if records:
+        yield records
+
+
+def _quality_array(numpy, quality_string, offset):
+    """Decode an ASCII quality string as a NumPy uint8 array (PRIVATE)."""
+    # Use a bytearray so that the array returned is writeable
+    raw = numpy.frombuffer(bytearray(_as_bytes(quality_string)),
+                           dtype=numpy.uint8)
+    if raw.size and (raw.min() < offset or raw.max() > 126):
+        raise ValueError("Invalid character in quality string")
+    raw -= offset
+    return raw
+
+
+def FastqPhredArrayIterator(handle, alphabet=single_letter_alphabet,
+                            title2ids=None):
+    """Iterate over FASTQ records with NumPy quality arrays (as SeqRecord objects).
+
+    This is a faster alternative to FastqPhredIterator for large (Sanger
+    style) FASTQ files, and takes the same arguments. The file is read in
+    large blocks, and each record's PHRED qualities are given as a NumPy
+    array of unsigned 8 bit integers (rather than as a list of Python
+    integers), decoded for all the records in a block at once::
+
+        from Bio.SeqIO.QualityIO import FastqPhredArrayIterator
+        with open("Quality/example.fastq") as handle:
+            for record in FastqPhredArrayIterator(handle):
+                qualities = record.letter_annotations["phred_quality"]
+                print("%s %i" % (record.id, qualities.min()))
+
+    This requires NumPy.
+    """
+    try:
+        import numpy
+    except ImportError:
+        from Bio import MissingPythonDependencyError
+        raise MissingPythonDependencyError(
+            "Install NumPy if you want to use FastqPhredArrayIterator.")
+    for records in _fastq_blocks(handle):
+        qualities = _quality_array(
+            numpy, "".join(r[2] for r in records), SANGER_SCORE_OFFSET)
+        start = 0
+        for title_line, seq_string, quality_string in records:
+            if title2ids:
+                id, name, descr = title2ids(title_line)
+            else:
+                descr = title_line
+                id = descr.split()[0]
+                name = id
+            record = SeqRecord(Seq(seq_string, alphabet),
+                               id=id, name=name, description=descr)
+            end = start + len(quality_string)
+            # As in FastqPhredIterator, bypass the length check (done already)
+            dict.__setitem__(record._per_letter_annotations,
+                             "phred_quality", qualities[start:end])
+            start = end
+            yield record
+
+
+def FastqBatchIterator(handle, batch_size=10000, offset=SANGER_SCORE_OFFSET):
+    """Iterate over batches of FASTQ reads as NumPy arrays.
+
+    Arguments:
+     - handle - input file (in text mode)
+     - batch_size - number of reads per batch (the final batch may be
+       smaller)
+     - offset - ASCII offset for the PHRED quality scores, default 33
+       for Sanger style FASTQ, use 64 for Illumina 1.3 to 1.7 FASTQ.
+       Note the old Solexa scores are not supported.
+
+    This is intended for vectorised processing of short reads, such as
+    quality trimming and filtering. Rather than one object per read, each
+    batch is a tuple of four values:
+
+     - titles - list of the title line strings (without the "@")
+     - sequences - NumPy uint8 array of the ASCII codes of all the
+       sequences in the batch, one after the other
+     - qualities - NumPy uint8 array of all the PHRED quality scores in
+       the batch, one after the other (matching the sequences)
+     - lengths - NumPy array of the read lengths, which can be used to
+       split up the sequences and qualities, or with ufunc.reduceat
+
+    For example, to find the mean quality of each read::
+
+        import numpy
+        from Bio.SeqIO.QualityIO import FastqBatchIterator
+        with open("Quality/example.fastq") as handle:
+            for titles, sequences, qualities, lengths in FastqBatchIterator(handle):
+                starts = numpy.cumsum(lengths) - lengths
+                totals = numpy.add.reduceat(qualities.astype(int), starts)
+                for title, mean in zip(titles, totals / lengths):
+                    print("%s %0.1f" % (title, mean))
+
+    Beware that reduceat does not give zero for any zero length reads.
+
+    This requires NumPy.
+    """
+    try:
+        import numpy
+    except ImportError:
+        from Bio import MissingPythonDependencyError
+        raise MissingPythonDependencyError(
+            "Install NumPy if you want to use FastqBatchIterator.")
+    if batch_size < 1:
+        raise ValueError("Need a positive batch size, not %r" % batch_size)
+    pending = []
+    for records in _fastq_blocks(handle):
+        pending.extend(records)
+        while len(pending) >= batch_size:
+            batch = pending[:batch_size]
+            del pending[:batch_size]
+            yield _fastq_batch_arrays(numpy, batch, offset)
+    if pending:
+        yield _fastq_batch_arrays(numpy, pending, offset)
+
+
+def _fastq_batch_arrays(numpy, records, offset):
+    """Turn a list of FASTQ string tuples into NumPy arrays (PRIVATE)."""
+    titles = [r[0] for r in records]
+    sequences = numpy.frombuffer(
+        bytearray(_as_bytes("".join(r[1] for r in records))),
+        dtype=numpy.uint8)
+    qualities = _quality_array(numpy, "".join(r[2] for r in records), offset)
+    lengths = numpy.array([len(r[1]) for r in records], dtype=numpy.intp)
+    return titles, sequences, qualities, lengths
+
+
+def FastqPhredIterator(handle, alphabet=single_letter_alphabet, title2ids=None,
+                       lazy=False):
     """Generator function to iterate over FASTQ records (as SeqRecord objects).
 
     Arguments:
@@ -964,6 +1356,8 @@ def FastqPhredIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
        description (in that order) for the record as a tuple of strings.
        If this is not given, then the entire title line will be used as
        the description, and the first word as the id and name.
+     - lazy - Optional boolean, if True the quality scores are only decoded
+       when first used (see below).
 
     Note that use of title2ids matches that of Bio.SeqIO.FastaIO.
 
@@ -1016,6 +1410,30 @@ def FastqPhredIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
     >>> print(record.letter_annotations["phred_quality"])
     [26, 26, 26, 26, 26, 26, 26, 26, 26, 26, 26, 24, 26, 22, 26, 26, 13, 22, 26, 18, 24, 18, 18, 18, 18]
 
+    Decoding the quality strings takes a significant part of the time taken
+    to parse a FASTQ file. If you may not need the quality scores, use the
+    lazy option. This keeps each encoded quality string and only decodes it
+    when the scores are first accessed. Furthermore, if the scores are never
+    accessed or changed, the original quality string is used directly when
+    writing the record out as Sanger style FASTQ. This is ideal for filtering
+    reads on their sequence:
+
+    >>> with open("Quality/example.fastq") as handle:
+    ...     wanted = (r for r in FastqPhredIterator(handle, lazy=True)
+    ...               if r.seq.startswith("GTT"))
+    ...     for record in wanted:
+    ...         print(record.format("fastq"))
+    @EAS54_6_R1_2_1_443_348
+    GTTGCTTCTGGCGTGGGTGGGGGGG
+    +
+    ;;;;;;;;;;;9;7;;.7;393333
+    <BLANKLINE>
+
+    The lazy scores otherwise act like a list of integers:
+
+    >>> print(record.letter_annotations["phred_quality"])
+    [26, 26, 26, 26, 26, 26, 26, 26, 26, 26, 26, 24, 26, 22, 26, 26, 13, 22, 26, 18, 24, 18, 18, 18, 18]
+
     """
     assert SANGER_SCORE_OFFSET == ord("!")
     # Originally, I used a list expression for each record:
@@ -1035,9 +1453,16 @@ def FastqPhredIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
             name = id
         record = SeqRecord(Seq(seq_string, alphabet),
                            id=id, name=name, description=descr)
-        qualities = [q_mapping[letter] for letter in quality_string]
-        if qualities and (min(qualities) < 0 or max(qualities) > 93):
-            raise ValueError("Invalid character in quality string")
+        if lazy:
+            if quality_string and (min(quality_string) < "!" or
+                                   max(quality_string) > "~"):
+                raise ValueError("Invalid character in quality string")
+            qualities = _LazyPhredQualities(quality_string,
+                                            SANGER_SCORE_OFFSET)
+        else:
+            qualities = [q_mapping[letter] for letter in quality_string]
+            if qualities and (min(qualities) < 0 or max(qualities) > 93):
+                raise ValueError("Invalid character in quality string")
         # For speed, will now use a dirty trick to speed up assigning the
         # qualities. We do this to bypass the length check imposed by the
         # per-letter-annotations restricted dict (as this has already been
@@ -1205,7 +1630,8 @@ def FastqSolexaIterator(handle, alphabet=single_letter_alphabet, title2ids=None)
         yield record
 
 
-def FastqIlluminaIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
+def FastqIlluminaIterator(handle, alphabet=single_letter_alphabet, title2ids=None,
+                          lazy=False):
     """Parse Illumina 1.3 to 1.7 FASTQ like files (which differ in the quality mapping).
 
     The optional arguments are the same as those for the FastqPhredIterator.
@@ -1246,9 +1672,16 @@ def FastqIlluminaIterator(handle, alphabet=single_letter_alphabet, title2ids=Non
             name = id
         record = SeqRecord(Seq(seq_string, alphabet),
                            id=id, name=name, description=descr)
-        qualities = [q_mapping[letter] for letter in quality_string]
-        if qualities and (min(qualities) < 0 or max(qualities) > 62):
-            raise ValueError("Invalid character in quality string")
+        if lazy:
+            if quality_string and (min(quality_string) < "@" or
+                                   max(quality_string) > "~"):
+                raise ValueError("Invalid character in quality string")
+            qualities = _LazyPhredQualities(quality_string,
+                                            SOLEXA_SCORE_OFFSET)
+        else:
+            qualities = [q_mapping[letter] for letter in quality_string]
+            if qualities and (min(qualities) < 0 or max(qualities) > 62):
+                raise ValueError("Invalid character in quality string")
         # Dirty trick to speed up this line:
         # record.letter_annotations["phred_quality"] = qualities
         dict.__setitem__(record._per_letter_annotations,
@@ -323,6 +323,9 @@ making up each alignment as SeqRecords.
 """
 
 from __future__ import print_function
+
+import functools
+
 from Bio._py3k import basestring
 
 # TODO
@@ -750,7 +753,8 @@ def to_dict(sequences, key_function=None):
     return d
 
 
-def index(filename, format, alphabet=None, key_function=None):
+def index(filename, format, alphabet=None, key_function=None,
+          memory_map=False, compact=False):
     """Indexes a sequence file and returns a dictionary like object.
 
     Arguments:
@@ -762,6 +766,10 @@ def index(filename, format, alphabet=None, key_function=None):
      - key_function - Optional callback function which when given a
        SeqRecord identifier string should return a unique key for the
        dictionary.
+     - memory_map - Optional boolean, access the file via a read only
+       memory map (not supported for BGZF compressed files). See below.
+     - compact - Optional boolean, keep only a hash of each key in memory
+       to reduce the memory needed for very large files. See below.
 
     This indexing function will return a dictionary like object, giving the
     SeqRecord objects as values:
@@ -847,6 +855,20 @@ def index(filename, format, alphabet=None, key_function=None):
     None
     >>> records.close()
 
+    To extract many records at once (for example a subset of genes from a
+    large reference), use the get_many method. This looks up all the keys
+    first, then reads the records in the order they are in the file (for
+    sequential rather than random access disk I/O), giving (key, record)
+    pairs:
+
+    >>> records = SeqIO.index("Quality/example.fastq", "fastq")
+    >>> wanted = ["EAS54_6_R1_2_1_540_792", "EAS54_6_R1_2_1_413_324"]
+    >>> for key, record in records.get_many(wanted):
+    ...     print("%s %s" % (key, record.seq))
+    EAS54_6_R1_2_1_413_324 CCCTTCTTGTCTTCAGCGTTTCTCC
+    EAS54_6_R1_2_1_540_792 TTGGCAGGCCAAGGCCGATGGATCA
+    >>> records.close()
+
     Another common use case would be indexing an NCBI style FASTA file,
     where you might want to extract the GI number from the FASTA identifier
     to use as the dictionary key.
@@ -857,6 +879,51 @@ def index(filename, format, alphabet=None, key_function=None):
     to be completely parsed while building the index. Right now this is
     usually avoided.
 
+    For large local files with many lookups, you can use memory_map=True
+    to avoid the overhead of a read system call for each record, with the
+    operating system sharing the file's pages between processes. In this
+    mode, for most plain text formats (including FASTA, FASTQ, GenBank and
+    EMBL) the get_raw method returns a memoryview of the mapped file rather
+    than a copy as a bytes string (these must be released before calling
+    the close method):
+
+    >>> records = SeqIO.index("Quality/example.fastq", "fastq",
+    ...                       memory_map=True)
+    >>> raw = records.get_raw("EAS54_6_R1_2_1_540_792")
+    >>> print(bytes(raw).decode())
+    @EAS54_6_R1_2_1_540_792
+    TTGGCAGGCCAAGGCCGATGGATCA
+    +
+    ;;;;;;;;;;;7;;;;;-;;;3;83
+    <BLANKLINE>
+    >>> print(records["EAS54_6_R1_2_1_540_792"].format("fasta"))
+    >EAS54_6_R1_2_1_540_792
+    TTGGCAGGCCAAGGCCGATGGATCA
+    <BLANKLINE>
+    >>> del raw
+    >>> records.close()
+
+    Normally all the keys are kept in memory, in a Python dictionary mapping
+    them to the file offsets. For files with hundreds of millions of records
+    this can need tens of gigabytes of RAM. With compact=True, only a 64 bit
+    hash of each key and the offset are stored, in sorted arrays using about
+    16 bytes per record. Looking up a key is then a binary search, where any
+    hash collisions are resolved by checking the candidate records in the
+    file, while iterating over the keys re-scans the file:
+
+    >>> records = SeqIO.index("Quality/example.fastq", "fastq", compact=True)
+    >>> len(records)
+    3
+    >>> "EAS54_6_R1_2_1_540_792" in records
+    True
+    >>> print(records["EAS54_6_R1_2_1_540_792"].format("fasta"))
+    >EAS54_6_R1_2_1_540_792
+    TTGGCAGGCCAAGGCCGATGGATCA
+    <BLANKLINE>
+    >>> sorted(records)
+    ['EAS54_6_R1_2_1_413_324', 'EAS54_6_R1_2_1_443_348', 'EAS54_6_R1_2_1_540_792']
+    >>> records.close()
+
     See Also: Bio.SeqIO.index_db() and Bio.SeqIO.to_dict()
 
     """
@@ -875,19 +942,29 @@ def index(filename, format, alphabet=None, key_function=None):
 
     # Map the file format to a sequence iterator:
     from ._index import _FormatToRandomAccess  # Lazy import
-    from Bio.File import _IndexedSeqFileDict
+    from Bio.File import _IndexedSeqFileDict, _CompactIndexedSeqFileDict
     try:
         proxy_class = _FormatToRandomAccess[format]
     except KeyError:
         raise ValueError("Unsupported format %r" % format)
     repr = "SeqIO.index(%r, %r, alphabet=%r, key_function=%r)" \
         % (filename, format, alphabet, key_function)
-    return _IndexedSeqFileDict(proxy_class(filename, format, alphabet),
+    if memory_map:
+        repr = repr[:-1] + ", memory_map=True)"
+    if compact:
+        repr = repr[:-1] + ", compact=True)"
+        return _CompactIndexedSeqFileDict(
+            proxy_class(filename, format, alphabet, memory_map),
+            key_function, repr, "SeqRecord",
+            functools.partial(proxy_class, filename, format, alphabet,
+                              memory_map))
+    return _IndexedSeqFileDict(proxy_class(filename, format, alphabet,
+                                           memory_map),
                                key_function, repr, "SeqRecord")
 
 
 def index_db(index_filename, filenames=None, format=None, alphabet=None,
-             key_function=None):
+             key_function=None, processes=1):
     """Index several sequence files and return a dictionary like object.
 
     The index is stored in an SQLite database rather than in memory (as in the
@@ -906,6 +983,8 @@ def index_db(index_filename, filenames=None, format=None, alphabet=None,
      - key_function - Optional callback function which when given a
        SeqRecord identifier string should return a unique
        key for the dictionary.
+     - processes - Optional number of worker processes to use when
+       building the index, see below.
 
     This indexing function will return a dictionary like object, giving the
     SeqRecord objects as values:
@@ -930,6 +1009,18 @@ def index_db(index_filename, filenames=None, format=None, alphabet=None,
 
     In this example the two files contain 85 and 10 records respectively.
 
+    When indexing many files, use the processes argument to scan several
+    files at once using a pool of worker processes (the offsets are still
+    written to the SQLite database by the calling process, one file at a
+    time in the order given). As usual with the multiprocessing module,
+    on Windows this needs to be called from within an
+    ``if __name__ == "__main__":`` block.
+
+    If you reload an existing index giving more filenames than it holds,
+    where the start of the list matches the files already indexed, the
+    additional files are indexed and added to the existing index (which
+    is quicker than rebuilding it from scratch).
+
     BGZF compressed files are supported, and detected automatically. Ordinary
     GZIP compressed files are not supported.
 
@@ -955,22 +1046,22 @@ def index_db(index_filename, filenames=None, format=None, alphabet=None,
                                      isinstance(alphabet, AlphabetEncoder)):
         raise ValueError("Invalid alphabet, %r" % alphabet)
 
+    if processes < 1:
+        raise ValueError("Need at least one process, not %r" % processes)
+
     # Map the file format to a sequence iterator:
-    from ._index import _FormatToRandomAccess  # Lazy import
+    from ._index import _proxy_factory  # Lazy import
     from Bio.File import _SQLiteManySeqFilesDict
     repr = "SeqIO.index_db(%r, filenames=%r, format=%r, alphabet=%r, key_function=%r)" \
                % (index_filename, filenames, format, alphabet, key_function)
 
-    def proxy_factory(format, filename=None):
-        """Given a filename returns proxy object, else boolean if format OK."""
-        if filename:
-            return _FormatToRandomAccess[format](filename, format, alphabet)
-        else:
-            return format in _FormatToRandomAccess
+    # Using a partial function (not a closure) as must be picklable
+    # for the worker processes:
+    proxy_factory = functools.partial(_proxy_factory, alphabet)
 
     return _SQLiteManySeqFilesDict(index_filename, filenames,
                                    proxy_factory, format,
-                                   key_function, repr)
+                                   key_function, repr, processes=processes)
 
 
 def convert(in_file, in_format, out_file, out_format, alphabet=None):
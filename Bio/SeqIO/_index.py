@@ -25,6 +25,7 @@ temp lookup file might be one idea (e.g. using SQLite or an OBDA style index).
 
 from __future__ import print_function
 
+import mmap
 import re
 from io import BytesIO
 from Bio._py3k import StringIO
@@ -35,10 +36,22 @@ from Bio import Alphabet
 from Bio.File import _IndexedSeqFileProxy, _open_for_random_access
 
 
+def _raw_slice(mapped, start, end):
+    """Return part of a memory mapped file, without copying if possible (PRIVATE).
+
+    Note the memory map cannot be closed while any memoryview is in use.
+    """
+    try:
+        return memoryview(mapped)[start:end]
+    except TypeError:
+        # Python 2 mmap objects do not support memoryview
+        return mapped[start:end]
+
+
 class SeqFileRandomAccess(_IndexedSeqFileProxy):
-    def __init__(self, filename, format, alphabet):
+    def __init__(self, filename, format, alphabet, memory_map=False):
         """Initialize the class."""
-        self._handle = _open_for_random_access(filename)
+        self._handle = _open_for_random_access(filename, memory_map)
         self._alphabet = alphabet
         self._format = format
         # Load the parser class/function once an avoid the dict lookup in each
@@ -63,7 +76,13 @@ class SeqFileRandomAccess(_IndexedSeqFileProxy):
     def get(self, offset):
         """Returns SeqRecord."""
         # Should be overridden for binary file formats etc:
-        return self._parse(StringIO(_bytes_to_string(self.get_raw(offset))))
+        raw = self.get_raw(offset)
+        if isinstance(raw, memoryview):
+            # Slice of a memory mapped file
+            data = raw.tobytes()
+            raw.release()
+            raw = data
+        return self._parse(StringIO(_bytes_to_string(raw)))
 
 
 ####################
@@ -76,9 +95,10 @@ class SeqFileRandomAccess(_IndexedSeqFileProxy):
 class SffRandomAccess(SeqFileRandomAccess):
     """Random access to a Standard Flowgram Format (SFF) file."""
 
-    def __init__(self, filename, format, alphabet):
+    def __init__(self, filename, format, alphabet, memory_map=False):
         """Initialize the class."""
-        SeqFileRandomAccess.__init__(self, filename, format, alphabet)
+        SeqFileRandomAccess.__init__(self, filename, format, alphabet,
+                                     memory_map)
         header_length, index_offset, index_length, number_of_reads, \
             self._flows_per_read, self._flow_chars, self._key_sequence \
             = SeqIO.SffIO._sff_file_header(self._handle)
@@ -168,9 +188,10 @@ class SffTrimedRandomAccess(SffRandomAccess):
 ###################
 
 class SequentialSeqFileRandomAccess(SeqFileRandomAccess):
-    def __init__(self, filename, format, alphabet):
+    def __init__(self, filename, format, alphabet, memory_map=False):
         """Initialize the class."""
-        SeqFileRandomAccess.__init__(self, filename, format, alphabet)
+        SeqFileRandomAccess.__init__(self, filename, format, alphabet,
+                                     memory_map)
         marker = {"ace": b"CO ",
                   "embl": b"ID ",
                   "fasta": b">",
@@ -185,6 +206,7 @@ class SequentialSeqFileRandomAccess(SeqFileRandomAccess):
                   }[format]
         self._marker = marker
         self._marker_re = re.compile(b"^" + marker)
+        self._next_marker_re = re.compile(b"\n" + marker)
 
     def __iter__(self):
         """Returns (id, offset, length) tuples."""
@@ -220,6 +242,14 @@ class SequentialSeqFileRandomAccess(SeqFileRandomAccess):
         """Return the raw record from the file as a bytes string."""
         # For non-trivial file formats this must be over-ridden in the subclass
         handle = self._handle
+        if isinstance(handle, mmap.mmap):
+            # Record ends at the start of the next marker line, or EOF
+            match = self._next_marker_re.search(handle, offset + 1)
+            if match:
+                end = match.start() + 1
+            else:
+                end = len(handle)
+            return _raw_slice(handle, offset, end)
         marker_re = self._marker_re
         handle.seek(offset)
         lines = [handle.readline()]
@@ -472,9 +502,10 @@ class UniprotRandomAccess(SequentialSeqFileRandomAccess):
 class IntelliGeneticsRandomAccess(SeqFileRandomAccess):
     """Random access to a IntelliGenetics file."""
 
-    def __init__(self, filename, format, alphabet):
+    def __init__(self, filename, format, alphabet, memory_map=False):
         """Initialize the class."""
-        SeqFileRandomAccess.__init__(self, filename, format, alphabet)
+        SeqFileRandomAccess.__init__(self, filename, format, alphabet,
+                                     memory_map)
         self._marker_re = re.compile(b"^;")
 
     def __iter__(self):
@@ -549,6 +580,13 @@ class TabRandomAccess(SeqFileRandomAccess):
     def get_raw(self, offset):
         """Return the raw record from the file as a bytes string."""
         handle = self._handle
+        if isinstance(handle, mmap.mmap):
+            end = handle.find(b"\n", offset)
+            if end == -1:
+                end = len(handle)
+            else:
+                end += 1
+            return _raw_slice(handle, offset, end)
         handle.seek(offset)
         return handle.readline()
 
@@ -621,16 +659,22 @@ class FastqRandomAccess(SeqFileRandomAccess):
         """Return the raw record from the file as a bytes string."""
         # TODO - Refactor this and the __init__ method to reduce code duplication?
         handle = self._handle
+        # A memory mapped record is sliced from the map at the end, any
+        # other is kept as it is read
+        mapped = isinstance(handle, mmap.mmap)
         handle.seek(offset)
         line = handle.readline()
         data = line
+        length = len(line)
         if line[0:1] != b"@":
             raise ValueError("Problem with FASTQ @ line:\n%r" % line)
         # Find the seq line(s)
         seq_len = 0
         while line:
             line = handle.readline()
-            data += line
+            length += len(line)
+            if not mapped:
+                data += line
             if line.startswith(b"+"):
                 break
             seq_len += len(line.strip())
@@ -646,7 +690,9 @@ class FastqRandomAccess(SeqFileRandomAccess):
                     line = handle.readline()
                     if line.strip():
                         raise ValueError("Expected blank quality line, not %r" % line)
-                    data += line
+                    length += len(line)
+                    if not mapped:
+                        data += line
                 # Should be end of record...
                 line = handle.readline()
                 if line and line[0:1] != b"@":
@@ -654,10 +700,14 @@ class FastqRandomAccess(SeqFileRandomAccess):
                 break
             else:
                 line = handle.readline()
-                data += line
+                length += len(line)
+                if not mapped:
+                    data += line
                 qual_len += len(line.strip())
         if seq_len != qual_len:
             raise ValueError("Problem with quality section")
+        if mapped:
+            return _raw_slice(handle, offset, offset + length)
         return data
 
 
@@ -683,3 +733,14 @@ _FormatToRandomAccess = {"ace": SequentialSeqFileRandomAccess,
                          "qual": SequentialSeqFileRandomAccess,
                          "uniprot-xml": UniprotRandomAccess,
                          }
+
+
+def _proxy_factory(alphabet, format, filename=None):
+    """Given a filename returns proxy object, else boolean if format OK (PRIVATE).
+
+    Used by Bio.SeqIO.index_db via functools.partial to set the alphabet.
+    """
+    if filename:
+        return _FormatToRandomAccess[format](filename, format, alphabet)
+    else:
+        return format in _FormatToRandomAccess
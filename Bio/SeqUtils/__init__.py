@@ -482,15 +482,14 @@ def six_frame_translations(seq, genetic_code=1):
     <BLANKLINE>
 
     """  # noqa for pep8 W291 trailing whitespace
-    from Bio.Seq import reverse_complement, translate
+    from Bio.Seq import reverse_complement, translate_many
     anti = reverse_complement(seq)
     comp = anti[::-1]
     length = len(seq)
-    frames = {}
-    for i in range(0, 3):
-        fragment_length = 3 * ((length - i) // 3)
-        frames[i + 1] = translate(seq[i:i + fragment_length], genetic_code)
-        frames[-(i + 1)] = translate(anti[i:i + fragment_length], genetic_code)[::-1]
+    frames = dict(zip((1, 2, 3, -1, -2, -3),
+                      next(translate_many([seq], genetic_code))))
+    for i in range(1, 4):
+        frames[-i] = frames[-i][::-1]
 
     # create header
     if length > 20:
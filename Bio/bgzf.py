@@ -207,6 +207,11 @@ If you are accessing a BGZF file via this module, just use the
 handle.tell() method to note the virtual offset of a position you
 may later want to return to using handle.seek().
 
+If you need to convert decompressed positions to virtual offsets, this
+module can read and write the block index files (extension .gzi) used
+by samtools/htslib (see the make_gzi, read_gzi and write_gzi functions),
+and the BgzfReader has a seek_uncompressed method using such an index.
+
 The catch with BGZF virtual offsets is while they can be compared
 (which offset comes first in the file), you cannot safely subtract
 them to get the size of the data between them, nor add/subtract
@@ -227,10 +232,14 @@ NC_000932.1
 
 from __future__ import print_function
 
+import os
 import sys
 import zlib
 import struct
 
+from bisect import bisect_right
+from collections import deque
+
 from Bio._py3k import _as_bytes, _as_string
 from Bio._py3k import open as _open
 
@@ -396,15 +405,22 @@ def BgzfBlocks(handle):
     data_start = 0
     while True:
         start_offset = handle.tell()
-        # This may raise StopIteration which is perfect here
-        block_length, data = _load_bgzf_block(handle)
+        try:
+            block_length, data = _load_bgzf_block(handle)
+        except StopIteration:
+            break
         data_len = len(data)
         yield start_offset, block_length, data_start, data_len
         data_start += data_len
 
 
-def _load_bgzf_block(handle, text_mode=False):
-    """Load the next BGZF block of compressed data (PRIVATE)."""
+def _read_bgzf_block(handle):
+    """Read the next BGZF block without decompressing it (PRIVATE).
+
+    Returns the block size, and a tuple of the raw deflate data, the
+    expected CRC and the expected decompressed length. These can be
+    given to _inflate_bgzf_block, possibly on another thread.
+    """
     magic = handle.read(4)
     if not magic:
         # End of file
@@ -431,10 +447,17 @@ def _load_bgzf_block(handle, text_mode=False):
     assert block_size is not None, "Missing BC, this isn't a BGZF file!"
     # Now comes the compressed data, CRC, and length of uncompressed data.
     deflate_size = block_size - 1 - extra_len - 19
-    d = zlib.decompressobj(-15)  # Negative window size means no headers
-    data = d.decompress(handle.read(deflate_size)) + d.flush()
+    deflate_data = handle.read(deflate_size)
     expected_crc = handle.read(4)
     expected_size = struct.unpack("<I", handle.read(4))[0]
+    return block_size, (deflate_data, expected_crc, expected_size)
+
+
+def _inflate_bgzf_block(deflate_data, expected_crc, expected_size,
+                        text_mode=False):
+    """Decompress and check the raw data from a BGZF block (PRIVATE)."""
+    d = zlib.decompressobj(-15)  # Negative window size means no headers
+    data = d.decompress(deflate_data) + d.flush()
     assert expected_size == len(data), \
         "Decompressed to %i, not %i" % (len(data), expected_size)
     # Should cope with a mix of Python platforms...
@@ -446,9 +469,114 @@ def _load_bgzf_block(handle, text_mode=False):
     assert expected_crc == crc, \
         "CRC is %s, not %s" % (crc, expected_crc)
     if text_mode:
-        return block_size, _as_string(data)
+        return _as_string(data)
     else:
-        return block_size, data
+        return data
+
+
+def _load_bgzf_block(handle, text_mode=False):
+    """Load the next BGZF block of compressed data (PRIVATE)."""
+    block_size, raw = _read_bgzf_block(handle)
+    return block_size, _inflate_bgzf_block(*raw, text_mode=text_mode)
+
+
+def make_gzi(handle):
+    """Build a BGZF block index by scanning the blocks in a BGZF file.
+
+    Expects a BGZF compressed file opened in binary read mode using the
+    builtin open function (as for the BgzfBlocks function). Only the
+    block headers and footers are read, no decompression is needed.
+
+    Returns a list of (compressed offset, uncompressed offset) tuples,
+    one for the start of each BGZF block (including the empty EOF block),
+    as used in the samtools/htslib .gzi index files:
+
+    >>> try:
+    ...     from __builtin__ import open # Python 2
+    ... except ImportError:
+    ...     from builtins import open # Python 3
+    ...
+    >>> with open("GenBank/NC_000932.gb.bgz", "rb") as handle:
+    ...     for values in make_gzi(handle):
+    ...         print("Raw start %i; data start %i" % values)
+    Raw start 0; data start 0
+    Raw start 15073; data start 65536
+    Raw start 32930; data start 131072
+    Raw start 55074; data start 196608
+    Raw start 77304; data start 262144
+    Raw start 92243; data start 305622
+
+    """
+    index = []
+    data_start = 0
+    while True:
+        start_offset = handle.tell()
+        try:
+            block_length, raw = _read_bgzf_block(handle)
+        except StopIteration:
+            break
+        index.append((start_offset, data_start))
+        data_start += raw[2]
+    return index
+
+
+def read_gzi(filename):
+    """Load a samtools/htslib style .gzi BGZF block index.
+
+    The file holds the number of entries, followed by the compressed and
+    uncompressed offset for each block start except the first, all as
+    unsigned 64 bit little endian integers. Returns a list of tuples as
+    from the make_gzi function, including the implicit first block at
+    (0, 0).
+    """
+    with _open(filename, "rb") as handle:
+        data = handle.read(8)
+        if len(data) != 8:
+            raise ValueError("Truncated .gzi file %r" % filename)
+        count = struct.unpack("<Q", data)[0]
+        data = handle.read(16 * count)
+    if len(data) != 16 * count:
+        raise ValueError("Truncated .gzi file %r, expected %i entries"
+                         % (filename, count))
+    index = [(0, 0)]
+    for i in range(count):
+        index.append(struct.unpack("<QQ", data[16 * i:16 * i + 16]))
+    return index
+
+
+def write_gzi(filename, index):
+    """Save a samtools/htslib style .gzi BGZF block index.
+
+    Takes a list of (compressed offset, uncompressed offset) tuples as
+    from the make_gzi function. The implicit first block at (0, 0) is
+    not written to the file.
+    """
+    if index and index[0] == (0, 0):
+        index = index[1:]
+    with _open(filename, "wb") as handle:
+        handle.write(struct.pack("<Q", len(index)))
+        for start_offset, data_start in index:
+            handle.write(struct.pack("<QQ", start_offset, data_start))
+
+
+def gzi_virtual_offset(index, offset):
+    """Convert an uncompressed offset to a BGZF virtual offset using a block index.
+
+    Takes a list of (compressed offset, uncompressed offset) tuples as from
+    the make_gzi or read_gzi functions, which must be sorted:
+
+    >>> index = [(0, 0), (15073, 65536), (32930, 131072), (55074, 196608)]
+    >>> gzi_virtual_offset(index, 196734)
+    3609329790
+    >>> split_virtual_offset(3609329790)
+    (55074, 126)
+
+    """
+    if offset < 0:
+        raise ValueError("Require a non-negative offset, got %i" % offset)
+    data_starts = [data_start for start_offset, data_start in index]
+    start_offset, data_start = index[bisect_right(data_starts, offset) - 1]
+    return make_virtual_offset(start_offset, offset - data_start)
 
 
 class BgzfReader(object):
@@ -518,14 +646,44 @@ class BgzfReader(object):
     block can be up to 64kb, the default cache could take up to 6MB of
     RAM. The cache is not important for reading through the file in one
     pass, but is important for improving performance of random access.
+
+    Decompressing the BGZF blocks is normally the bottleneck when reading
+    through a large file. Use the threads argument to decompress the next
+    few blocks in a pool of worker threads ahead of the block currently
+    being read (zlib releases the GIL while decompressing). The blocks
+    are still returned in order, and the virtual offsets used by seek and
+    tell are unchanged:
+
+    >>> handle = BgzfReader("SamBam/ex1.bam", "rb", threads=4)
+    >>> data = handle.read(65536 + 4)
+    >>> handle.tell()
+    1195311108
+    >>> handle.seek(2)
+    2
+    >>> handle.close()
+
+    If you need to seek to a position in the uncompressed data, use the
+    seek_uncompressed method. This needs a BGZF block index, either as
+    a samtools/htslib style .gzi file (by default the filename plus the
+    extension .gzi, or use the gzi argument), or failing that the index
+    is built by scanning the BGZF block headers (without decompressing):
+
+    >>> handle = BgzfReader("GenBank/NC_000932.gb.bgz", "r")
+    >>> handle.seek_uncompressed(196734)
+    3609329790
+    >>> handle.close()
+
     """
 
-    def __init__(self, filename=None, mode="r", fileobj=None, max_cache=100):
+    def __init__(self, filename=None, mode="r", fileobj=None, max_cache=100,
+                 threads=1, gzi=None):
         """Initialize the class."""
         # TODO - Assuming we can seek, check for 28 bytes EOF empty block
         # and if missing warn about possible truncation (as in samtools)?
         if max_cache < 1:
             raise ValueError("Use max_cache with a minimum of 1")
+        if threads < 1:
+            raise ValueError("Use threads with a minimum of 1")
         # Must open the BGZF file in binary mode, but we may want to
         # treat the contents as either text or binary (unicode or
         # bytes under Python 3)
@@ -547,6 +705,18 @@ class BgzfReader(object):
         self._buffers = {}
         self._block_start_offset = None
         self._block_raw_length = None
+        if threads > 1:
+            from multiprocessing.pool import ThreadPool
+            self._pool = ThreadPool(threads)
+        else:
+            self._pool = None
+        self._read_ahead = 2 * threads
+        self._read_ahead_offset = None
+        self._pending = {}
+        if gzi is None and filename is not None:
+            gzi = filename + ".gzi"
+        self._gzi_filename = gzi
+        self._gzi = None
         self._load_block(handle.tell())
 
     def _load_block(self, start_offset=None):
@@ -570,23 +740,67 @@ class BgzfReader(object):
             self._buffers.popitem()
         # Now load the block
         handle = self._handle
-        if start_offset is not None:
-            handle.seek(start_offset)
-        self._block_start_offset = handle.tell()
-        try:
-            block_size, self._buffer = _load_bgzf_block(handle, self._text)
-        except StopIteration:
-            # EOF
-            block_size = 0
-            if self._text:
-                self._buffer = ""
-            else:
-                self._buffer = b""
+        if self._pool is not None:
+            self._block_start_offset = start_offset
+            block_size, self._buffer = self._load_pending_block(start_offset)
+        else:
+            if start_offset is not None:
+                handle.seek(start_offset)
+            self._block_start_offset = handle.tell()
+            try:
+                block_size, self._buffer = _load_bgzf_block(handle, self._text)
+            except StopIteration:
+                # EOF
+                block_size = 0
+                if self._text:
+                    self._buffer = ""
+                else:
+                    self._buffer = b""
         self._within_block_offset = 0
         self._block_raw_length = block_size
         # Finally save the block in our cache,
         self._buffers[self._block_start_offset] = self._buffer, block_size
 
+    def _load_pending_block(self, start_offset):
+        """Load a block via the thread pool, queuing up the following blocks (PRIVATE).
+
+        The raw blocks are read from disk here in the calling thread, only
+        the decompression is done in the worker threads. Returns the block
+        size and decompressed data, which is empty at EOF.
+        """
+        pending = self._pending
+        if start_offset in pending:
+            # Drop any read ahead we have skipped over
+            for offset in [o for o in pending if o < start_offset]:
+                del pending[offset]
+        else:
+            # Random access, discard the read ahead from the old position
+            pending.clear()
+            self._read_ahead_offset = start_offset
+        handle = self._handle
+        while self._read_ahead_offset is not None and \
+                len(pending) < self._read_ahead:
+            offset = self._read_ahead_offset
+            handle.seek(offset)
+            try:
+                block_size, raw = _read_bgzf_block(handle)
+            except StopIteration:
+                # EOF
+                self._read_ahead_offset = None
+                break
+            pending[offset] = block_size, self._pool.apply_async(
+                _inflate_bgzf_block, raw + (self._text,))
+            self._read_ahead_offset = offset + block_size
+        try:
+            block_size, result = pending.pop(start_offset)
+        except KeyError:
+            # EOF
+            if self._text:
+                return 0, ""
+            else:
+                return 0, b""
+        return block_size, result.get()
+
     def tell(self):
         """Return a 64-bit unsigned BGZF virtual offset."""
         if 0 < self._within_block_offset and \
@@ -626,6 +840,26 @@ class BgzfReader(object):
         #       self._within_block_offset)
         return virtual_offset
 
+    def seek_uncompressed(self, offset):
+        """Seek to an offset in the uncompressed data, returns the virtual offset.
+
+        Uses the .gzi block index if available, otherwise builds the
+        block index by scanning the file the first time this is called.
+        """
+        if self._gzi is None:
+            if self._gzi_filename is not None and \
+                    os.path.isfile(self._gzi_filename):
+                index = read_gzi(self._gzi_filename)
+            else:
+                self._handle.seek(0)
+                index = make_gzi(self._handle)
+            self._gzi = index, [data_start for start, data_start in index]
+        index, data_starts = self._gzi
+        if offset < 0:
+            raise ValueError("Require a non-negative offset, got %i" % offset)
+        start_offset, data_start = index[bisect_right(data_starts, offset) - 1]
+        return self.seek(make_virtual_offset(start_offset, offset - data_start))
+
     def read(self, size=-1):
         """Read method for the BGZF module."""
         if size < 0:
@@ -702,6 +936,10 @@ class BgzfReader(object):
 
     def close(self):
         """Close BGZF file."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+            self._pending = None
         self._handle.close()
         self._buffer = None
         self._block_start_offset = None
@@ -728,11 +966,55 @@ class BgzfReader(object):
         self.close()
 
 
+def _compress_bgzf_block(block, compresslevel=6):
+    """Compress data as a single BGZF block, returning the raw bytes (PRIVATE)."""
+    assert len(block) <= 65536
+    # Giving a negative window bits means no gzip/zlib headers,
+    # -15 used in samtools
+    c = zlib.compressobj(compresslevel,
+                         zlib.DEFLATED,
+                         -15,
+                         zlib.DEF_MEM_LEVEL,
+                         0)
+    compressed = c.compress(block) + c.flush()
+    del c
+    assert len(compressed) < 65536, \
+        "TODO - Didn't compress enough, try less data in this block"
+    bsize = struct.pack("<H", len(compressed) + 25)  # includes -1
+    crc = struct.pack("<I", zlib.crc32(block) & 0xffffffff)
+    uncompressed_length = struct.pack("<I", len(block))
+    # Fixed 16 bytes,
+    # gzip magic bytes (4) mod time (4),
+    # gzip flag (1), os (1), extra length which is six (2),
+    # sub field which is BC (2), sub field length of two (2),
+    # Variable data,
+    # 2 bytes: block length as BC sub field (2)
+    # X bytes: the data
+    # 8 bytes: crc (4), uncompressed data length (4)
+    return _bgzf_header + bsize + compressed + crc + uncompressed_length
+
+
 class BgzfWriter(object):
-    """Define a BGZFWriter object."""
+    """Define a BGZFWriter object.
+
+    Use the threads argument to compress the BGZF blocks in a pool of
+    worker threads. The compressed blocks are written out in order, so
+    the output is identical to that from a single thread. Note that
+    calling the tell method has to wait for all the queued blocks to be
+    compressed and written in order to give the virtual offset.
+
+    Use the gzi argument to give a filename for a samtools/htslib style
+    .gzi block index, which will be written when the BGZF file is closed.
+    This is not supported in append mode.
+    """
 
-    def __init__(self, filename=None, mode="w", fileobj=None, compresslevel=6):
+    def __init__(self, filename=None, mode="w", fileobj=None, compresslevel=6,
+                 threads=1, gzi=None):
         """Initilize the class."""
+        if threads < 1:
+            raise ValueError("Use threads with a minimum of 1")
+        if gzi is not None and "a" in mode.lower():
+            raise ValueError("Cannot write a .gzi index in append mode")
         if fileobj:
             assert filename is None
             handle = fileobj
@@ -747,42 +1029,47 @@ class BgzfWriter(object):
         self._handle = handle
         self._buffer = b""
         self.compresslevel = compresslevel
+        if threads > 1:
+            from multiprocessing.pool import ThreadPool
+            self._pool = ThreadPool(threads)
+        else:
+            self._pool = None
+        self._max_pending = 2 * threads
+        self._pending = deque()
+        self._gzi_filename = gzi
+        self._gzi = [(0, 0)]
+        self._data_start = 0
 
     def _write_block(self, block):
-        """Write provided data to file as a single BGZF compressed block (PRIVATE)."""
+        """Write provided data to file as a single BGZF compressed block (PRIVATE).
+
+        If using threads, the block is queued for compression and only
+        written once all the blocks before it have been written.
+        """
         # print("Saving %i bytes" % len(block))
-        start_offset = self._handle.tell()
-        assert len(block) <= 65536
-        # Giving a negative window bits means no gzip/zlib headers,
-        # -15 used in samtools
-        c = zlib.compressobj(self.compresslevel,
-                             zlib.DEFLATED,
-                             -15,
-                             zlib.DEF_MEM_LEVEL,
-                             0)
-        compressed = c.compress(block) + c.flush()
-        del c
-        assert len(compressed) < 65536, \
-            "TODO - Didn't compress enough, try less data in this block"
-        crc = zlib.crc32(block)
-        # Should cope with a mix of Python platforms...
-        if crc < 0:
-            crc = struct.pack("<i", crc)
-        else:
-            crc = struct.pack("<I", crc)
-        bsize = struct.pack("<H", len(compressed) + 25)  # includes -1
-        crc = struct.pack("<I", zlib.crc32(block) & 0xffffffff)
-        uncompressed_length = struct.pack("<I", len(block))
-        # Fixed 16 bytes,
-        # gzip magic bytes (4) mod time (4),
-        # gzip flag (1), os (1), extra length which is six (2),
-        # sub field which is BC (2), sub field length of two (2),
-        # Variable data,
-        # 2 bytes: block length as BC sub field (2)
-        # X bytes: the data
-        # 8 bytes: crc (4), uncompressed data length (4)
-        data = _bgzf_header + bsize + compressed + crc + uncompressed_length
+        if self._pool is None:
+            self._write_compressed(_compress_bgzf_block(block, self.compresslevel),
+                                   len(block))
+            return
+        self._pending.append((len(block), self._pool.apply_async(
+            _compress_bgzf_block, (block, self.compresslevel))))
+        while len(self._pending) > self._max_pending:
+            block_len, result = self._pending.popleft()
+            self._write_compressed(result.get(), block_len)
+
+    def _write_pending(self):
+        """Wait for and write out any queued compressed blocks (PRIVATE)."""
+        pending = self._pending
+        while pending:
+            block_len, result = pending.popleft()
+            self._write_compressed(result.get(), block_len)
+
+    def _write_compressed(self, data, block_len):
+        """Write a compressed BGZF block, recording it for the index (PRIVATE)."""
         self._handle.write(data)
+        if self._gzi_filename is not None:
+            self._data_start += block_len
+            self._gzi.append((self._handle.tell(), self._data_start))
 
     def write(self, data):
         """Write method for the class."""
@@ -808,6 +1095,7 @@ class BgzfWriter(object):
             self._buffer = self._buffer[65535:]
         self._write_block(self._buffer)
         self._buffer = b""
+        self._write_pending()
         self._handle.flush()
 
     def close(self):
@@ -820,12 +1108,20 @@ class BgzfWriter(object):
         """
         if self._buffer:
             self.flush()
+        self._write_pending()
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
         self._handle.write(_bgzf_eof)
         self._handle.flush()
         self._handle.close()
+        if self._gzi_filename is not None:
+            write_gzi(self._gzi_filename, self._gzi)
 
     def tell(self):
         """Return a BGZF 64-bit virtual offset."""
+        self._write_pending()
         return make_virtual_offset(self._handle.tell(), len(self._buffer))
 
     def seekable(self):
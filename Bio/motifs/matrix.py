@@ -10,6 +10,7 @@ import math
 import platform
 
 from Bio._py3k import range
+from Bio._py3k import _as_bytes
 
 from Bio.Seq import Seq
 from Bio.Alphabet import IUPAC
@@ -26,6 +27,10 @@ try:
         logodds = [[score_dict[letter][i] for letter in "ACGT"] for i in range(m)]
         return _pwm.calculate(sequence, logodds)
 
+    def _above(scores, threshold):
+        """Return the indices of scores above the threshold (PRIVATE)."""
+        return (scores > threshold).nonzero()[0].tolist()
+
 except ImportError:
     if platform.python_implementation() == 'CPython':
         import warnings
@@ -54,6 +59,10 @@ except ImportError:
             scores.append(score)
         return scores
 
+    def _above(scores, threshold):
+        """Return the indices of scores above the threshold (PRIVATE)."""
+        return [i for i, score in enumerate(scores) if score > threshold]
+
 
 class GenericPositionMatrix(dict):
 
@@ -368,6 +377,16 @@ class PositionWeightMatrix(GenericPositionMatrix):
 
 class PositionSpecificScoringMatrix(GenericPositionMatrix):
 
+    def _check_alphabets(self, sequence):
+        """Check the PSSM and sequence are both DNA (PRIVATE)."""
+        # TODO - Code itself tolerates ambiguous bases (as NaN).
+        if not isinstance(self.alphabet, IUPAC.IUPACUnambiguousDNA):
+            raise ValueError("PSSM has wrong alphabet: %s - Use only with DNA motifs"
+                                 % self.alphabet)
+        if not isinstance(sequence.alphabet, IUPAC.IUPACUnambiguousDNA):
+            raise ValueError("Sequence has wrong alphabet: %r - Use only with DNA sequences"
+                                 % sequence.alphabet)
+
     def calculate(self, sequence):
         """Returns the PWM score for a given sequence for all positions.
 
@@ -379,13 +398,7 @@ class PositionSpecificScoringMatrix(GenericPositionMatrix):
          - otherwise, the result is a one-dimensional list or numpy array
 
         """
-        # TODO - Code itself tolerates ambiguous bases (as NaN).
-        if not isinstance(self.alphabet, IUPAC.IUPACUnambiguousDNA):
-            raise ValueError("PSSM has wrong alphabet: %s - Use only with DNA motifs"
-                                 % self.alphabet)
-        if not isinstance(sequence.alphabet, IUPAC.IUPACUnambiguousDNA):
-            raise ValueError("Sequence has wrong alphabet: %r - Use only with DNA sequences"
-                                 % sequence.alphabet)
+        self._check_alphabets(sequence)
 
         # NOTE: The C code handles mixed case input as this could be large
         # (e.g. contig or chromosome), so requiring it be all upper or lower
@@ -401,26 +414,41 @@ class PositionSpecificScoringMatrix(GenericPositionMatrix):
         else:
             return scores
 
-    def search(self, sequence, threshold=0.0, both=True):
+    def search(self, sequence, threshold=0.0, both=True, chunk_size=1000000):
         """Find hits with PWM score above given threshold.
 
         A generator function, returning found hits in the given sequence
         with the pwm score higher than the threshold.
+
+        Hits on the reverse strand (if both=True) are given with negative
+        positions, counted from the end of the sequence.
+
+        The scores are calculated for up to chunk_size positions at a time
+        (on each strand), so the memory used for long sequences such as
+        whole chromosomes is bounded.
         """
-        sequence = sequence.upper()
+        self._check_alphabets(sequence)
+        # The score calculation copes with mixed case, and with str we
+        # avoid making a copy of the sequence for each chunk's Seq object:
+        sequence = str(sequence)
         n = len(sequence)
         m = self.length
         if both:
             rc = self.reverse_complement()
-        for position in range(0, n - m + 1):
-            s = sequence[position:position + m]
-            score = self.calculate(s)
-            if score > threshold:
-                yield (position, score)
+        for start in range(0, n - m + 1, chunk_size):
+            chunk = sequence[start:start + chunk_size + m - 1]
+            scores = _calculate(self, chunk, m, len(chunk))
+            hits = [(i, False) for i in _above(scores, threshold)]
             if both:
-                score = rc.calculate(s)
-                if score > threshold:
-                    yield (position - n, score)
+                rc_scores = _calculate(rc, chunk, m, len(chunk))
+                hits.extend((i, True) for i in _above(rc_scores, threshold))
+                # Report the hits by position, forward strand first
+                hits.sort()
+            for i, reverse in hits:
+                if reverse:
+                    yield (start + i - n, rc_scores[i])
+                else:
+                    yield (start + i, scores[i])
 
     @property
     def max(self):
@@ -544,8 +572,13 @@ class PositionSpecificScoringMatrix(GenericPositionMatrix):
         denominator = math.sqrt((sxx - sx * sx) * (syy - sy * sy))
         return numerator / denominator
 
-    def distribution(self, background=None, precision=10 ** 3):
-        """Calculate the distribution of the scores at the given precision."""
+    def distribution(self, background=None, precision=10 ** 3, cache=None):
+        """Calculate the distribution of the scores at the given precision.
+
+        If cache is given, this is used as the filename of an SQLite database
+        in which to store the distribution (or from which to retrieve it, if
+        it was calculated before).
+        """
         from .thresholds import ScoreDistribution
         if background is None:
             background = dict.fromkeys(self._letters, 1.0)
@@ -554,4 +587,220 @@ class PositionSpecificScoringMatrix(GenericPositionMatrix):
         total = sum(background.values())
         for letter in self._letters:
             background[letter] /= total
-        return ScoreDistribution(precision=precision, pssm=self, background=background)
+        return ScoreDistribution(precision=precision, pssm=self,
+                                 background=background, cache=cache)
+
+
+class _PSSMStack(object):
+    """Score many PSSMs on both strands of a sequence at once (PRIVATE).
+
+    The log-odds scores of all the PSSMs (and their reverse complements)
+    are stacked in a matrix with a row for each position in the motif and
+    letter, and a column for each PSSM. A chunk of the sequence is encoded
+    as a matrix with a row for each window, with a one for the letter at
+    each motif position, so that a single matrix product scores all the
+    PSSMs at all the positions in the chunk.
+
+    PSSMs with infinite or NaN log-odds scores (e.g. from zero counts
+    without pseudocounts) are scored separately, by adding up the scores
+    for the letters at each position, since the matrix product would turn
+    any infinite score times zero into a NaN.
+    """
+
+    def __init__(self, pssms, thresholds, both, chunk_size):
+        """Initialize the class."""
+        self.pssms = pssms
+        self.thresholds = thresholds
+        self.both = both
+        self.chunk_size = chunk_size
+        try:
+            import numpy
+        except ImportError:
+            self.weights = None
+            return
+        matrices = [(pssm, k, False) for k, pssm in enumerate(pssms)]
+        if both:
+            matrices.extend((pssm.reverse_complement(), k, True)
+                            for k, pssm in enumerate(pssms))
+        # Put the PSSMs with only finite scores first (keeping the order
+        # of the forward and reverse strand PSSMs):
+        finite = [not any(math.isinf(score) or math.isnan(score)
+                          for letter in "ACGT" for score in pssm[letter])
+                  for pssm, k, reverse in matrices]
+        matrices = ([matrix for matrix, ok in zip(matrices, finite) if ok] +
+                    [matrix for matrix, ok in zip(matrices, finite) if not ok])
+        self.finite = sum(finite)
+        self.columns = [(k, reverse) for pssm, k, reverse in matrices]
+        lengths = [pssm.length for pssm, k, reverse in matrices]
+        self.length = max(lengths + [1])
+        self.min_length = min(lengths + [1])
+        weights = numpy.zeros((self.length, 5, len(matrices)))
+        for column, (pssm, k, reverse) in enumerate(matrices):
+            for code, letter in enumerate("ACGT"):
+                weights[:pssm.length, code, column] = pssm[letter]
+            # Any other letter gives a NaN score
+            weights[:pssm.length, 4, column] = numpy.nan
+        self.stacked = weights[:, :4, :self.finite].reshape(
+            4 * self.length, self.finite)
+        self.weights = weights[:, :, self.finite:]
+        lengths = numpy.array(lengths[:self.finite], int)
+        self.lengths = [(m, (lengths == m).nonzero()[0])
+                        for m in set(lengths.tolist())]
+        self.thresholds = numpy.array([thresholds[k] for k, reverse
+                                       in self.columns], numpy.float32)
+        self.codes = numpy.zeros(256, numpy.uint8) + 4
+        for code, letters in enumerate(("Aa", "Cc", "Gg", "Tt")):
+            for letter in letters:
+                self.codes[ord(letter)] = code
+
+    def locate(self, sequence):
+        """Find the hits of all the PSSMs in the sequence.
+
+        Returns the sequence length and NumPy arrays of the position, PSSM
+        column and score of each hit (or if NumPy is not available, the
+        lists of hits for each PSSM).
+        """
+        for pssm in self.pssms:
+            pssm._check_alphabets(sequence)
+        if self.weights is None:
+            return [list(pssm.search(sequence, threshold, self.both))
+                    for pssm, threshold in zip(self.pssms, self.thresholds)]
+        import numpy
+        n = len(sequence)
+        m = self.length
+        # Pad with unknown letters so that every window has the full
+        # length (windows running off the end then get NaN scores):
+        codes = numpy.zeros(n + m - 1, numpy.uint8) + 4
+        codes[:n] = self.codes[numpy.frombuffer(_as_bytes(str(sequence)),
+                                                numpy.uint8)]
+        unknown = numpy.zeros(n + m, int)
+        numpy.cumsum(codes == 4, out=unknown[1:])
+        letters = numpy.vstack((numpy.eye(4), numpy.zeros(4)))
+        found = [(numpy.zeros(0, int), numpy.zeros(0, int),
+                  numpy.zeros(0, numpy.float32))]
+        for start in range(0, n - self.min_length + 1, self.chunk_size):
+            size = min(self.chunk_size, n - self.min_length + 1 - start)
+            windows = numpy.empty((size, 4 * m))
+            for j in range(m):
+                windows[:, 4 * j:4 * j + 4] = letters[codes[start + j:
+                                                            start + j + size]]
+            scores = numpy.dot(windows, self.stacked)
+            for length, columns in self.lengths:
+                rows = (unknown[start + length:start + length + size] >
+                        unknown[start:start + size]).nonzero()[0]
+                if len(rows):
+                    scores[numpy.ix_(rows, columns)] = numpy.nan
+            if self.weights.shape[2]:
+                with numpy.errstate(invalid="ignore"):
+                    other = self.weights[0][codes[start:start + size]]
+                    for j in range(1, m):
+                        other += self.weights[j][codes[start + j:
+                                                       start + j + size]]
+                scores = numpy.hstack((scores, other))
+            scores = scores.astype(numpy.float32)
+            rows, columns = (scores > self.thresholds).nonzero()
+            found.append((rows + start, columns, scores[rows, columns]))
+        return (n,) + tuple(numpy.concatenate(values)
+                            for values in zip(*found))
+
+    def hits(self, found):
+        """Return a list of the hits of each PSSM from the locate method."""
+        if self.weights is None:
+            return found
+        n, positions, columns, scores = found
+        hits = [[] for pssm in self.pssms]
+        # These are in order of position, then forward strand first:
+        for i, column, score in zip(positions.tolist(), columns.tolist(),
+                                    scores):
+            k, reverse = self.columns[column]
+            if reverse:
+                hits[k].append((i - n, score))
+            else:
+                hits[k].append((i, score))
+        return hits
+
+
+_pssm_stack = None
+
+
+def _set_pssm_stack(stack):
+    """Set the PSSMs to use in a worker process (PRIVATE)."""
+    global _pssm_stack
+    _pssm_stack = stack
+
+
+def _locate_hits(sequence):
+    """Search a sequence using the PSSMs in a worker process (PRIVATE)."""
+    return _pssm_stack.locate(sequence)
+
+
+def search_many(pssms, sequences, threshold=0.0, both=True, processes=1,
+                chunk_size=1000):
+    """Search many sequences with many PSSMs at once.
+
+    Arguments:
+     - pssms - a list of PositionSpecificScoringMatrix objects, e.g. from
+       the motifs in a JASPAR file using [motif.pssm for motif in motifs]
+     - sequences - an iterable of DNA sequences (Seq objects)
+     - threshold - minimum score of a hit, either one value for all the
+       PSSMs or a list of values (one for each PSSM), e.g. thresholds
+       calculated using each PSSM's score distribution
+     - both - search both strands (default) or the forward strand only
+     - processes - number of worker processes to search the sequences
+       in parallel (default 1, no worker processes)
+     - chunk_size - number of positions in each sequence to score at
+       once; the memory needed is about 16 bytes times the chunk size
+       times the number of PSSMs (doubled when searching both strands)
+
+    For each sequence, this returns a list with the hits of each PSSM in
+    turn, as (position, score) tuples like the PSSM search method.
+
+    With NumPy, each sequence is encoded once and all the PSSMs are scored
+    together in one matrix multiplication per chunk of positions.
+
+    >>> from Bio import motifs
+    >>> from Bio.Seq import Seq
+    >>> from Bio.motifs.matrix import search_many
+    >>> with open("motifs/SRF.pfm") as handle:
+    ...     srf = motifs.read(handle, "pfm")
+    >>> srf.pseudocounts = 0.25
+    >>> with open("motifs/Arnt.sites") as handle:
+    ...     arnt = motifs.read(handle, "sites")
+    >>> pssms = [srf.pssm, arnt.pssm]
+    >>> thresholds = [10.0, 5.0]
+    >>> sequences = [Seq("TTGCCCATATATGGCACGTGCT", srf.alphabet),
+    ...              Seq("ACGTGCCATATTTGGC", srf.alphabet)]
+    >>> for hits in search_many(pssms, sequences, thresholds):
+    ...     for pssm_hits in hits:
+    ...         print(["%i: %0.2f" % hit for hit in pssm_hits])
+    ['2: 21.39', '-18: 14.30']
+    ['14: 11.60', '-8: 11.60']
+    ['3: 10.57']
+    []
+
+    """
+    pssms = list(pssms)
+    try:
+        thresholds = [float(threshold)] * len(pssms)
+    except TypeError:
+        thresholds = [float(value) for value in threshold]
+        if len(thresholds) != len(pssms):
+            raise ValueError("Need one threshold for each PSSM")
+    if processes < 1:
+        raise ValueError("Need at least one process, not %r" % processes)
+    if chunk_size < 1:
+        raise ValueError("Need a positive chunk size, not %r" % chunk_size)
+    stack = _PSSMStack(pssms, thresholds, both, chunk_size)
+    if processes == 1:
+        for sequence in sequences:
+            yield stack.hits(stack.locate(sequence))
+        return
+    import multiprocessing
+    pool = multiprocessing.Pool(processes, _set_pssm_stack, (stack,))
+    try:
+        # The workers return arrays, which are much quicker to pass back
+        # than lists of tuples:
+        for found in pool.imap(_locate_hits, sequences):
+            yield stack.hits(found)
+    finally:
+        pool.terminate()
@@ -5,6 +5,14 @@
 # as part of this package.
 """Approximate calculation of appropriate thresholds for motif finding."""
 
+import hashlib
+import struct
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 class ScoreDistribution(object):
     """Class representing approximate score distribution for a given motif.
@@ -14,8 +22,16 @@ class ScoreDistribution(object):
     thresholds for motif occurrences.
     """
 
-    def __init__(self, motif=None, precision=10 ** 3, pssm=None, background=None):
-        """Initialize the class."""
+    def __init__(self, motif=None, precision=10 ** 3, pssm=None, background=None,
+                 cache=None):
+        """Initialize the class.
+
+        For a PSSM, the distribution can be stored in (and retrieved from) a
+        cache, given as the filename of an SQLite database (which will be
+        created if needed). The distributions are stored under a checksum of
+        the PSSM, background and precision, so the same cache can be used
+        for many motifs.
+        """
         if pssm is None:
             self.min_score = min(0.0, motif.min_score())
             self.interval = max(0.0, motif.max_score()) - self.min_score
@@ -27,6 +43,10 @@ class ScoreDistribution(object):
             self.n_points = precision * pssm.length
             self.ic = pssm.mean(background)
         self.step = self.interval / (self.n_points - 1)
+        if pssm is not None and cache is not None:
+            key = _cache_key(pssm, background, precision)
+            if self._load(cache, key):
+                return
         self.mo_density = [0.0] * self.n_points
         self.mo_density[-self._index_diff(self.min_score)] = 1.0
         self.bg_density = [0.0] * self.n_points
@@ -36,18 +56,17 @@ class ScoreDistribution(object):
                 self.modify(lo, mo, motif.background)
         else:
             for position in range(pssm.length):
-                mo_new = [0.0] * self.n_points
-                bg_new = [0.0] * self.n_points
                 lo = pssm[:, position]
-                for letter, score in lo.items():
-                    bg = background[letter]
-                    mo = pow(2, pssm[letter, position]) * bg
-                    d = self._index_diff(score)
-                    for i in range(self.n_points):
-                        mo_new[self._add(i, d)] += self.mo_density[i] * mo
-                        bg_new[self._add(i, d)] += self.bg_density[i] * bg
-                self.mo_density = mo_new
-                self.bg_density = bg_new
+                mo_probs = {}
+                for letter in lo:
+                    mo_probs[letter] = pow(2, lo[letter]) * background[letter]
+                self.modify(lo, mo_probs, background)
+        if numpy is not None:
+            # The threshold methods are faster with lists than NumPy arrays
+            self.mo_density = self.mo_density.tolist()
+            self.bg_density = self.bg_density.tolist()
+        if pssm is not None and cache is not None:
+            self._save(cache, key)
 
     def _index_diff(self, x, y=0.0):
         return int((x - y + 0.5 * self.step) // self.step)
@@ -56,6 +75,9 @@ class ScoreDistribution(object):
         return max(0, min(self.n_points - 1, i + j))
 
     def modify(self, scores, mo_probs, bg_probs):
+        if numpy is not None:
+            self._modify_numpy(scores, mo_probs, bg_probs)
+            return
         mo_new = [0.0] * self.n_points
         bg_new = [0.0] * self.n_points
         for k, v in scores.items():
@@ -66,6 +88,70 @@ class ScoreDistribution(object):
         self.mo_density = mo_new
         self.bg_density = bg_new
 
+    def _modify_numpy(self, scores, mo_probs, bg_probs):
+        """Add a position to the distributions using NumPy (PRIVATE).
+
+        Shifting the densities by the (discretised) score of each letter
+        is done with array slices, with whatever is shifted past either end
+        of the range added to the first or last point (as in _add).
+        """
+        n = self.n_points
+        mo_density = numpy.asarray(self.mo_density)
+        bg_density = numpy.asarray(self.bg_density)
+        mo_new = numpy.zeros(n)
+        bg_new = numpy.zeros(n)
+        for k, v in scores.items():
+            d = self._index_diff(v)
+            for density, new, prob in ((mo_density, mo_new, mo_probs[k]),
+                                       (bg_density, bg_new, bg_probs[k])):
+                if d >= n:
+                    new[-1] += density.sum() * prob
+                elif d >= 0:
+                    new[d:] += density[:n - d] * prob
+                    new[-1] += density[n - d:].sum() * prob
+                elif d > -n:
+                    new[:n + d] += density[-d:] * prob
+                    new[0] += density[:-d].sum() * prob
+                else:
+                    new[0] += density.sum() * prob
+        self.mo_density = mo_new
+        self.bg_density = bg_new
+
+    def _load(self, cache, key):
+        """Load the densities from the cache, returns True if found (PRIVATE)."""
+        from sqlite3 import dbapi2 as _sqlite
+        con = _sqlite.connect(cache)
+        try:
+            con.execute("CREATE TABLE IF NOT EXISTS distributions "
+                        "(key TEXT PRIMARY KEY, n_points INTEGER, "
+                        "mo_density BLOB, bg_density BLOB);")
+            row = con.execute("SELECT n_points, mo_density, bg_density "
+                              "FROM distributions WHERE key=?;",
+                              (key,)).fetchone()
+        finally:
+            con.close()
+        if row is None or row[0] != self.n_points:
+            return False
+        fmt = "<%id" % self.n_points
+        self.mo_density = list(struct.unpack(fmt, row[1]))
+        self.bg_density = list(struct.unpack(fmt, row[2]))
+        return True
+
+    def _save(self, cache, key):
+        """Save the densities in the cache (PRIVATE)."""
+        from sqlite3 import dbapi2 as _sqlite
+        fmt = "<%id" % self.n_points
+        con = _sqlite.connect(cache)
+        try:
+            with con:
+                con.execute("INSERT OR REPLACE INTO distributions "
+                            "VALUES (?, ?, ?, ?);",
+                            (key, self.n_points,
+                             _sqlite.Binary(struct.pack(fmt, *self.mo_density)),
+                             _sqlite.Binary(struct.pack(fmt, *self.bg_density))))
+        finally:
+            con.close()
+
     def threshold_fpr(self, fpr):
         """Approximate the log-odds threshold which makes the type I error (false positive rate)."""
         i = self.n_points
@@ -106,3 +192,12 @@ class ScoreDistribution(object):
         are not directly comparable.
         """
         return self.threshold_fpr(fpr=2 ** -self.ic)
+
+
+def _cache_key(pssm, background, precision):
+    """Return a checksum of the PSSM, background and precision (PRIVATE)."""
+    letters = sorted(pssm)
+    text = "%r\n%r\n%r\n" % (precision,
+                              [background[letter] for letter in letters],
+                              [(letter, pssm[letter]) for letter in letters])
+    return hashlib.sha1(text.encode("ascii")).hexdigest()
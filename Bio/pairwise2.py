@@ -89,11 +89,29 @@ All alignment functions have the following arguments:
 
 - ``score_only``: boolean (default: False).
   Only get the best score, don't recover any alignments. The return value of
-  the function is the score. Faster and uses less memory.
+  the function is the score. Faster and uses less memory. If NumPy is
+  installed, the scores of longer sequences with affine gap penalties and
+  match scores given as ``m`` or ``d`` parameters (e.g. a substitution matrix
+  from ``Bio.SubsMat.MatrixInfo``) are calculated with vectorized array
+  operations in linear memory, which is much faster still.
 
 - ``one_alignment_only``: boolean (default: False).
   Only recover one alignment.
 
+- ``band``: integer (default: None).
+  Only consider alignments that stay within this many diagonals of the main
+  diagonal (if the sequences differ in length, the band is widened by the
+  difference). This needs time and memory proportional to the length of the
+  sequences times the band width, instead of their product. Alignments
+  leaving the band are not found. Needs affine gap penalties.
+
+- ``linear_memory``: boolean (default: False).
+  Use a linear amount of memory, following the divide and conquer approach
+  of Hirschberg (with affine gaps as described by Myers and Miller). Only a
+  single best alignment is returned (or the score, if ``score_only`` is
+  set), which is not necessarily the same as the first alignment found
+  otherwise. Needs affine gap penalties, can be combined with ``band``.
+
 The other parameters of the alignment function depend on the function called.
 Some examples:
 
@@ -210,6 +228,20 @@ Some examples:
   Self-defined match functions must take the two residues to be compared and
   return a score.
 
+- To align one sequence against many others with the same parameters, use the
+  ``many`` method of an alignment function. It takes an iterable of sequences
+  in place of the second sequence, and yields the results for each of them in
+  turn. The extra argument ``processes`` spreads the work over several
+  processes:
+
+    >>> targets = ["ACG", "ACCGT", "AGT"]
+    >>> for score in pairwise2.align.globalms.many("ACCGT", targets, 2, -1,
+    ...                                            -.5, -.1, score_only=True):
+    ...     print("%.1f" % score)
+    5.0
+    10.0
+    5.4
+
 To see a description of the parameters for a function, please look at
 the docstring for the function via the help function, e.g.
 type ``help(pairwise2.align.localds``) at the Python prompt.
@@ -217,8 +249,14 @@ type ``help(pairwise2.align.localds``) at the Python prompt.
 """  # noqa: W291
 from __future__ import print_function
 
+import numbers
 import warnings
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from Bio import BiopythonWarning
 
 
@@ -389,6 +427,8 @@ alignment occurs.
                 ('force_generic', 0),
                 ('score_only', 0),
                 ('one_alignment_only', 0),
+                ('band', None),
+                ('linear_memory', 0),
             ]
             for name, default in default_params:
                 keywds[name] = keywds.get(name, default)
@@ -406,6 +446,38 @@ alignment occurs.
             keywds = self.decode(*args, **keywds)
             return _align(**keywds)
 
+        def many(self, sequenceA, sequences, *args, **keywds):
+            """Align one sequence against many others, as an iterator.
+
+            Takes the same arguments as the alignment function itself, but
+            instead of the second sequence an iterable of sequences. The
+            arguments are decoded only once, and for each of the sequences
+            this yields the alignments (or the score, if score_only is set)
+            with sequenceA, in the same order as the sequences.
+
+            With the extra argument processes > 1 (default 1) the
+            alignments are done in parallel using a pool of worker
+            processes, sending them chunksize sequences at a time (default
+            100). Any match_fn or gap penalty callback functions must then
+            be picklable (e.g. not lambda functions). As usual with the
+            multiprocessing module, on Windows this needs to be called
+            from within an ``if __name__ == "__main__":`` block.
+            """
+            processes = keywds.pop('processes', 1)
+            chunksize = keywds.pop('chunksize', 100)
+            if processes < 1:
+                raise ValueError("Need at least one process, not %r"
+                                 % processes)
+            if chunksize < 1:
+                raise ValueError("Need a positive chunk size, not %r"
+                                 % chunksize)
+            keywds = self.decode(sequenceA, None, *args, **keywds)
+            del keywds['sequenceB']
+            if processes == 1:
+                return (_align(sequenceB=sequenceB, **keywds)
+                        for sequenceB in sequences)
+            return _align_many(keywds, sequences, processes, chunksize)
+
     def __getattr__(self, attr):
         """Call alignment_function() to check and decode the attributes."""
         # The following 'magic' is needed to rewrite the class docstring
@@ -423,10 +495,39 @@ alignment occurs.
 align = align()
 
 
+_many_keywds = None
+
+
+def _init_many(keywds):
+    """Store the decoded arguments in a worker process (PRIVATE)."""
+    global _many_keywds
+    _many_keywds = keywds
+
+
+def _align_one(sequenceB):
+    """Align sequenceB in a worker process (PRIVATE)."""
+    return _align(sequenceB=sequenceB, **_many_keywds)
+
+
+def _align_many(keywds, sequences, processes, chunksize):
+    """Yield the alignments of many sequences using a process pool (PRIVATE).
+
+    The decoded arguments are sent to each worker process only once, when
+    it is started. Used by the alignment_function.many method.
+    """
+    import multiprocessing
+    pool = multiprocessing.Pool(processes, _init_many, (keywds,))
+    try:
+        for result in pool.imap(_align_one, sequences, chunksize):
+            yield result
+    finally:
+        pool.terminate()
+
+
 def _align(sequenceA, sequenceB, match_fn, gap_A_fn, gap_B_fn,
            penalize_extend_when_opening, penalize_end_gaps,
            align_globally, gap_char, force_generic, score_only,
-           one_alignment_only):
+           one_alignment_only, band=None, linear_memory=False):
     """Return a list of alignments between two sequences or its score (PRIVATE)."""
     if not sequenceA or not sequenceB:
         return []
@@ -447,14 +548,40 @@ def _align(sequenceA, sequenceB, match_fn, gap_A_fn, gap_B_fn,
                       'alignments. The resulting score may be wrong.',
                       BiopythonWarning)
 
-    if (not force_generic) and isinstance(gap_A_fn, affine_penalty) \
-       and isinstance(gap_B_fn, affine_penalty):
+    affine = (not force_generic) and isinstance(gap_A_fn, affine_penalty) \
+        and isinstance(gap_B_fn, affine_penalty)
+    if band is not None or linear_memory:
+        if not affine:
+            raise ValueError('"band" and "linear_memory" need affine gap '
+                             'penalties')
+        if band is not None and band < 0:
+            raise ValueError('"band" must not be negative')
+    if linear_memory:
+        return _align_linear_memory(
+            sequenceA, sequenceB, match_fn, gap_A_fn, gap_B_fn,
+            penalize_extend_when_opening, penalize_end_gaps, align_globally,
+            gap_char, score_only, band)
+
+    if affine:
         open_A, extend_A = gap_A_fn.open, gap_A_fn.extend
         open_B, extend_B = gap_B_fn.open, gap_B_fn.extend
-        x = _make_score_matrix_fast(
-            sequenceA, sequenceB, match_fn, open_A, extend_A, open_B,
-            extend_B, penalize_extend_when_opening, penalize_end_gaps,
-            align_globally, score_only)
+        if score_only and band is None and numpy is not None and \
+                isinstance(match_fn, (identity_match, dictionary_match)) and \
+                len(sequenceA) * len(sequenceB) >= _VECTORIZE_CELLS:
+            return _score_vectorized(
+                sequenceA, sequenceB, match_fn, open_A, extend_A, open_B,
+                extend_B, penalize_extend_when_opening, penalize_end_gaps,
+                align_globally)
+        if band is not None:
+            x = _make_score_matrix_banded(
+                sequenceA, sequenceB, match_fn, open_A, extend_A, open_B,
+                extend_B, penalize_extend_when_opening, penalize_end_gaps,
+                align_globally, score_only, band)
+        else:
+            x = _make_score_matrix_fast(
+                sequenceA, sequenceB, match_fn, open_A, extend_A, open_B,
+                extend_B, penalize_extend_when_opening, penalize_end_gaps,
+                align_globally, score_only)
     else:
         x = _make_score_matrix_generic(
             sequenceA, sequenceB, match_fn, gap_A_fn, gap_B_fn,
@@ -712,6 +839,661 @@ def _make_score_matrix_fast(sequenceA, sequenceB, match_fn, open_A, extend_A,
     return score_matrix, trace_matrix
 
 
+# Score only alignments of sequences giving at least this many cells are
+# calculated with NumPy by _score_vectorized (if NumPy is installed).
+_VECTORIZE_CELLS = 1000
+
+
+def _score_vectorized(sequenceA, sequenceB, match_fn, open_A, extend_A,
+                      open_B, extend_B, penalize_extend_when_opening,
+                      penalize_end_gaps, align_globally):
+    """Return the best alignment score, calculated using NumPy (PRIVATE).
+
+    This calculates the same scores as _make_score_matrix_fast, but one
+    anti-diagonal of the score matrix at a time: the cells of an
+    anti-diagonal only depend on the two previous anti-diagonals, so they
+    can be calculated together with NumPy array operations. Only these
+    anti-diagonals are kept, indexed by row, so this needs linear memory.
+
+    The match scores are looked up in a table of the scores of all pairs
+    of letters in the sequences, made by calling match_fn once for each
+    pair (e.g. a substitution matrix from Bio.SubsMat.MatrixInfo wrapped
+    in a dictionary_match).
+    """
+    pe = penalize_extend_when_opening
+    lenA, lenB = len(sequenceA), len(sequenceB)
+    lettersA, lettersB = {}, {}
+    codesA = numpy.array([lettersA.setdefault(letter, len(lettersA))
+                          for letter in sequenceA], numpy.intp)
+    codesB = numpy.array([lettersB.setdefault(letter, len(lettersB))
+                          for letter in sequenceB][::-1], numpy.intp)
+    scores = dict(((i, j), match_fn(letterA, letterB))
+                  for letterA, i in lettersA.items()
+                  for letterB, j in lettersB.items())
+    # Calculate with integers if all scores and penalties are integers,
+    # so that the score has the same type as from _make_score_matrix_fast
+    if all(isinstance(x, numbers.Integral) for x in
+           list(scores.values()) + [open_A, extend_A, open_B, extend_B]):
+        dtype, score_type = numpy.int64, int
+    else:
+        dtype, score_type = float, float
+    table = numpy.empty((len(lettersA), len(lettersB)), dtype)
+    for (i, j), score in scores.items():
+        table[i, j] = score
+
+    # Gap scores per row (for gaps in sequence A) and per column (for gaps
+    # in sequence B, stored in reverse as the columns of an anti-diagonal
+    # decrease with the row). End gaps are free unless penalized.
+    first_A_gap = calc_affine_penalty(1, open_A, extend_A, pe)
+    first_B_gap = calc_affine_penalty(1, open_B, extend_B, pe)
+    row_open = numpy.full(lenA + 1, first_A_gap, dtype)
+    row_extend = numpy.full(lenA + 1, extend_A, dtype)
+    if not penalize_end_gaps[0]:
+        row_open[lenA] = row_extend[lenA] = 0
+    col_open = numpy.full(lenB + 1, first_B_gap, dtype)
+    col_extend = numpy.full(lenB + 1, extend_B, dtype)
+    if not penalize_end_gaps[1]:
+        col_open[lenB] = col_extend[lenB] = 0
+    col_open, col_extend = col_open[::-1], col_extend[::-1]
+
+    # The first column and row of the score matrix, and the initial scores
+    # of the gaps, as in _make_score_matrix_fast
+    first_col = [0] * (lenA + 1)
+    if penalize_end_gaps[1]:
+        first_col = [calc_affine_penalty(i, open_B, extend_B, pe)
+                     for i in range(lenA + 1)]
+    first_row = [0] * (lenB + 1)
+    if penalize_end_gaps[0]:
+        first_row = [calc_affine_penalty(i, open_A, extend_A, pe)
+                     for i in range(lenB + 1)]
+    row_start = [calc_affine_penalty(i, 2 * open_A, extend_A, pe)
+                 for i in range(lenA + 1)]
+    col_start = [calc_affine_penalty(i, 2 * open_B, extend_B, pe)
+                 for i in range(lenB + 1)]
+
+    # Best scores (H) of the last two anti-diagonals, and the best scores
+    # ending with a gap in sequence A (E) or B (F) of the last one
+    H2 = numpy.zeros(lenA + 1, dtype)
+    H1 = numpy.zeros(lenA + 1, dtype)
+    H = numpy.zeros(lenA + 1, dtype)
+    E1 = numpy.zeros(lenA + 1, dtype)
+    E = numpy.zeros(lenA + 1, dtype)
+    F1 = numpy.zeros(lenA + 1, dtype)
+    F = numpy.zeros(lenA + 1, dtype)
+    H1[0], H1[1] = first_row[1], first_col[1]
+    E1[1], F1[0] = row_start[1], col_start[1]
+    H2[0] = first_row[0]
+    best = max(first_row + first_col)
+    for diagonal in range(2, lenA + lenB + 1):
+        # Rows of the cells not in the first row or column
+        low, high = max(1, diagonal - lenB), min(lenA, diagonal - 1)
+        cols = slice(lenB - diagonal + low, lenB - diagonal + high + 1)
+        rows = slice(low, high + 1)
+        above = slice(low - 1, high)
+        nogap = H2[above] + table[codesA[above], codesB[cols]]
+        E[rows] = numpy.maximum(H1[rows] + row_open[rows],
+                                E1[rows] + row_extend[rows])
+        F[rows] = numpy.maximum(H1[above] + col_open[cols],
+                                F1[above] + col_extend[cols])
+        scores = numpy.maximum(numpy.maximum(nogap, F[rows]), E[rows])
+        if not align_globally:
+            scores[scores < 0] = 0
+        H[rows] = scores
+        if high >= low:
+            best = max(best, scores.max())
+        if diagonal <= lenB:
+            H[0], F[0] = first_row[diagonal], col_start[diagonal]
+        if diagonal <= lenA:
+            H[diagonal], E[diagonal] = first_col[diagonal], row_start[diagonal]
+        H2, H1, H = H1, H, H2
+        E1, E = E, E1
+        F1, F = F, F1
+    if align_globally:
+        return score_type(H1[lenA])
+    return score_type(best)
+
+
+# Score of the cells outside the band of a banded score matrix. This is
+# not float("-inf"), since the traceback needs to round the scores (rint).
+_OUTSIDE_BAND = -1e300
+
+
+def _rint_unbounded(x):
+    """Round like rint, also for scores outside the band (PRIVATE).
+
+    The C implementation of rint overflows for such large numbers.
+    """
+    return int(x * _PRECISION + 0.5)
+
+
+class _BandedRow(object):
+    """Row of a banded score or traceback matrix (PRIVATE).
+
+    Only the cells within the band, starting at column start, are stored in
+    values. Looking up any other column gives the default value.
+    """
+
+    __slots__ = ("start", "values", "ncols", "default")
+
+    def __init__(self, start, values, ncols, default):
+        """Initialize the class."""
+        self.start = start
+        self.values = values
+        self.ncols = ncols
+        self.default = default
+
+    def __len__(self):
+        """Return the number of columns of the full matrix."""
+        return self.ncols
+
+    def __getitem__(self, col):
+        """Return the value in the given column."""
+        if col < 0:
+            col += self.ncols
+        index = col - self.start
+        if 0 <= index < len(self.values):
+            return self.values[index]
+        return self.default
+
+    def __setitem__(self, col, value):
+        """Set the value in the given column (must be within the band)."""
+        if col < 0:
+            col += self.ncols
+        self.values[col - self.start] = value
+
+
+def _band_limits(lenA, lenB, band):
+    """Return the lowest and highest diagonal (col - row) of a band (PRIVATE).
+
+    The band is widened by the difference in length of the sequences, so
+    that it always contains both the start and the end of a global alignment.
+    """
+    return min(0, lenB - lenA) - band, max(0, lenB - lenA) + band
+
+
+def _make_score_matrix_banded(sequenceA, sequenceB, match_fn, open_A,
+                              extend_A, open_B, extend_B,
+                              penalize_extend_when_opening, penalize_end_gaps,
+                              align_globally, score_only, band):
+    """Generate banded score and traceback matrices (PRIVATE).
+
+    This is the same algorithm as in _make_score_matrix_fast, but only the
+    cells within band diagonals of the main diagonal are calculated and
+    stored. The rows of the returned matrices are _BandedRow objects, which
+    can be indexed like the full rows by _recover_alignments.
+    """
+    first_A_gap = calc_affine_penalty(1, open_A, extend_A,
+                                      penalize_extend_when_opening)
+    first_B_gap = calc_affine_penalty(1, open_B, extend_B,
+                                      penalize_extend_when_opening)
+    lenA, lenB = len(sequenceA), len(sequenceB)
+    low, high = _band_limits(lenA, lenB, band)
+    outside = _OUTSIDE_BAND
+
+    score_matrix, trace_matrix = [], []
+    for row in range(lenA + 1):
+        start = max(0, row + low)
+        width = min(lenB, row + high) - start + 1
+        score_matrix.append(_BandedRow(start, [None] * width, lenB + 1,
+                                       outside))
+        if not score_only:
+            trace_matrix.append(_BandedRow(start, [None] * width, lenB + 1,
+                                           0))
+
+    # Initialize first row and column (as far as they are within the band)
+    for row in range(min(lenA, -low) + 1):
+        if penalize_end_gaps[1]:  # [1]:gap in sequence B
+            score = calc_affine_penalty(row, open_B, extend_B,
+                                        penalize_extend_when_opening)
+        else:
+            score = 0
+        score_matrix[row][0] = score
+    for col in range(min(lenB, high) + 1):
+        if penalize_end_gaps[0]:  # [0]:gap in sequence A
+            score = calc_affine_penalty(col, open_A, extend_A,
+                                        penalize_extend_when_opening)
+        else:
+            score = 0
+        score_matrix[0][col] = score
+
+    # Columns entering the band below the first row have no gap score yet
+    col_score = [0]
+    for col in range(1, lenB + 1):
+        if col <= high:
+            col_score.append(calc_affine_penalty(
+                col, 2 * open_B, extend_B, penalize_extend_when_opening))
+        else:
+            col_score.append(outside)
+
+    for row in range(1, lenA + 1):
+        previous = score_matrix[row - 1]
+        prev_start, prev_values = previous.start, previous.values
+        prev_end = prev_start + len(prev_values) - 1
+        current = score_matrix[row]
+        cur_start, cur_values = current.start, current.values
+        if not score_only:
+            traces = trace_matrix[row].values
+        if cur_start <= 1:
+            row_score = calc_affine_penalty(row, 2 * open_A, extend_A,
+                                            penalize_extend_when_opening)
+        else:
+            row_score = outside
+        for col in range(max(1, cur_start), cur_start + len(cur_values)):
+            nogap_score = prev_values[col - 1 - prev_start] + \
+                match_fn(sequenceA[row - 1], sequenceB[col - 1])
+            if col > cur_start:
+                left_score = cur_values[col - 1 - cur_start]
+            else:
+                left_score = outside
+            if col <= prev_end:
+                up_score = prev_values[col - prev_start]
+            else:
+                up_score = outside
+
+            if not penalize_end_gaps[0] and row == lenA:
+                row_open = left_score
+                row_extend = row_score
+            else:
+                row_open = left_score + first_A_gap
+                row_extend = row_score + extend_A
+            row_score = max(row_open, row_extend)
+
+            if not penalize_end_gaps[1] and col == lenB:
+                col_open = up_score
+                col_extend = col_score[col]
+            else:
+                col_open = up_score + first_B_gap
+                col_extend = col_score[col] + extend_B
+            col_score[col] = max(col_open, col_extend)
+
+            best_score = max(nogap_score, col_score[col], row_score)
+            if not align_globally and best_score < 0:
+                cur_values[col - cur_start] = 0
+            else:
+                cur_values[col - cur_start] = best_score
+
+            if not score_only:
+                # Same trace encoding as in _make_score_matrix_fast
+                row_score_rint = _rint_unbounded(row_score)
+                col_score_rint = _rint_unbounded(col_score[col])
+                row_trace_score = 0
+                col_trace_score = 0
+                if _rint_unbounded(row_open) == row_score_rint:
+                    row_trace_score += 1
+                if _rint_unbounded(row_extend) == row_score_rint:
+                    row_trace_score += 8
+                if _rint_unbounded(col_open) == col_score_rint:
+                    col_trace_score += 4
+                if _rint_unbounded(col_extend) == col_score_rint:
+                    col_trace_score += 16
+
+                trace_score = 0
+                best_score_rint = _rint_unbounded(best_score)
+                if _rint_unbounded(nogap_score) == best_score_rint:
+                    trace_score += 2
+                if row_score_rint == best_score_rint:
+                    trace_score += row_trace_score
+                if col_score_rint == best_score_rint:
+                    trace_score += col_trace_score
+                traces[col - cur_start] = trace_score
+
+    return score_matrix, trace_matrix
+
+
+# Subproblems of linear memory alignments with at most this many cells are
+# aligned with a full (quadratic memory) dynamic programming matrix.
+_LINEAR_MEMORY_CELLS = 10000
+
+# Steps of the alignment paths of linear memory alignments
+_MATCH, _GAP_IN_A, _GAP_IN_B = 0, 1, 2
+
+
+def _align_linear_memory(sequenceA, sequenceB, match_fn, gap_A_fn, gap_B_fn,
+                         penalize_extend_when_opening, penalize_end_gaps,
+                         align_globally, gap_char, score_only, band):
+    """Align two sequences (or score them) in linear memory (PRIVATE).
+
+    Global alignments are found by Hirschberg's divide and conquer approach
+    (_hirschberg), local alignments by first finding the end of the best
+    local alignment with a forward pass, then its start with a reverse pass,
+    and aligning the part in between globally. Returns a list with a single
+    alignment, or the score if score_only is set.
+    """
+    lenA, lenB = len(sequenceA), len(sequenceB)
+    if band is None:
+        low, high = -lenA, lenB
+    else:
+        low, high = _band_limits(lenA, lenB, band)
+    pe = penalize_extend_when_opening
+    open_A, extend_A = gap_A_fn.open, gap_A_fn.extend
+    open_B, extend_B = gap_B_fn.open, gap_B_fn.extend
+    row_gaps = _gap_costs(lenA, open_A, extend_A, pe,
+                          not penalize_end_gaps[0])
+    col_gaps = _gap_costs(lenB, open_B, extend_B, pe,
+                          not penalize_end_gaps[1])
+    # The first row and column are filled in as by _make_score_matrix_fast
+    first_row = [0] * (lenB + 1)
+    if penalize_end_gaps[0]:
+        first_row = [calc_affine_penalty(col, open_A, extend_A, pe)
+                     for col in range(lenB + 1)]
+    first_col = [0] * (lenA + 1)
+    if penalize_end_gaps[1]:
+        first_col = [calc_affine_penalty(row, open_B, extend_B, pe)
+                     for row in range(lenA + 1)]
+
+    if align_globally:
+        if score_only:
+            for row, start, end, H, E, F, D in _affine_rows(
+                    sequenceA, sequenceB, match_fn, row_gaps, col_gaps, low,
+                    high, first_row=first_row, first_col=first_col):
+                pass
+            return H[lenB]
+        path = []
+        _hirschberg(sequenceA, sequenceB, match_fn, row_gaps, col_gaps, low,
+                    high, 0, lenA, 0, lenB, False, False, path)
+        score = _path_score(sequenceA, sequenceB, path, match_fn, row_gaps,
+                            col_gaps, first_row, first_col)
+        alignedA, alignedB = _path_alignment(sequenceA, sequenceB, 0, 0,
+                                             path, gap_char)
+        return [(alignedA, alignedB, score, 0, len(alignedA))]
+
+    # Local alignment: find the best score not ending with a gap
+    best_score = best_end = None
+    max_score = 0
+    for row, start, end, H, E, F, D in _affine_rows(
+            sequenceA, sequenceB, match_fn, row_gaps, col_gaps, low, high,
+            local=True, first_row=first_row, first_col=first_col):
+        for col in range(start, end + 1):
+            score = H[col]
+            if score > max_score:
+                max_score = score
+            if D[col] == score and (best_score is None or score > best_score):
+                best_score, best_end = score, (row, col)
+    if score_only:
+        return max_score
+    if best_score is None or best_score <= 0:
+        return []
+
+    # Walking back from the end, find where the score is reached first. Gaps
+    # are always penalized within a local alignment.
+    end_row, end_col = best_end
+    row_gaps = _gap_costs(lenA, open_A, extend_A, pe, False)
+    col_gaps = _gap_costs(lenB, open_B, extend_B, pe, False)
+    best_start = None
+    target = rint(best_score)
+    diagonal = end_col - end_row
+    for row, start, end, H, E, F, D in _affine_rows(
+            sequenceA[:end_row][::-1], sequenceB[:end_col][::-1], match_fn,
+            row_gaps[:end_row + 1][::-1], col_gaps[:end_col + 1][::-1],
+            diagonal - high, diagonal - low):
+        for col in range(start, end + 1):
+            score = H[col]
+            if D[col] == score and (best_start is None or
+                                    score > best_start[0]):
+                best_start = (score, end_row - row, end_col - col)
+        if best_start is not None and rint(best_start[0]) >= target:
+            break
+    score, start_row, start_col = best_start
+
+    path = []
+    _hirschberg(sequenceA, sequenceB, match_fn, row_gaps, col_gaps, low,
+                high, start_row, end_row, start_col, end_col, False, False,
+                path)
+    alignedA, alignedB = _path_alignment(sequenceA, sequenceB, start_row,
+                                         start_col, path, gap_char)
+    # Add the unaligned parts as _recover_alignments does
+    begin = max(start_row, start_col)
+    tail = max(lenA - end_row, lenB - end_col)
+    alignedA = (gap_char * (begin - start_row) + sequenceA[:start_row] +
+                alignedA + sequenceA[end_row:] +
+                gap_char * (tail - lenA + end_row))
+    alignedB = (gap_char * (begin - start_col) + sequenceB[:start_col] +
+                alignedB + sequenceB[end_col:] +
+                gap_char * (tail - lenB + end_col))
+    return [(alignedA, alignedB, best_score, begin, len(alignedA) - tail)]
+
+
+def _gap_costs(length, open, extend, penalize_extend_when_opening,
+               free_ends):
+    """Return the gap (opening, extension) scores per row or column (PRIVATE).
+
+    If free_ends is set, gaps in the first and last row (or column) are not
+    penalized.
+    """
+    first_gap = calc_affine_penalty(1, open, extend,
+                                    penalize_extend_when_opening)
+    costs = [(first_gap, extend)] * (length + 1)
+    if free_ends:
+        costs[0] = costs[-1] = (0, 0)
+    return costs
+
+
+def _affine_rows(sequenceA, sequenceB, match_fn, row_gaps, col_gaps, low,
+                 high, start_gap=False, local=False, first_row=None,
+                 first_col=None):
+    """Calculate the affine gap dynamic programming matrices by row (PRIVATE).
+
+    Yields for each row its index, the first and last column within the band
+    (diagonals low to high) and lists holding the best scores (H), the best
+    scores of alignments ending with a gap in sequence A (E) or B (F) and
+    the scores of those ending with a match/mismatch (D). The lists are
+    reused for the following rows, only the columns within the band are
+    valid.
+
+    Gaps in row i (in sequence A) are scored by row_gaps[i], gaps in column
+    j (in sequence B) by col_gaps[j]. If start_gap is set, the alignment
+    must start by extending a gap in sequence B. The first row and column
+    can be given as first_row and first_col, as needed to get exactly the
+    same scores as _make_score_matrix_fast.
+    """
+    neg = float("-inf")
+    lenA, lenB = len(sequenceA), len(sequenceB)
+    H, E, F, D = [[neg] * (lenB + 1) for i in range(4)]
+    prev_H, prev_F = [neg] * (lenB + 1), [neg] * (lenB + 1)
+
+    end = min(lenB, high)
+    if start_gap:
+        F[0] = 0
+    else:
+        H[0] = 0
+    open_, extend = row_gaps[0]
+    for col in range(1, end + 1):
+        if first_row is not None:
+            score = first_row[col]
+        else:
+            score = max(H[col - 1] + open_, E[col - 1] + extend)
+        H[col] = E[col] = score
+    yield 0, 0, end, H, E, F, D
+
+    for row in range(1, lenA + 1):
+        H, prev_H = prev_H, H
+        F, prev_F = prev_F, F
+        start = max(0, row + low)
+        end = min(lenB, row + high)
+        if start:
+            H[start - 1] = neg
+        charA = sequenceA[row - 1]
+        open_, extend = row_gaps[row]
+        gap_A = neg
+        for col in range(start, end + 1):
+            col_open, col_extend = col_gaps[col]
+            gap_B = max(prev_H[col] + col_open, prev_F[col] + col_extend)
+            if col:
+                match = prev_H[col - 1] + match_fn(charA, sequenceB[col - 1])
+                gap_A = max(H[col - 1] + open_, gap_A + extend)
+                score = max(match, gap_A, gap_B)
+                if local and score < 0:
+                    score = 0
+            else:
+                match = neg
+                if first_col is not None:
+                    gap_B = first_col[row]
+                score = gap_B
+            H[col], E[col], F[col], D[col] = score, gap_A, gap_B, match
+        yield row, start, end, H, E, F, D
+
+
+def _hirschberg(sequenceA, sequenceB, match_fn, row_gaps, col_gaps, low,
+                high, row_start, row_end, col_start, col_end, start_gap,
+                end_gap, path):
+    """Append the best global alignment path of a subproblem (PRIVATE).
+
+    Align sequenceA[row_start:row_end] with sequenceB[col_start:col_end]
+    within the band of diagonals low to high. The middle row is split, at
+    the column where the best scores of the upper half (forward pass) and
+    the lower half (reverse pass) add up to the best score, either passing
+    through the cell or within a gap in sequence B crossing the middle row
+    (Myers and Miller, 1988). If start_gap or end_gap is set, the subproblem
+    must start or end with such a crossing gap, which is then only extended.
+    """
+    rows, cols = row_end - row_start, col_end - col_start
+    if rows <= 1 or (rows + 1) * (cols + 1) <= _LINEAR_MEMORY_CELLS:
+        path.extend(_affine_traceback(
+            sequenceA[row_start:row_end], sequenceB[col_start:col_end],
+            match_fn, row_gaps[row_start:row_end + 1],
+            col_gaps[col_start:col_end + 1],
+            low - col_start + row_start, high - col_start + row_start,
+            start_gap, end_gap))
+        return
+    middle = (row_start + row_end) // 2
+    for row, upper_start, upper_end, upper_H, E, upper_F, D in _affine_rows(
+            sequenceA[row_start:middle], sequenceB[col_start:col_end],
+            match_fn, row_gaps[row_start:middle + 1],
+            col_gaps[col_start:col_end + 1], low - col_start + row_start,
+            high - col_start + row_start, start_gap):
+        pass
+    diagonal = col_end - row_end
+    for row, lower_start, lower_end, lower_H, E, lower_F, D in _affine_rows(
+            sequenceA[middle:row_end][::-1],
+            sequenceB[col_start:col_end][::-1], match_fn,
+            row_gaps[middle:row_end + 1][::-1],
+            col_gaps[col_start:col_end + 1][::-1], diagonal - high,
+            diagonal - low, end_gap):
+        pass
+
+    best = None
+    for col in range(max(upper_start, cols - lower_end),
+                     min(upper_end, cols - lower_start) + 1):
+        score = upper_H[col] + lower_H[cols - col]
+        if best is None or score > best[0]:
+            best = (score, col, False)
+        gap_open, gap_extend = col_gaps[col_start + col]
+        score = upper_F[col] + lower_F[cols - col] - gap_open + gap_extend
+        if score > best[0]:
+            best = (score, col, True)
+    score, col, gap = best
+    _hirschberg(sequenceA, sequenceB, match_fn, row_gaps, col_gaps, low,
+                high, row_start, middle, col_start, col_start + col,
+                start_gap, gap, path)
+    _hirschberg(sequenceA, sequenceB, match_fn, row_gaps, col_gaps, low,
+                high, middle, row_end, col_start + col, col_end, gap,
+                end_gap, path)
+
+
+def _affine_traceback(sequenceA, sequenceB, match_fn, row_gaps, col_gaps,
+                      low, high, start_gap, end_gap):
+    """Return the best global alignment path using full matrices (PRIVATE)."""
+    matrices = []
+    for row, start, end, H, E, F, D in _affine_rows(
+            sequenceA, sequenceB, match_fn, row_gaps, col_gaps, low, high,
+            start_gap):
+        matrices.append((H[:], E[:], F[:], D[:]))
+    row, col = len(sequenceA), len(sequenceB)
+    state = _GAP_IN_B if end_gap else _MATCH
+    path = []
+    while row or col:
+        if state == _MATCH:
+            # The first row and column can only be reached by gaps
+            if not row:
+                path.extend([_GAP_IN_A] * col)
+                break
+            if not col:
+                path.extend([_GAP_IN_B] * row)
+                break
+            H, E, F, D = matrices[row]
+            if D[col] == H[col]:
+                path.append(_MATCH)
+                row -= 1
+                col -= 1
+            elif E[col] == H[col]:
+                state = _GAP_IN_A
+            else:
+                state = _GAP_IN_B
+        elif state == _GAP_IN_A:
+            path.append(_GAP_IN_A)
+            H, E, F, D = matrices[row]
+            if E[col] == H[col - 1] + row_gaps[row][0]:
+                state = _MATCH
+            col -= 1
+        else:
+            path.append(_GAP_IN_B)
+            if matrices[row][2][col] == \
+                    matrices[row - 1][0][col] + col_gaps[col][0]:
+                state = _MATCH
+            row -= 1
+    path.reverse()
+    return path
+
+
+def _path_score(sequenceA, sequenceB, path, match_fn, row_gaps, col_gaps,
+                first_row, first_col):
+    """Score a global alignment path like _make_score_matrix_fast (PRIVATE).
+
+    The scores are summed up in the same order as in the dynamic programming
+    matrix, so that the result is identical to the best score there.
+    """
+    row = col = 0
+    score = 0
+    step = None
+    for next_step in path:
+        if next_step == _MATCH:
+            score += match_fn(sequenceA[row], sequenceB[col])
+            row += 1
+            col += 1
+        elif next_step == _GAP_IN_A:
+            col += 1
+            if not row:
+                score = first_row[col]
+            elif step == _GAP_IN_A:
+                score += row_gaps[row][1]
+            else:
+                score += row_gaps[row][0]
+        else:
+            row += 1
+            if not col:
+                score = first_col[row]
+            elif step == _GAP_IN_B:
+                score += col_gaps[col][1]
+            else:
+                score += col_gaps[col][0]
+        step = next_step
+    return score
+
+
+def _path_alignment(sequenceA, sequenceB, row, col, path, gap_char):
+    """Return the aligned sequences following an alignment path (PRIVATE).
+
+    As in _recover_alignments, slices are used to preserve the type of the
+    sequences.
+    """
+    partsA, partsB = [], []
+    for step in path:
+        if step == _GAP_IN_A:
+            partsA.append(gap_char)
+        else:
+            partsA.append(sequenceA[row:row + 1])
+            row += 1
+        if step == _GAP_IN_B:
+            partsB.append(gap_char)
+        else:
+            partsB.append(sequenceB[col:col + 1])
+            col += 1
+    if isinstance(sequenceA, list):
+        return ([letter for part in partsA for letter in part],
+                [letter for part in partsB for letter in part])
+    return "".join(partsA), "".join(partsB)
+
+
 def _recover_alignments(sequenceA, sequenceB, starts, score_matrix,
                         trace_matrix, align_globally, gap_char,
                         one_alignment_only, gap_A_fn, gap_B_fn):
@@ -854,6 +1636,13 @@ def _find_start(score_matrix, align_globally):
     # the bottom right corner of the matrix.
     if align_globally:
         starts = [(score_matrix[-1][-1], (nrows - 1, ncols - 1))]
+    elif isinstance(score_matrix[0], _BandedRow):
+        # Only look at the cells within the band
+        starts = []
+        for row in range(nrows):
+            scores = score_matrix[row]
+            for i, score in enumerate(scores.values):
+                starts.append((score, (row, scores.start + i)))
     else:
         starts = []
         for row in range(nrows):
@@ -107,6 +107,7 @@ DOCTEST_MODULES = [
     "Bio.KEGG.KGML.KGML_parser",
     "Bio.NMR.xpktools",
     "Bio.motifs",
+    "Bio.motifs.matrix",
     "Bio.motifs.applications._xxmotif",
     "Bio.pairwise2",
     "Bio.Phylo.Applications._Raxml",
@@ -151,6 +152,9 @@ if is_numpy():
     DOCTEST_MODULES.extend([
         "Bio.Affy.CelFile",
         "Bio.MaxEntropy",
+        "Bio.PDB.AtomArray",
+        "Bio.PDB.CellList",
+        "Bio.PDB.StructureCache",
         "Bio.PDB.Polypeptide",
         "Bio.PDB.Selection",
         "Bio.SeqIO.PdbIO",
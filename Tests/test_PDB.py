@@ -1346,6 +1346,68 @@ class PDBParserTests(unittest.TestCase):
                         self.assertEqual(r.get_resname(), p.get_resname())
 
 
+def _atom_table(structure):
+    """Return the data of every atom in a structure, for comparisons."""
+    table = []
+    for model in structure:
+        table.append((model.id, model.serial_num))
+        for residue in model.get_residues():
+            for atom in residue.get_unpacked_list():
+                table.append((atom.get_full_id(), atom.get_parent().resname,
+                              atom.get_parent().segid, atom.fullname,
+                              atom.coord.tolist(), atom.bfactor,
+                              atom.occupancy, atom.serial_number,
+                              atom.element, atom.is_disordered(),
+                              None if atom.anisou_array is None
+                              else atom.anisou_array.tolist()))
+    return table
+
+
+class PDBParserBatchTests(unittest.TestCase):
+    """Test the batch mode of PDBParser."""
+
+    def compare(self, filename, **keywds):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always", PDBConstructionWarning)
+            parser = PDBParser(**keywds)
+            structure = parser.get_structure("X", filename)
+            expected = [str(x.message) for x in w]
+            del w[:]
+            batch_parser = PDBParser(batch=True, **keywds)
+            batch_structure = batch_parser.get_structure("X", filename)
+            self.assertEqual([str(x.message) for x in w], expected)
+        self.assertEqual(_atom_table(batch_structure),
+                         _atom_table(structure))
+        self.assertEqual(batch_parser.get_header(), parser.get_header())
+        self.assertEqual(batch_parser.get_trailer(), parser.get_trailer())
+
+    def test_files(self):
+        """Compare batch mode with the default mode."""
+        for filename in ("1A8O.pdb", "1LCD.pdb", "2BEG.pdb", "2XHE.pdb",
+                         "a_structure.pdb", "ions.pdb", "occupancy.pdb"):
+            self.compare(os.path.join("PDB", filename))
+
+    def test_strict(self):
+        """Check batch mode raises the same exceptions."""
+        messages = []
+        for batch in (False, True):
+            parser = PDBParser(PERMISSIVE=False, batch=batch)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", PDBConstructionWarning)
+                try:
+                    parser.get_structure("example", "PDB/a_structure.pdb")
+                except PDBConstructionException as err:
+                    messages.append(str(err))
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(messages[0], messages[1])
+
+    def test_structure_builder(self):
+        """Check batch mode cannot be used with a StructureBuilder."""
+        from Bio.PDB.StructureBuilder import StructureBuilder
+        self.assertRaises(ValueError, PDBParser, batch=True,
+                          structure_builder=StructureBuilder())
+
+
 class CopyTests(unittest.TestCase):
 
     def setUp(self):
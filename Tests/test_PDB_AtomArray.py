@@ -0,0 +1,176 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+"""Unit tests for the Bio.PDB.AtomArray module."""
+
+import pickle
+import unittest
+import warnings
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.PDB.")
+
+from Bio.PDB import AtomArray, PDBParser, Superimposer
+from Bio.PDB.PDBExceptions import PDBConstructionWarning
+from Bio.PDB.Vector import rotmat, Vector
+
+
+def _parse(filename):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", PDBConstructionWarning)
+        return PDBParser(PERMISSIVE=True).get_structure("X", filename)
+
+
+def _row(atom_array, atom):
+    # Atom equality only compares name and altloc
+    return [id(a) for a in atom_array.atoms].index(id(atom))
+
+
+def _coords(structure):
+    return numpy.array([atom.coord for residue in structure.get_residues()
+                        for atom in residue.get_unpacked_list()])
+
+
+class AtomArrayTests(unittest.TestCase):
+    """Test the columnar atom storage."""
+
+    def setUp(self):
+        self.rot = rotmat(Vector(1, 0, 0), Vector(1, 2, 3))
+        self.tran = numpy.array((1.0, -2.0, 0.5))
+
+    def test_columns(self):
+        """Test the arrays agree with the Atom objects."""
+        structure = _parse("PDB/a_structure.pdb")
+        atoms = [atom for residue in structure.get_residues()
+                 for atom in residue.get_unpacked_list()]
+        expected = [(atom.coord.copy(), atom.bfactor, atom.occupancy,
+                     atom.element) for atom in atoms]
+        atom_array = AtomArray(structure)
+        self.assertEqual(len(atom_array), len(atom_array.coord))
+        self.assertEqual(atom_array.coord.shape[1], 3)
+        for atom, (coord, bfactor, occupancy, element) in zip(atoms,
+                                                              expected):
+            i = _row(atom_array, atom)
+            self.assertTrue(numpy.all(atom.coord == coord))
+            self.assertTrue(numpy.all(atom_array.coord[i] == coord))
+            self.assertEqual(atom.bfactor, bfactor)
+            self.assertEqual(atom_array.bfactor[i], bfactor)
+            self.assertEqual(atom.occupancy, occupancy)
+            self.assertEqual(atom.element, element)
+            self.assertEqual(atom_array.element[i], element)
+            residue = atom_array.residues[atom_array.residue_index[i]]
+            self.assertIs(residue, atom.get_parent())
+            chain = atom_array.chains[atom_array.chain_index[i]]
+            self.assertIs(chain, residue.get_parent())
+
+    def test_views(self):
+        """Test atom attributes read and write the arrays."""
+        structure = _parse("PDB/1A8O.pdb")
+        atom_array = AtomArray(structure)
+        atom = structure[0]["A"][152]["CA"]
+        i = _row(atom_array, atom)
+        atom.coord = numpy.array((1.0, 2.0, 3.0))
+        self.assertEqual(list(atom_array.coord[i]), [1.0, 2.0, 3.0])
+        atom_array.coord[i] += 1.0
+        self.assertEqual(list(atom.get_coord()), [2.0, 3.0, 4.0])
+        atom.set_bfactor(42.0)
+        self.assertEqual(atom_array.bfactor[i], 42.0)
+        atom.set_occupancy(None)
+        self.assertIsNone(atom.get_occupancy())
+        self.assertTrue(numpy.isnan(atom_array.occupancy[i]))
+
+    def test_transform(self):
+        """Test Entity.transform on an AtomArray."""
+        expected = _parse("PDB/a_structure.pdb")
+        expected.transform(self.rot, self.tran)
+        structure = _parse("PDB/a_structure.pdb")
+        AtomArray(structure)
+        structure.transform(self.rot, self.tran)
+        self.assertTrue(numpy.allclose(_coords(structure), _coords(expected)))
+
+    def test_transform_chain(self):
+        """Test transforming one chain of an AtomArray."""
+        structure = _parse("PDB/1LCD.pdb")
+        atom_array = AtomArray(structure)
+        before = atom_array.coord.copy()
+        chain = structure[0]["A"]
+        chain.transform(numpy.identity(3), numpy.array((1.0, 0.0, 0.0)))
+        moved = atom_array.chain_index == atom_array.chains.index(chain)
+        self.assertTrue(moved.any() and not moved.all())
+        self.assertTrue(numpy.allclose(atom_array.coord[moved],
+                                       before[moved] + (1.0, 0.0, 0.0)))
+        self.assertTrue(numpy.all(atom_array.coord[~moved] == before[~moved]))
+
+    def test_detach(self):
+        """Test detached atoms are no longer transformed."""
+        structure = _parse("PDB/1A8O.pdb")
+        AtomArray(structure)
+        residue = structure[0]["A"][152]
+        atom = residue["CA"]
+        residue.detach_child("CA")
+        coord = atom.coord.copy()
+        structure.transform(numpy.identity(3), numpy.array((1.0, 0.0, 0.0)))
+        self.assertTrue(numpy.all(atom.coord == coord))
+        original = _parse("PDB/1A8O.pdb")[0]["A"][152]["N"]
+        self.assertAlmostEqual(residue["N"].coord[0] - 1.0,
+                               original.coord[0], places=4)
+
+    def test_copy_and_pickle(self):
+        """Test copies are independent of the AtomArray."""
+        structure = _parse("PDB/1A8O.pdb")
+        AtomArray(structure)
+        before = _coords(structure)
+        copied = structure.copy()
+        copied.transform(self.rot, self.tran)
+        self.assertTrue(numpy.all(_coords(structure) == before))
+        unpickled = pickle.loads(pickle.dumps(structure))
+        self.assertTrue(numpy.all(_coords(unpickled) == before))
+        unpickled.transform(self.rot, self.tran)
+        self.assertTrue(numpy.allclose(_coords(unpickled), _coords(copied)))
+
+    def test_memory(self):
+        """Test binding atoms to an AtomArray saves memory."""
+        try:
+            import tracemalloc
+        except ImportError:
+            # Python 2
+            tracemalloc = None
+        else:
+            tracemalloc.start()
+        structure = _parse("PDB/2XHE.pdb")
+        atoms = list(structure.get_atoms())
+        if tracemalloc is not None:
+            parsed = tracemalloc.get_traced_memory()[0]
+        atom_array = AtomArray(structure)
+        if tracemalloc is not None:
+            bound = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            # Freeing the coordinate arrays, B factors and so on of the
+            # atoms saves more than the columns of the AtomArray take
+            self.assertLess(bound, parsed - 32 * len(atom_array))
+        for atom in atoms:
+            self.assertFalse(hasattr(atom, "_coord"))
+            self.assertFalse(hasattr(atom, "_bfactor"))
+        self.assertTrue(atoms[0].coord is not None)
+
+    def test_superimposer(self):
+        """Test Superimposer.apply on atoms in an AtomArray."""
+        fixed = _parse("PDB/1A8O.pdb")
+        moving = _parse("PDB/1A8O.pdb")
+        AtomArray(moving)
+        moving.transform(self.rot, self.tran)
+        sup = Superimposer()
+        sup.set_atoms(list(fixed.get_atoms()), list(moving.get_atoms()))
+        sup.apply(list(moving.get_atoms()))
+        self.assertTrue(numpy.allclose(_coords(moving), _coords(fixed),
+                                       atol=1e-3))
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
@@ -0,0 +1,206 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+"""Unit tests for the Bio.PDB.CellList module."""
+
+import unittest
+import warnings
+
+try:
+    import numpy
+    from numpy.random import random
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.PDB.")
+
+from Bio.PDB import PDBParser
+from Bio.PDB.CellList import CellList, CellNeighborSearch
+from Bio.PDB.PDBExceptions import PDBConstructionWarning, PDBException
+
+
+def _parse(filename):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", PDBConstructionWarning)
+        return PDBParser(PERMISSIVE=True).get_structure("X", filename)
+
+
+def _brute_force_pairs(coords, radius):
+    """Return all pairs within radius, by computing all distances."""
+    delta = coords[:, None, :] - coords[None, :, :]
+    near = (delta * delta).sum(axis=-1) <= radius * radius
+    return numpy.nonzero(numpy.triu(near, 1))
+
+
+class CellListTests(unittest.TestCase):
+    """Test the CellList against all pairwise distances."""
+
+    def setUp(self):
+        structure = _parse("PDB/1A8O.pdb")
+        self.coords = numpy.array([atom.coord
+                                   for atom in structure.get_atoms()], "d")
+
+    def test_search_all(self):
+        """Test search_all with cells smaller and larger than the radius."""
+        for radius, cell_size in ((4.0, 4.0), (4.0, 1.5), (6.5, 10.0)):
+            expected_i, expected_j = _brute_force_pairs(self.coords, radius)
+            i, j = CellList(self.coords, cell_size).search_all(radius)
+            self.assertTrue(numpy.array_equal(i, expected_i))
+            self.assertTrue(numpy.array_equal(j, expected_j))
+
+    def test_search(self):
+        """Test search around points inside and outside the grid."""
+        cell_list = CellList(self.coords, 3.0)
+        centers = list(self.coords[::50] + 0.5)
+        centers.append(self.coords.max(axis=0) + 2.0)
+        centers.append(self.coords.min(axis=0) - 100.0)
+        for center in centers:
+            for radius in (1.0, 5.0, 50.0):
+                delta = self.coords - center
+                expected = numpy.nonzero((delta * delta).sum(axis=1) <=
+                                         radius * radius)[0]
+                found = cell_list.search(center, radius)
+                self.assertTrue(numpy.array_equal(found, expected))
+
+    def test_random(self):
+        """Test random points, including duplicates."""
+        coords = 20 * random((300, 3))
+        coords[1] = coords[0]
+        expected_i, expected_j = _brute_force_pairs(coords, 2.5)
+        i, j = CellList(coords, 2.0).search_all(2.5)
+        self.assertTrue(numpy.array_equal(i, expected_i))
+        self.assertTrue(numpy.array_equal(j, expected_j))
+        self.assertIn((0, 1), list(zip(i.tolist(), j.tolist())))
+
+    def test_large_radius(self):
+        """Test a radius of many cells, up to beyond the grid."""
+        coords = 30 * random((100, 3))
+        cell_list = CellList(coords, 0.5)
+        for radius in (10.0, 50.0):
+            expected_i, expected_j = _brute_force_pairs(coords, radius)
+            i, j = cell_list.search_all(radius)
+            self.assertTrue(numpy.array_equal(i, expected_i))
+            self.assertTrue(numpy.array_equal(j, expected_j))
+        # Far fewer occupied cells than the grid holds, in a long thin box
+        coords = numpy.zeros((50, 3))
+        coords[:, 0] = numpy.arange(50)
+        expected_i, expected_j = _brute_force_pairs(coords, 3.0)
+        i, j = CellList(coords, 1.0).search_all(3.0)
+        self.assertTrue(numpy.array_equal(i, expected_i))
+        self.assertTrue(numpy.array_equal(j, expected_j))
+
+    def test_empty(self):
+        """Test a cell list without points."""
+        cell_list = CellList([], 4.0)
+        self.assertEqual(len(cell_list), 0)
+        i, j = cell_list.search_all(4.0)
+        self.assertEqual(len(i), 0)
+        self.assertEqual(len(j), 0)
+        self.assertEqual(len(cell_list.search((0.0, 0.0, 0.0), 4.0)), 0)
+
+    def test_arguments(self):
+        """Test invalid arguments."""
+        self.assertRaises(ValueError, CellList, self.coords, 0.0)
+        self.assertRaises(ValueError, CellList, self.coords[:, :2], 4.0)
+
+
+class CellNeighborSearchTests(unittest.TestCase):
+    """Test the NeighborSearch compatible interface."""
+
+    def setUp(self):
+        self.structure = _parse("PDB/1LCD.pdb")
+        self.atoms = list(self.structure.get_atoms())
+        self.search = CellNeighborSearch(self.atoms)
+
+    def parent_pairs(self, pairs, level):
+        """Reduce atom pairs to a set of entity pairs, by identity."""
+        result = set()
+        for a, b in pairs:
+            for step in range("ARCMS".index(level)):
+                a = a.get_parent()
+                b = b.get_parent()
+            if a is not b:
+                result.add(frozenset((id(a), id(b))))
+        return result
+
+    def test_search_all(self):
+        """Test search_all at every level."""
+        atom_pairs = self.search.search_all(4.0)
+        coords = numpy.array([atom.coord for atom in self.atoms], "d")
+        expected = set(zip(*_brute_force_pairs(coords, 4.0)))
+        index = dict((id(atom), i) for i, atom in enumerate(self.atoms))
+        self.assertEqual(set((index[id(a)], index[id(b)])
+                             for a, b in atom_pairs), expected)
+        self.assertEqual(len(atom_pairs), len(expected))
+        for level in "RCMS":
+            pairs = self.search.search_all(4.0, level)
+            self.assertEqual(set(frozenset((id(a), id(b))) for a, b in pairs),
+                             self.parent_pairs(atom_pairs, level))
+            self.assertEqual(len(pairs), len(set(frozenset((id(a), id(b)))
+                                                 for a, b in pairs)))
+            for a, b in pairs:
+                self.assertEqual(a.get_level(), level)
+        # The three NMR models overlap, and have the same chain ids
+        self.assertEqual(len(self.search.search_all(4.0, "M")), 3)
+        self.assertEqual(len(set(chain.id for pair in
+                                 self.search.search_all(4.0, "C")
+                                 for chain in pair)), 3)
+
+    def test_search_all_indices(self):
+        """Test the index arrays refer to get_entities."""
+        residues = self.search.get_entities("R")
+        self.assertEqual(residues, list(self.structure.get_residues()))
+        i, j = self.search.search_all_indices(4.0, "R")
+        self.assertTrue(numpy.all(i < j))
+        self.assertEqual([(residues[a], residues[b])
+                          for a, b in zip(i, j)],
+                         self.search.search_all(4.0, "R"))
+
+    def test_search(self):
+        """Test search at every level."""
+        center = self.atoms[100].coord
+        atoms = self.search.search(center, 5.0)
+        self.assertIn(self.atoms[100], atoms)
+        for atom in atoms:
+            self.assertTrue(numpy.sum((atom.coord - center) ** 2) <= 25.0)
+        for level in "RCMS":
+            expected = []
+            for atom in atoms:
+                entity = atom
+                for step in range("ARCMS".index(level)):
+                    entity = entity.get_parent()
+                if not any(entity is other for other in expected):
+                    expected.append(entity)
+            self.assertEqual(self.search.search(center, 5.0, level), expected)
+
+    def test_cell_size(self):
+        """Test a fixed cell size gives the same results."""
+        search = CellNeighborSearch(self.atoms, cell_size=2.5)
+        for radius in (3.0, 6.0):
+            self.assertEqual(search.search_all(radius, "R"),
+                             self.search.search_all(radius, "R"))
+
+    def test_level(self):
+        """Test an unknown level."""
+        self.assertRaises(PDBException, self.search.search_all, 4.0, "X")
+        self.assertRaises(PDBException, self.search.search,
+                          self.atoms[0].coord, 4.0, "X")
+
+    def test_neighbor_search(self):
+        """Compare with NeighborSearch, if Bio.KDTree is compiled."""
+        try:
+            from Bio.PDB.NeighborSearch import NeighborSearch
+        except ImportError:
+            self.skipTest("C module in Bio.KDTree not compiled")
+        index = dict((id(atom), i) for i, atom in enumerate(self.atoms))
+        expected = set(tuple(sorted((index[id(a)], index[id(b)])))
+                       for a, b in NeighborSearch(self.atoms).search_all(3.0))
+        found = set((index[id(a)], index[id(b)])
+                    for a, b in self.search.search_all(3.0))
+        self.assertEqual(found, expected)
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
@@ -213,6 +213,37 @@ class ParseReal(unittest.TestCase):
         """Test if FastMMCIFParser can parse point mutations correctly."""
         self._run_point_mutation_tests(FastMMCIFParser(QUIET=True))
 
+    def test_point_mutations_batch(self):
+        """Test if MMCIFParser in batch mode parses point mutations correctly."""
+        self._run_point_mutation_tests(MMCIFParser(QUIET=True, batch=True))
+
+    def test_batch(self):
+        """Compare batch mode with the default mode."""
+        for filename in ("1A8O.cif", "1AS5.cif", "1LCD.cif", "2BEG.cif",
+                         "2OFG.cif", "3JQH.cif", "4CUP.cif", "4ZHL.cif"):
+            filename = "PDB/" + filename
+            structure = MMCIFParser(QUIET=True).get_structure("X", filename)
+            with open(filename) as handle:
+                batch_structure = MMCIFParser(QUIET=True, batch=True) \
+                    .get_structure("X", handle)
+            atoms = list(structure.get_atoms())
+            batch_atoms = list(batch_structure.get_atoms())
+            self.assertEqual(len(batch_atoms), len(atoms), filename)
+            self.assertEqual([m.serial_num for m in batch_structure],
+                             [m.serial_num for m in structure])
+            for batch_atom, atom in zip(batch_atoms, atoms):
+                self.assertEqual(batch_atom.get_full_id(), atom.get_full_id())
+                self.assertEqual(batch_atom.coord.tolist(),
+                                 atom.coord.tolist())
+                self.assertEqual((batch_atom.bfactor, batch_atom.occupancy,
+                                  batch_atom.element),
+                                 (atom.bfactor, atom.occupancy, atom.element))
+                if atom.anisou_array is None:
+                    self.assertIsNone(batch_atom.anisou_array)
+                else:
+                    self.assertEqual(batch_atom.anisou_array.tolist(),
+                                     atom.anisou_array.tolist())
+
     def _run_point_mutation_tests(self, parser):
         """Common test code for testing point mutations."""
         structure = parser.get_structure("example", "PDB/3JQH.cif")
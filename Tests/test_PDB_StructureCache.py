@@ -0,0 +1,242 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+"""Unit tests for the Bio.PDB.StructureCache module."""
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.PDB.")
+
+from Bio.PDB import PDBParser, MMCIFParser
+from Bio.PDB.StructureBuilder import StructureBuilder
+from Bio.PDB.StructureCache import StructureCache, load_structures
+
+
+FILES = [os.path.join("PDB", name) for name in
+         ("1A8O.pdb", "1LCD.cif", "2BEG.pdb", "4ZHL.cif", "a_structure.pdb")]
+
+
+def _atom_table(structure):
+    """Return the data of every atom in a structure, for comparisons."""
+    table = []
+    for model in structure:
+        table.append((model.id, model.serial_num))
+        for residue in model.get_residues():
+            table.append((residue.get_full_id(), residue.resname,
+                          residue.segid, residue.is_disordered()))
+            for atom in residue.get_unpacked_list():
+                table.append((atom.get_full_id(), atom.fullname,
+                              atom.altloc, atom.coord.tolist(),
+                              atom.bfactor, atom.occupancy,
+                              atom.serial_number, atom.element,
+                              atom.is_disordered(),
+                              None if atom.anisou_array is None
+                              else atom.anisou_array.tolist()))
+        # The selected alternative locations
+        table.append([atom.get_full_id() + (atom.altloc,)
+                      for atom in model.get_atoms()])
+    return table
+
+
+class _Marker(object):
+    """Object which creates a file when unpickled."""
+
+    def __init__(self, filename):
+        self.filename = filename
+
+    def __reduce__(self):
+        return (_touch, (self.filename,))
+
+
+def _touch(filename):
+    open(filename, "w").close()
+
+
+def _parse(filename):
+    if filename.endswith(".cif"):
+        parser = MMCIFParser(QUIET=True)
+    else:
+        parser = PDBParser(QUIET=True)
+    structure_id = os.path.splitext(os.path.basename(filename))[0]
+    return parser.get_structure(structure_id, filename)
+
+
+class StructureCacheTests(unittest.TestCase):
+    """Test the bulk loader and the structure cache."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def entries(self):
+        return sorted(name for name in os.listdir(self.directory)
+                      if name.endswith(StructureCache.suffix))
+
+    def check(self, results, filenames=FILES):
+        self.assertEqual([filename for filename, structure in results],
+                         filenames)
+        for filename, structure in results:
+            expected = _parse(filename)
+            self.assertEqual(structure.id, expected.id)
+            self.assertEqual(structure.header, expected.header)
+            self.assertEqual(_atom_table(structure), _atom_table(expected))
+
+    def test_load(self):
+        """Test loading files without a cache."""
+        self.check(list(load_structures(FILES)))
+
+    def test_directory(self):
+        """Test loading all files in a directory."""
+        for filename in FILES[:2]:
+            shutil.copy(filename, self.directory)
+        with open(os.path.join(self.directory, "notes.txt"), "w") as handle:
+            handle.write("Not a structure\n")
+        filenames = [os.path.join(self.directory, os.path.basename(name))
+                     for name in FILES[:2]]
+        self.check(list(load_structures(self.directory)), filenames)
+
+    def test_cache(self):
+        """Test structures loaded from the cache are identical."""
+        cache = StructureCache(self.directory)
+        self.check(list(load_structures(FILES, cache=cache)))
+        entries = self.entries()
+        self.assertEqual(len(entries), len(FILES))
+        self.check(list(load_structures(FILES, cache=cache)))
+        self.assertEqual(self.entries(), entries)
+
+    def test_get_put(self):
+        """Test the cache key includes the parser options."""
+        cache = StructureCache(self.directory)
+        filename = "PDB/a_structure.pdb"
+        parser = PDBParser(QUIET=True)
+        self.assertIsNone(cache.get(filename, parser))
+        cache.put(filename, parser, parser.get_structure("X", filename))
+        structure = cache.get(filename, parser, "Y")
+        self.assertEqual(structure.id, "Y")
+        self.assertIsNotNone(cache.get(filename, PDBParser(batch=True)))
+        self.assertIsNone(cache.get(filename, PDBParser(PERMISSIVE=False)))
+        parser = PDBParser(structure_builder=StructureBuilder())
+        self.assertIsNotNone(cache.get(filename, parser))
+        parser.structure_builder = object()
+        self.assertRaises(ValueError, cache.get, filename, parser)
+
+    def test_modified(self):
+        """Test a modified file is parsed again."""
+        cache = StructureCache(self.directory)
+        filename = os.path.join(self.directory, "example.pdb")
+        shutil.copy("PDB/1A8O.pdb", filename)
+        parser = PDBParser(QUIET=True)
+        cache.put(filename, parser, parser.get_structure("X", filename))
+        self.assertIsNotNone(cache.get(filename, parser))
+        with open(filename, "a") as handle:
+            handle.write("\n")
+        self.assertIsNone(cache.get(filename, parser))
+
+    def test_corrupt(self):
+        """Test damaged cache entries are ignored."""
+        cache = StructureCache(self.directory)
+        list(load_structures(FILES[:1], cache=cache))
+        path = os.path.join(self.directory, self.entries()[0])
+        with open(path, "r+b") as handle:
+            handle.truncate(100)
+        self.assertIsNone(cache.get(FILES[0], PDBParser(QUIET=True)))
+        self.check(list(load_structures(FILES[:1], cache=cache)), FILES[:1])
+
+    def test_eviction(self):
+        """Test the least recently used entries are removed."""
+        parser = PDBParser(QUIET=True)
+        filenames = ["PDB/1A8O.pdb", "PDB/2BEG.pdb", "PDB/a_structure.pdb",
+                     "PDB/1LCD.pdb"]
+        structures = [parser.get_structure("X", filename)
+                      for filename in filenames]
+        cache = StructureCache(self.directory)
+        sizes = []
+        for filename, structure in zip(filenames, structures):
+            cache.put(filename, parser, structure)
+            sizes.append(sum(os.path.getsize(os.path.join(self.directory,
+                                                          name))
+                             for name in self.entries()) - sum(sizes))
+        cache.clear()
+        self.assertEqual(self.entries(), [])
+        # Room for all four entries, less one byte
+        cache = StructureCache(self.directory, max_size=sum(sizes) - 1)
+        for timestamp, (filename, structure) in enumerate(
+                zip(filenames[:3], structures)):
+            cache.put(filename, parser, structure)
+            path = cache._path(cache._key(filename, parser))
+            os.utime(path, (timestamp, timestamp))
+        # Using the first entry makes the second the least recently used
+        self.assertIsNotNone(cache.get(filenames[0], parser))
+        cache.put(filenames[3], parser, structures[3])
+        self.assertEqual([cache.get(filename, parser) is not None
+                          for filename in filenames],
+                         [True, False, True, True])
+        total = sum(os.path.getsize(os.path.join(self.directory, name))
+                    for name in self.entries())
+        self.assertTrue(total <= cache.max_size)
+
+    def test_large_entries(self):
+        """Test entries larger than the cache are not stored."""
+        parser = PDBParser(QUIET=True)
+        small, large = "PDB/1A8O.pdb", "PDB/2XHE.pdb"
+        cache = StructureCache(self.directory)
+        cache.put(small, parser, parser.get_structure("X", small))
+        size = os.path.getsize(os.path.join(self.directory,
+                                            self.entries()[0]))
+        cache.clear()
+        cache = StructureCache(self.directory, max_size=2 * size)
+        list(load_structures([small, large], parser, cache=cache))
+        self.assertIsNotNone(cache.get(small, parser))
+        self.assertIsNone(cache.get(large, parser))
+        self.assertEqual(len(self.entries()), 1)
+        # Replacing an entry does not count its size twice
+        for i in range(3):
+            cache.put(small, parser, parser.get_structure("X", small))
+        self.assertEqual(cache._size, size)
+
+    def test_no_pickle(self):
+        """Test cache entries are never unpickled."""
+        cache = StructureCache(self.directory)
+        parser = PDBParser(QUIET=True)
+        filename = FILES[0]
+        marker = os.path.join(self.directory, "unpickled")
+        path = cache._path(cache._key(filename, parser))
+        with open(path, "wb") as handle:
+            pickle.dump(_Marker(marker), handle, 2)
+        self.assertIsNone(cache.get(filename, parser))
+        self.check(list(load_structures(FILES[:1], cache=cache)), FILES[:1])
+        self.assertFalse(os.path.exists(marker))
+        with open(path, "rb") as handle:
+            self.assertFalse(handle.read().startswith(b"\x80"))
+
+    def test_processes(self):
+        """Test loading files in a process pool."""
+        cache = StructureCache(self.directory)
+        self.check(list(load_structures(FILES, cache=cache, processes=2)))
+        self.assertEqual(len(self.entries()), len(FILES))
+        self.check(list(load_structures(FILES, cache=cache, processes=2)))
+        self.check(list(load_structures(FILES, processes=2, chunksize=2)))
+
+    def test_arguments(self):
+        """Test invalid arguments."""
+        self.assertRaises(ValueError, load_structures, FILES, processes=0)
+        self.assertRaises(ValueError, load_structures, FILES, chunksize=0)
+        self.assertRaises(ValueError, StructureCache, self.directory,
+                          max_size=-1)
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
@@ -5,12 +5,20 @@
 
 """Testing code for Restriction enzyme classes of Biopython."""
 
+import os
+import pickle
+import subprocess
+import sys
+
+import Bio
 from Bio.Restriction import Analysis, Restriction, RestrictionBatch
 from Bio.Restriction import CommOnly, NonComm, AllEnzymes
 from Bio.Restriction import (Acc65I, Asp718I, BamHI, EcoRI, EcoRV, KpnI, SmaI,
                              MluCI, McrI, NdeI, BsmBI, AanI, EarI, SnaI)
 from Bio.Restriction import FormattedSeq
 from Bio.Seq import Seq, MutableSeq
+from Bio.SeqRecord import SeqRecord
+from Bio import SeqIO
 from Bio.Alphabet.IUPAC import IUPACAmbiguousDNA
 from Bio import BiopythonWarning
 
@@ -467,6 +475,40 @@ class RestrictionBatches(unittest.TestCase):
         self.assertTrue(len(AllEnzymes) == len(CommOnly) + len(NonComm))
         self.assertTrue(len(AllEnzymes) > len(CommOnly) > len(NonComm))
 
+    def test_enzyme_names(self):
+        """Test the enzymes can be accessed by name."""
+        import Bio.Restriction
+        names = set(str(enzyme) for enzyme in AllEnzymes)
+        self.assertEqual(names, set(Bio.Restriction.__all__[6:]))
+        for name in names:
+            enzyme = getattr(Bio.Restriction, name)
+            self.assertTrue(enzyme is getattr(Restriction, name))
+            self.assertTrue(enzyme in AllEnzymes)
+            self.assertEqual(enzyme.is_comm(), enzyme in CommOnly)
+        self.assertTrue(Bio.Restriction.EcoRI is EcoRI)
+        self.assertTrue(RestrictionBatch(["EcoRI"]).get("EcoRI") is EcoRI)
+        self.assertRaises(AttributeError, getattr, Bio.Restriction, "EcoRX")
+        self.assertRaises(AttributeError, getattr, Restriction, "EcoRX")
+
+    def test_lazy_import(self):
+        """Test importing the module does not create unused enzymes."""
+        code = ("import sys\n"
+                "from Bio.Restriction import EcoRI\n"
+                "module = sys.modules['Bio.Restriction.Restriction']\n"
+                "namespace = module._get_enzyme.__globals__\n"
+                "print('%s %s %s' % ('EcoRI' in namespace,\n"
+                "                    'ZraI' in namespace,\n"
+                "                    'AllEnzymes' in namespace))\n")
+        env = dict(os.environ)
+        paths = [os.path.dirname(os.path.dirname(os.path.abspath(
+            Bio.__file__)))]
+        if env.get("PYTHONPATH"):
+            paths.append(env["PYTHONPATH"])
+        env["PYTHONPATH"] = os.pathsep.join(paths)
+        output = subprocess.check_output([sys.executable, "-c", code],
+                                         env=env, universal_newlines=True)
+        self.assertEqual(output.strip(), "True False False")
+
     def test_search_premade_batches(self):
         """Test search with pre-made batches CommOnly, NoComm, AllEnzymes."""
         seq = Seq('ACCCGAATTCAAAACTGACTGATCGATCGTCGACTG', IUPACAmbiguousDNA())
@@ -479,6 +521,53 @@ class RestrictionBatches(unittest.TestCase):
         search = seq / NonComm
         self.assertEqual(search[McrI], [28])
 
+    def test_search_single_pass(self):
+        """Compare batch search in one pass with searching each enzyme."""
+        seqs = [Seq("", IUPACAmbiguousDNA()),
+                Seq("GAATTC", IUPACAmbiguousDNA()),
+                Seq("GCGCGCGCGAATTCNNGGCCGGCCAAAAGGCCRYGGCC",
+                    IUPACAmbiguousDNA())]
+        with open("GenBank/NC_005816.fna") as handle:
+            handle.readline()
+            seqs.append(Seq(handle.read().replace("\n", ""),
+                            IUPACAmbiguousDNA()))
+        for seq in seqs:
+            for linear in (True, False):
+                batch = RestrictionBatch(AllEnzymes)
+                search = batch.search(seq, linear)
+                dna = FormattedSeq(seq, linear)
+                for enzyme in AllEnzymes:
+                    self.assertEqual(search[enzyme], enzyme.search(dna),
+                                     "%s %s" % (enzyme, linear))
+
+    def test_search_many(self):
+        """Compare searching many records with searching each one."""
+        records = list(SeqIO.parse("GenBank/NC_005816.fna", "fasta"))
+        records.append(SeqRecord(Seq("GCGCGCGCGAATTCNNGGCCGGCCAAAAGGCCRYGGCC",
+                                     IUPACAmbiguousDNA()), id="short"))
+        records.append(SeqRecord(Seq("", IUPACAmbiguousDNA()), id="empty"))
+        batch = RestrictionBatch(AllEnzymes)
+        for linear in (True, False):
+            expected = [batch.search(record.seq, linear)
+                        for record in records]
+            for processes, chunk_size in ((1, 1000000), (1, 997), (2, 50)):
+                results = list(batch.search_many(records, linear,
+                                                 processes, chunk_size))
+                self.assertEqual([record.id for record, search in results],
+                                 [record.id for record in records])
+                self.assertEqual([search for record, search in results],
+                                 expected)
+        # The worker processes are not sent the sequence to find the cuts
+        shape = Restriction._SequenceShape(FormattedSeq(records[0].seq))
+        self.assertEqual(len(shape), len(records[0]))
+        self.assertLess(len(pickle.dumps(shape)), 200)
+        results = batch.search_many("GenBank/NC_005816.fna", chunk_size=500)
+        self.assertEqual([search for record, search in results],
+                         [batch.search(records[0].seq)])
+        self.assertRaises(ValueError, list, batch.search_many(records, True, 0))
+        self.assertRaises(ValueError, list,
+                          batch.search_many(records, chunk_size=0))
+
     def test_analysis_restrictions(self):
         """Test Fancier restriction analysis."""
         new_seq = Seq('TTCAAAAAAAAAAAAAAAAAAAAAAAAAAAAGAA',
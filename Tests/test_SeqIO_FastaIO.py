@@ -6,11 +6,15 @@
 
 from __future__ import print_function
 
+import os
+import shutil
+import tempfile
 import unittest
 from Bio._py3k import StringIO
 
 from Bio import SeqIO
-from Bio.SeqIO.FastaIO import FastaIterator
+from Bio import bgzf
+from Bio.SeqIO.FastaIO import FastaIterator, FaidxIndex
 from Bio.Alphabet import generic_nucleotide, generic_dna
 
 
@@ -175,6 +179,81 @@ for filename in multi_amino_files:
     setattr(TitleFunctions, "test_mutli_pro_%s" % name, funct(filename))
     del funct
 
+
+class FaidxTests(unittest.TestCase):
+    """Tests for FASTA region fetching with a .fai index."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def check_fetch(self, fasta, records):
+        self.assertEqual(list(fasta), [r.id for r in records])
+        for record in records:
+            self.assertTrue(record.id in fasta)
+            self.assertEqual(fasta.length(record.id), len(record))
+            length = len(record)
+            for start, end in [(None, None), (0, 1), (0, 59), (0, 60),
+                               (1, 61), (59, 121), (60, 120), (length - 1, None),
+                               (-10, -2), (5, 3), (length // 2, length + 10)]:
+                self.assertEqual(str(fasta.fetch(record.id, start, end)),
+                                 str(record.seq[start:end]))
+        self.assertRaises(KeyError, fasta.fetch, "missing", 0, 10)
+
+    def check_file(self, filename, wrap=60):
+        records = list(SeqIO.parse(filename, "fasta"))
+        # Write in a temp folder to avoid leaving .fai files behind
+        fasta_file = os.path.join(self.temp_dir, "example.fasta")
+        with open(fasta_file, "w") as handle:
+            SeqIO.FastaIO.FastaWriter(handle, wrap=wrap).write_file(records)
+        # Build the index,
+        with FaidxIndex(fasta_file) as fasta:
+            self.check_fetch(fasta, records)
+        self.assertTrue(os.path.isfile(fasta_file + ".fai"))
+        # Reload the index,
+        with FaidxIndex(fasta_file) as fasta:
+            self.check_fetch(fasta, records)
+
+        # Now with BGZF compression
+        bgzf_file = fasta_file + ".bgz"
+        with open(fasta_file, "rb") as handle:
+            data = handle.read()
+        with bgzf.BgzfWriter(bgzf_file, "wb", gzi=bgzf_file + ".gzi") as handle:
+            handle.write(data)
+        # The uncompressed offsets should be the same
+        with FaidxIndex(bgzf_file, fasta_file + ".fai") as fasta:
+            self.check_fetch(fasta, records)
+        # Build the index (and no .gzi file)
+        os.remove(bgzf_file + ".gzi")
+        with FaidxIndex(bgzf_file) as fasta:
+            self.check_fetch(fasta, records)
+        with open(fasta_file + ".fai") as handle:
+            with open(bgzf_file + ".fai") as handle2:
+                self.assertEqual(handle.read(), handle2.read())
+
+    def test_human(self):
+        """Check fetching regions from BWA/human_g1k_v37_truncated.fasta"""
+        self.check_file("BWA/human_g1k_v37_truncated.fasta")
+
+    def test_proteins(self):
+        """Check fetching regions from GenBank/NC_005816.faa"""
+        self.check_file("GenBank/NC_005816.faa", wrap=7)
+
+    def test_unwrapped(self):
+        """Check fetching regions from GenBank/NC_005816.ffn unwrapped"""
+        self.check_file("GenBank/NC_005816.ffn", wrap=None)
+
+    def test_bad_line_length(self):
+        """Check a FASTA file with inconsistent line lengths is rejected"""
+        fasta_file = os.path.join(self.temp_dir, "bad.fasta")
+        with open(fasta_file, "w") as handle:
+            handle.write(">good\nACGT\nAC\n>bad\nACGT\nAC\nACGT\n")
+        self.assertRaises(ValueError, FaidxIndex, fasta_file)
+        self.assertFalse(os.path.isfile(fasta_file + ".fai"))
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
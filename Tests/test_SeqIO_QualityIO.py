@@ -147,6 +147,14 @@ class TestFastqErrors(unittest.TestCase):
                 self.assertTrue(isinstance(record, SeqRecord))
             self.assertRaises(ValueError, next, records)
             handle.close()
+        # Also check the lazy quality decoding mode
+        for iterator in (QualityIO.FastqPhredIterator,
+                         QualityIO.FastqIlluminaIterator):
+            with open(filename, _universal_read_mode) as handle:
+                records = iterator(handle, lazy=True)
+                for i in range(good_count):
+                    record = next(records)  # Make sure no errors!
+                self.assertRaises(ValueError, next, records)
 
     def check_general_fails(self, filename, good_count):
         handle = open(filename, _universal_read_mode)
@@ -777,6 +785,112 @@ class TestSFF(unittest.TestCase):
                 self.assertRaises(ValueError, SeqIO.write, record, h, "sff")
 
 
+class TestFastqBlocks(unittest.TestCase):
+    """Check the block based FASTQ parser matches FastqGeneralIterator."""
+
+    def check_blocks(self, filename):
+        with open(filename, _universal_read_mode) as handle:
+            try:
+                expected = list(QualityIO.FastqGeneralIterator(handle))
+            except ValueError:
+                expected = None
+        # Using small blocks to split records between blocks
+        for block_size in (1, 7, 50, 1000, 1048576):
+            with open(filename, _universal_read_mode) as handle:
+                blocks = QualityIO._fastq_blocks(handle, block_size)
+                if expected is None:
+                    self.assertRaises(ValueError, list, blocks)
+                else:
+                    self.assertEqual(expected,
+                                     [r for block in blocks for r in block])
+
+    def test_all_files(self):
+        """Compare block based FASTQ parser on all the example files."""
+        for filename in sorted(os.listdir("Quality")):
+            if filename.endswith(".fastq"):
+                self.check_blocks(os.path.join("Quality", filename))
+
+    def test_blank_lines(self):
+        """Block based FASTQ parser with blank lines between records."""
+        data = "@a\nACGT\n+\n!!!!\n\n@b\nAC\n+b\n!!\n\n"
+        for block_size in (1, 5, 100):
+            self.assertEqual(
+                [("a", "ACGT", "!!!!"), ("b", "AC", "!!")],
+                [r for block in QualityIO._fastq_blocks(StringIO(data),
+                                                        block_size)
+                 for r in block])
+        # But not at the start of the file
+        blocks = QualityIO._fastq_blocks(StringIO("\n" + data), 100)
+        self.assertRaises(ValueError, list, blocks)
+
+
+class TestLazyQualities(unittest.TestCase):
+    """Check the lazy quality decoding option."""
+
+    def check_lazy(self, filename, format, iterator):
+        with open(filename, _universal_read_mode) as handle:
+            expected = list(SeqIO.parse(handle, format))
+        with open(filename, _universal_read_mode) as handle:
+            records = list(iterator(handle, lazy=True))
+        self.assertEqual(len(expected), len(records))
+        for old, new in zip(expected, records):
+            compare_record(old, new)
+            self.assertEqual(old.format(format), new.format(format))
+            with warnings.catch_warnings():
+                # Data loss warnings for high scores in some formats
+                warnings.simplefilter("ignore", BiopythonWarning)
+                for f in ("fastq", "fastq-illumina", "fastq-solexa", "qual"):
+                    self.assertEqual(old.format(f), new.format(f))
+            compare_record(old[1:-1], new[1:-1])
+            compare_record(old.reverse_complement(id=True),
+                           new.reverse_complement(id=True))
+            compare_record(old + old, new + new)
+            compare_record(old + new, new + old)
+
+    def test_sanger(self):
+        """Lazy quality decoding with Sanger FASTQ."""
+        for name in ("example", "tricky", "zero_length",
+                     "sanger_full_range_original_sanger",
+                     "sanger_93", "sanger_faked"):
+            self.check_lazy("Quality/%s.fastq" % name, "fastq",
+                            QualityIO.FastqPhredIterator)
+
+    def test_illumina(self):
+        """Lazy quality decoding with Illumina 1.3+ FASTQ."""
+        for name in ("illumina_faked",
+                     "illumina_full_range_original_illumina"):
+            self.check_lazy("Quality/%s.fastq" % name, "fastq-illumina",
+                            QualityIO.FastqIlluminaIterator)
+
+    def test_pass_through(self):
+        """Lazy qualities are written without decoding."""
+        with open("Quality/example.fastq") as handle:
+            records = list(QualityIO.FastqPhredIterator(handle, lazy=True))
+        handle = StringIO()
+        SeqIO.write(records, handle, "fastq")
+        for record in records:
+            qualities = record.letter_annotations["phred_quality"]
+            self.assertEqual(None, qualities._decoded)
+        with open("Quality/example.fastq") as original:
+            self.assertEqual(original.read(), handle.getvalue())
+
+    def test_modified(self):
+        """Modified lazy qualities are written correctly."""
+        with open("Quality/example.fastq") as handle:
+            record = next(QualityIO.FastqPhredIterator(handle, lazy=True))
+        qualities = record.letter_annotations["phred_quality"]
+        self.assertEqual(26, qualities[0])
+        self.assertEqual(qualities, qualities[:])
+        qualities[0] = 40
+        qualities[-1] = 0
+        self.assertEqual(40, record.letter_annotations["phred_quality"][0])
+        self.assertEqual([40, 26, 18], qualities[:3])
+        self.assertEqual("I;3;;;;;;;;;;;;7;;;;;;;8!",
+                         record.format("fastq").split("\n")[3])
+        self.assertEqual("hZRZZZZZZZZZZZZVZZZZZZZW@",
+                         record.format("fastq-illumina").split("\n")[3])
+
+
 class NonFastqTests(unittest.TestCase):
 
     def check_wrong_format(self, filename):
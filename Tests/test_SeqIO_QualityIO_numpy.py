@@ -0,0 +1,122 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Tests for the NumPy based FASTQ parsing in Bio.SeqIO.QualityIO."""
+
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use the NumPy based FASTQ parsers.")
+
+from Bio._py3k import StringIO
+from Bio import SeqIO
+from Bio.SeqIO.QualityIO import FastqPhredArrayIterator, FastqBatchIterator
+from Bio.SeqIO.QualityIO import FastqGeneralIterator
+
+
+class FastqPhredArrayTests(unittest.TestCase):
+    """Compare FastqPhredArrayIterator with FastqPhredIterator."""
+
+    def check_file(self, filename):
+        with open(filename) as handle:
+            expected = list(SeqIO.parse(handle, "fastq"))
+        with open(filename) as handle:
+            records = list(FastqPhredArrayIterator(handle))
+        self.assertEqual(len(expected), len(records))
+        for old, new in zip(expected, records):
+            self.assertEqual(old.id, new.id)
+            self.assertEqual(old.description, new.description)
+            self.assertEqual(str(old.seq), str(new.seq))
+            qualities = new.letter_annotations["phred_quality"]
+            self.assertTrue(isinstance(qualities, numpy.ndarray))
+            self.assertEqual(numpy.uint8, qualities.dtype)
+            self.assertEqual(old.letter_annotations["phred_quality"],
+                             qualities.tolist())
+
+    def test_example(self):
+        """Parse example.fastq with NumPy quality arrays."""
+        self.check_file("Quality/example.fastq")
+
+    def test_tricky(self):
+        """Parse tricky.fastq (line wrapped) with NumPy quality arrays."""
+        self.check_file("Quality/tricky.fastq")
+
+    def test_sanger_full_range(self):
+        """Parse sanger_full_range_original_sanger.fastq with NumPy arrays."""
+        self.check_file("Quality/sanger_full_range_original_sanger.fastq")
+
+    def test_write(self):
+        """Write records with NumPy quality arrays as FASTQ."""
+        filename = "Quality/example.fastq"
+        with open(filename) as handle:
+            records = list(FastqPhredArrayIterator(handle))
+        handle = StringIO()
+        SeqIO.write(records, handle, "fastq")
+        with open(filename) as original:
+            self.assertEqual(original.read(), handle.getvalue())
+
+    def test_bad_quality(self):
+        """Reject invalid quality characters."""
+        for filename in ["Quality/error_qual_space.fastq",
+                         "Quality/error_qual_del.fastq"]:
+            with open(filename) as handle:
+                self.assertRaises(ValueError, list,
+                                  FastqPhredArrayIterator(handle))
+
+
+class FastqBatchTests(unittest.TestCase):
+    """Tests for FastqBatchIterator."""
+
+    def check_file(self, filename, batch_size, offset=33):
+        with open(filename) as handle:
+            expected = list(FastqGeneralIterator(handle))
+        with open(filename) as handle:
+            batches = list(FastqBatchIterator(handle, batch_size, offset))
+        self.assertEqual(len(batches),
+                         (len(expected) + batch_size - 1) // batch_size)
+        count = 0
+        for titles, sequences, qualities, lengths in batches:
+            self.assertTrue(len(titles) <= batch_size)
+            self.assertEqual(len(titles), len(lengths))
+            self.assertEqual(lengths.sum(), len(sequences))
+            self.assertEqual(lengths.sum(), len(qualities))
+            starts = numpy.cumsum(lengths) - lengths
+            for title, start, length in zip(titles, starts, lengths):
+                old_title, old_seq, old_qual = expected[count]
+                self.assertEqual(old_title, title)
+                self.assertEqual(
+                    old_seq, sequences[start:start + length].tobytes().decode())
+                self.assertEqual(
+                    [ord(letter) - offset for letter in old_qual],
+                    qualities[start:start + length].tolist())
+                count += 1
+        self.assertEqual(len(expected), count)
+
+    def test_example(self):
+        """Read example.fastq in batches."""
+        for batch_size in (1, 2, 3, 10000):
+            self.check_file("Quality/example.fastq", batch_size)
+
+    def test_illumina(self):
+        """Read illumina_full_range_original_illumina.fastq in batches."""
+        self.check_file("Quality/illumina_full_range_original_illumina.fastq",
+                        2, 64)
+
+    def test_tricky(self):
+        """Read tricky.fastq (line wrapped) in batches."""
+        self.check_file("Quality/tricky.fastq", 3)
+
+    def test_bad_batch_size(self):
+        """Reject a zero batch size."""
+        with open("Quality/example.fastq") as handle:
+            self.assertRaises(ValueError, list, FastqBatchIterator(handle, 0))
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
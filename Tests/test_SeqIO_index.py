@@ -20,7 +20,7 @@ import gzip
 import warnings
 from io import BytesIO
 
-from Bio._py3k import _bytes_to_string, StringIO
+from Bio._py3k import _bytes_to_string, _as_bytes, StringIO
 from Bio._py3k import _universal_read_mode
 
 try:
@@ -294,6 +294,81 @@ if sqlite3:
                         os.path.abspath("Roche/paired.sff")],
                        expt_sff_files)
 
+        def test_processes(self):
+            """Check building an index using several processes."""
+            sff_files = ["Roche/E3MFGYR02_no_manifest.sff",
+                         "Roche/greek.sff",
+                         "Roche/paired.sff"]
+            d = SeqIO.index_db(":memory:", sff_files, "sff")
+            expected = sorted(d)
+            d.close()
+            d = SeqIO.index_db("temp.idx", sff_files, "sff", processes=2)
+            self.assertEqual(54, len(d))
+            self.assertEqual(expected, sorted(d))
+            self.assertEqual(395, len(d["alpha"]))
+            d._con.close()  # hack for PyPy
+            d.close()
+            filenames, flag = raw_filenames("temp.idx")
+            self.assertEqual(filenames, sff_files)
+            self.assertRaises(ValueError, SeqIO.index_db, ":memory:",
+                              sff_files, "sff", processes=0)
+
+        def test_get_many(self):
+            """Check bulk access sorted by file and offset."""
+            sff_files = ["Roche/E3MFGYR02_no_manifest.sff",
+                         "Roche/greek.sff",
+                         "Roche/paired.sff"]
+            expected = []
+            for f in sff_files:
+                expected.extend(rec.id for rec in SeqIO.parse(f, "sff"))
+            d = SeqIO.index_db(":memory:", sff_files, "sff")
+            d._max_open = 1  # hack to check handles are reused
+            wanted = expected[::-1] * 2
+            found = [(key, rec.id) for key, rec in d.get_many(wanted)]
+            self.assertEqual([(key, key) for key in expected], found)
+            d.close()
+
+        def test_add_files(self):
+            """Check adding files to an existing index."""
+            sff_files = ["Roche/E3MFGYR02_no_manifest.sff",
+                         "Roche/greek.sff",
+                         "Roche/paired.sff"]
+            d = SeqIO.index_db("temp.idx", sff_files[:1], "sff")
+            self.assertEqual(10, len(d))
+            d._con.close()  # hack for PyPy
+            d.close()
+            # Add the other two files,
+            d = SeqIO.index_db("temp.idx", sff_files, "sff", processes=2)
+            self.assertEqual(54, len(d))
+            self.assertEqual(395, len(d["alpha"]))
+            d._con.close()  # hack for PyPy
+            d.close()
+            filenames, flag = raw_filenames("temp.idx")
+            self.assertEqual(filenames, sff_files)
+            # Reload, should all be there
+            d = SeqIO.index_db("temp.idx")
+            self.assertEqual(54, len(d))
+            self.assertEqual(395, len(d["alpha"]))
+            d._con.close()  # hack for PyPy
+            d.close()
+            # Adding a file with duplicate keys should fail, leaving
+            # the existing index unchanged:
+            self.assertRaises(ValueError, SeqIO.index_db, "temp.idx",
+                              sff_files + ["Roche/greek.sff"], "sff")
+            d = SeqIO.index_db("temp.idx")
+            self.assertEqual(54, len(d))
+            d._con.close()  # hack for PyPy
+            d.close()
+            filenames, flag = raw_filenames("temp.idx")
+            self.assertEqual(filenames, sff_files)
+
+
+class Collider(str):
+    """String subclass with a poor hash, to test collision handling."""
+
+    def __hash__(self):
+        return len(self) % 3
+
 
 class IndexDictTests(unittest.TestCase):
     """Cunning unit test where methods are added at run time."""
@@ -329,6 +404,12 @@ class IndexDictTests(unittest.TestCase):
             rec_dict.close()
             del rec_dict
 
+            rec_dict = SeqIO.index(filename, format, alphabet, compact=True)
+            self.check_dict_methods(rec_dict, id_list, id_list)
+            self.assertEqual(sorted(id_list), sorted(rec_dict))
+            rec_dict.close()
+            del rec_dict
+
             if not sqlite3:
                 return
 
@@ -404,6 +485,16 @@ class IndexDictTests(unittest.TestCase):
             rec_dict.close()
             del rec_dict
 
+            rec_dict = SeqIO.index(filename, format, alphabet, add_prefix,
+                                   compact=True)
+            self.check_dict_methods(rec_dict, key_list, id_list)
+            for key in key_list:
+                self.assertEqual(rec_dict.get_raw(key),
+                                 rec_dict._proxy.get_raw(
+                                     rec_dict._offset(key)))
+            rec_dict.close()
+            del rec_dict
+
             if not sqlite3:
                 return
 
@@ -469,6 +560,15 @@ class IndexDictTests(unittest.TestCase):
             pass
         self.assertEqual(rec_dict.get(chr(0)), None)
         self.assertEqual(rec_dict.get(chr(0), chr(1)), chr(1))
+        # Check bulk access, asking for each key twice
+        key_to_id = dict(zip(keys, ids))
+        found = list(rec_dict.get_many(list(keys) + list(keys)))
+        self.assertEqual(len(keys), len(found))
+        for key, rec in found:
+            self.assertEqual(key_to_id[key], rec.id)
+        self.assertEqual([], list(rec_dict.get_many([])))
+        self.assertRaises(KeyError, list,
+                          rec_dict.get_many(list(keys)[:1] + [chr(0)]))
         if hasattr(dict, "iteritems"):
             # Python 2.x
             for key, rec in rec_dict.items():
@@ -590,6 +690,34 @@ class IndexDictTests(unittest.TestCase):
         rec_dict.close()
         del rec_dict
 
+    def memory_map_check(self, filename, format, alphabet):
+        """Check indexing using a memory map."""
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', BiopythonParserWarning)
+            rec_dict = SeqIO.index(filename, format, alphabet)
+            mmap_dict = SeqIO.index(filename, format, alphabet,
+                                    memory_map=True)
+        self.assertEqual(list(rec_dict), list(mmap_dict))
+        for key in rec_dict:
+            self.assertTrue(compare_record(rec_dict[key], mmap_dict[key]))
+            raw = mmap_dict.get_raw(key)
+            if isinstance(raw, memoryview):
+                self.assertIn(format, ["fasta", "fastq", "fastq-sanger",
+                                       "fastq-solexa", "fastq-illumina",
+                                       "genbank", "gb", "embl", "imgt",
+                                       "swiss", "tab", "ace", "phd", "pir"])
+                raw = bytes(raw)
+            self.assertEqual(rec_dict.get_raw(key), raw)
+        del raw
+        rec_dict.close()
+        mmap_dict.close()
+
+    def test_memory_map_bgzf(self):
+        """Check memory map is rejected for a BGZF file"""
+        self.assertRaises(ValueError, SeqIO.index,
+                          "Quality/example.fastq.bgz", "fastq",
+                          memory_map=True)
+
     if sqlite3:
         def test_duplicates_index_db(self):
             """Index file with duplicate identifers with Bio.SeqIO.index_db()"""
@@ -600,6 +728,53 @@ class IndexDictTests(unittest.TestCase):
         """Index file with duplicate identifers with Bio.SeqIO.index()"""
         self.assertRaises(ValueError, SeqIO.index, "Fasta/dups.fasta", "fasta")
 
+    def test_duplicates_index_compact(self):
+        """Index file with duplicate identifers with Bio.SeqIO.index(compact=True)"""
+        self.assertRaises(ValueError, SeqIO.index, "Fasta/dups.fasta", "fasta",
+                          compact=True)
+
+    def test_compact_collisions(self):
+        """Check hash collisions are resolved in a compact index"""
+        # Using a key function which gives many identical hashes
+        rec_dict = SeqIO.index("GenBank/NC_005816.faa", "fasta",
+                               key_function=Collider, compact=True)
+        id_list = [rec.id for rec in SeqIO.parse("GenBank/NC_005816.faa",
+                                                 "fasta")]
+        self.assertEqual(len(id_list), len(rec_dict))
+        for id in id_list:
+            self.assertIn(Collider(id), rec_dict)
+            self.assertEqual(id, rec_dict[Collider(id)].id)
+            self.assertTrue(rec_dict.get_raw(Collider(id)).startswith(
+                _as_bytes(">" + id)))
+        self.assertNotIn(Collider("missing"), rec_dict)
+        self.assertRaises(KeyError, rec_dict.__getitem__, Collider("missing"))
+        rec_dict.close()
+        self.assertRaises(ValueError, SeqIO.index, "Fasta/dups.fasta",
+                          "fasta", key_function=Collider, compact=True)
+
+    def test_compact_sort(self):
+        """Check the hashes of a compact index are sorted with their offsets"""
+        import array
+        from Bio.File import _sort_by_hash, _array_int64, _array_uint64
+        hashes = [hash("key%i" % (i % 700)) for i in range(1000)]
+        expected = sorted(zip(hashes, range(1000)))
+        numpy = sys.modules.get("numpy")
+        for use_numpy in (True, False):
+            if not use_numpy:
+                # Makes "import numpy" fail, to test the fallback
+                sys.modules["numpy"] = None
+            try:
+                sorted_hashes, offsets = _sort_by_hash(
+                    array.array(_array_int64, hashes),
+                    array.array(_array_uint64, range(1000)), chunk_size=64)
+            finally:
+                if numpy is None:
+                    sys.modules.pop("numpy", None)
+                else:
+                    sys.modules["numpy"] = numpy
+            self.assertEqual(list(sorted_hashes), sorted(hashes))
+            self.assertEqual(sorted(zip(sorted_hashes, offsets)), expected)
+
     def test_duplicates_to_dict(self):
         """Index file with duplicate identifers with Bio.SeqIO.to_dict()"""
         handle = open("Fasta/dups.fasta", _universal_read_mode)
@@ -702,6 +877,15 @@ for filename1, format, alphabet in tests:
                 funct(filename2, format, alphabet, comp))
         del funct
 
+    def funct(fn, fmt, alpha):
+        f = lambda x: x.memory_map_check(fn, fmt, alpha)
+        f.__doc__ = "Index %s file %s with memory map" % (fmt, fn)
+        return f
+    setattr(IndexDictTests, "test_%s_%s_memory_map"
+                % (format, filename1.replace("/", "_").replace(".", "_")),
+            funct(filename1, format, alphabet))
+    del funct
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
@@ -52,12 +52,12 @@ class BgzfTests(unittest.TestCase):
         if os.path.isfile(self.temp_file):
             os.remove(self.temp_file)
 
-    def rewrite(self, compressed_input_file, output_file):
+    def rewrite(self, compressed_input_file, output_file, threads=1):
         h = gzip.open(compressed_input_file, "rb")
         data = h.read()
         h.close()
 
-        with bgzf.BgzfWriter(output_file, "wb") as h:
+        with bgzf.BgzfWriter(output_file, "wb", threads=threads) as h:
             h.write(data)
             self.assertFalse(h.seekable())
             self.assertFalse(h.isatty())
@@ -114,7 +114,7 @@ class BgzfTests(unittest.TestCase):
         self.assertEqual(len(old), len(new))
         self.assertEqual(old, new)
 
-    def check_by_line(self, old_file, new_file, old_gzip=False):
+    def check_by_line(self, old_file, new_file, old_gzip=False, threads=1):
         for mode in ["r", "rb"]:
             if old_gzip:
                 h = gzip.open(old_file, mode)
@@ -130,7 +130,8 @@ class BgzfTests(unittest.TestCase):
             h.close()
 
             for cache in [1, 10]:
-                h = bgzf.BgzfReader(new_file, mode, max_cache=cache)
+                h = bgzf.BgzfReader(new_file, mode, max_cache=cache,
+                                    threads=threads)
                 if "b" in mode:
                     new = b"".join(line for line in h)
                 else:
@@ -178,7 +179,7 @@ class BgzfTests(unittest.TestCase):
                                  "%r vs %r, mode %r" % (old[:10], new[:10], mode))
                 self.assertEqual(old, new)
 
-    def check_random(self, filename):
+    def check_random(self, filename, threads=1):
         """Check BGZF random access by reading blocks in forward & reverse order"""
         h = gzip.open(filename, "rb")
         old = h.read()
@@ -190,7 +191,7 @@ class BgzfTests(unittest.TestCase):
 
         # Forward, using explicit open/close
         new = b""
-        h = bgzf.BgzfReader(filename, "rb")
+        h = bgzf.BgzfReader(filename, "rb", threads=threads)
         self.assertTrue(h.seekable())
         self.assertFalse(h.isatty())
         self.assertEqual(h.fileno(), h._handle.fileno())
@@ -207,7 +208,7 @@ class BgzfTests(unittest.TestCase):
 
         # Reverse, using with statement
         new = b""
-        with bgzf.BgzfReader(filename, "rb") as h:
+        with bgzf.BgzfReader(filename, "rb", threads=threads) as h:
             for start, raw_len, data_start, data_len in blocks[::-1]:
                 h.seek(bgzf.make_virtual_offset(start, 0))
                 data = h.read(data_len)
@@ -219,7 +220,7 @@ class BgzfTests(unittest.TestCase):
 
         # Jump back - non-sequential seeking
         if len(blocks) >= 3:
-            h = bgzf.BgzfReader(filename, "rb", max_cache=1)
+            h = bgzf.BgzfReader(filename, "rb", max_cache=1, threads=threads)
             # Seek to a late block in the file,
             # half way into the third last block
             start, raw_len, data_start, data_len = blocks[-3]
@@ -252,7 +253,7 @@ class BgzfTests(unittest.TestCase):
                 real_offset = data_start + within_offset
                 v_offsets.append((voffset, real_offset))
         shuffle(v_offsets)
-        h = bgzf.BgzfReader(filename, "rb", max_cache=1)
+        h = bgzf.BgzfReader(filename, "rb", max_cache=1, threads=threads)
         for voffset, real_offset in v_offsets:
             h.seek(0)
             self.assertTrue(voffset >= 0 and real_offset >= 0)
@@ -291,6 +292,14 @@ class BgzfTests(unittest.TestCase):
         """Check random access to GenBank/cor6_6.gb.bgz"""
         self.check_random("GenBank/cor6_6.gb.bgz")
 
+    def test_random_bam_ex1_threads(self):
+        """Check random access to SamBam/ex1.bam using threads"""
+        self.check_random("SamBam/ex1.bam", threads=4)
+
+    def test_random_example_cor6_threads(self):
+        """Check random access to GenBank/cor6_6.gb.bgz using threads"""
+        self.check_random("GenBank/cor6_6.gb.bgz", threads=2)
+
     def test_text_wnts_xml(self):
         """Check text mode access to Blast/wnts.xml.bgz"""
         self.check_text("Blast/wnts.xml", "Blast/wnts.xml.bgz")
@@ -321,6 +330,16 @@ class BgzfTests(unittest.TestCase):
         self.check_by_line("GenBank/NC_000932.gb", "GenBank/NC_000932.gb.bgz")
         self.check_by_char("GenBank/NC_000932.gb", "GenBank/NC_000932.gb.bgz")
 
+    def test_iter_example_gb_threads(self):
+        """Check iteration over GenBank/NC_000932.gb.bgz using threads"""
+        self.check_by_line("GenBank/NC_000932.gb", "GenBank/NC_000932.gb.bgz",
+                           threads=3)
+
+    def test_bad_threads(self):
+        """Check invalid number of BGZF reader threads"""
+        self.assertRaises(ValueError, bgzf.BgzfReader,
+                          "SamBam/ex1.bam", "rb", threads=0)
+
     def test_bam_ex1(self):
         """Reproduce BGZF compression for BAM file"""
         temp_file = self.temp_file
@@ -333,6 +352,17 @@ class BgzfTests(unittest.TestCase):
         # this example BAM file has simple block usage)
         self.check_blocks("SamBam/ex1.bam", temp_file)
 
+    def test_bam_ex1_threads(self):
+        """Reproduce BGZF compression for BAM file using threads"""
+        temp_file = self.temp_file
+        self.rewrite("SamBam/ex1.bam", temp_file, threads=4)
+        self.check_blocks("SamBam/ex1.bam", temp_file)
+        with open("SamBam/ex1.bam", "rb") as h:
+            old = h.read()
+        with open(temp_file, "rb") as h:
+            new = h.read()
+        self.assertEqual(old, new)
+
     def test_iter_bam_ex1(self):
         """Check iteration over SamBam/ex1.bam"""
         self.check_by_char("SamBam/ex1.bam", "SamBam/ex1.bam", True)
@@ -361,6 +391,66 @@ class BgzfTests(unittest.TestCase):
         self.rewrite("Blast/wnts.xml.bgz", temp_file)
         self.check_blocks("Blast/wnts.xml.bgz", temp_file)
 
+    def test_write_tell_threads(self):
+        """Check offsets match when BGZF writing using threads"""
+        offsets = {}
+        for threads in [1, 3]:
+            h = bgzf.BgzfWriter(self.temp_file, "w", threads=threads)
+            offsets[threads] = [h.tell()]
+            for i in range(10):
+                h.write(("%i" % i) * (i * 20000))
+                offsets[threads].append(h.tell())
+                h.write("Magic")
+            h.flush()
+            offsets[threads].append(h.tell())
+            h.close()
+            with open(self.temp_file, "rb") as h:
+                offsets[threads].append(h.read())
+        self.assertEqual(offsets[1], offsets[3])
+
+    def test_gzi(self):
+        """Check writing, reading and using a .gzi block index"""
+        gzi_file = self.temp_file + ".gzi"
+        with open("GenBank/NC_000932.gb", "rb") as h:
+            old = h.read()
+        try:
+            for threads in [1, 2]:
+                h = bgzf.BgzfWriter(self.temp_file, "wb", threads=threads,
+                                    gzi=gzi_file)
+                h.write(old)
+                h.close()
+                with open(self.temp_file, "rb") as h:
+                    index = bgzf.make_gzi(h)
+                self.assertEqual(index[0], (0, 0))
+                self.assertEqual(index[-1][1], len(old))
+                self.assertEqual(index, bgzf.read_gzi(gzi_file))
+
+                bgzf.write_gzi(gzi_file, index[:2])
+                self.assertEqual(index[:2], bgzf.read_gzi(gzi_file))
+                bgzf.write_gzi(gzi_file, index)
+                self.assertEqual(index, bgzf.read_gzi(gzi_file))
+
+                # This will use the .gzi file
+                h = bgzf.BgzfReader(self.temp_file, "rb")
+                for offset in [0, 1, 65535, 65536, 100000, len(old) - 10, 5]:
+                    voffset = h.seek_uncompressed(offset)
+                    self.assertEqual(voffset,
+                                     bgzf.gzi_virtual_offset(index, offset))
+                    self.assertEqual(voffset, h.tell())
+                    self.assertEqual(h.read(10), old[offset:offset + 10])
+                h.close()
+
+            # This will have to scan the file
+            os.remove(gzi_file)
+            h = bgzf.BgzfReader(self.temp_file, "rb", threads=2)
+            h.seek_uncompressed(123456)
+            self.assertEqual(h.read(10), old[123456:123466])
+            self.assertRaises(ValueError, h.seek_uncompressed, -1)
+            h.close()
+        finally:
+            if os.path.isfile(gzi_file):
+                os.remove(gzi_file)
+
     def test_write_tell(self):
         """Check offset works during BGZF writing"""
         temp_file = self.temp_file
@@ -5,6 +5,7 @@
 # as part of this package.
 
 import os
+import tempfile
 import unittest
 import math
 
@@ -1911,6 +1912,98 @@ class MotifTestPWM(unittest.TestCase):
         self.assertAlmostEqual(result[5], -25.18009186, places=5)
         self.assertTrue(math.isnan(result[6]), "Expected nan, not %r" % result[6])
 
+    def test_search(self):
+        """Test PSSM search on both strands, in chunks."""
+        counts = self.m.counts
+        pwm = counts.normalize(pseudocounts=0.25)
+        pssm = pwm.log_odds()
+        rc = pssm.reverse_complement()
+        seq = Seq("CCATATAAGGTTTACCATATTAGGGCcATAtTaGGACGTNCCCTTTTTAGGAA",
+                  self.m.alphabet)
+        n = len(seq)
+        m = pssm.length
+        for threshold in (-50.0, 0.0, 3.0, 100.0):
+            expected = []
+            for position in range(n - m + 1):
+                window = seq[position:position + m]
+                score = pssm.calculate(window)
+                if score > threshold:
+                    expected.append((position, score))
+                score = rc.calculate(window)
+                if score > threshold:
+                    expected.append((position - n, score))
+            forward = [hit for hit in expected if hit[0] >= 0]
+            for chunk_size in (1, 7, 1000000):
+                self.assertEqual(
+                    expected,
+                    list(pssm.search(seq, threshold, chunk_size=chunk_size)))
+                self.assertEqual(
+                    forward,
+                    list(pssm.search(seq, threshold, False, chunk_size)))
+        self.assertEqual([], list(pssm.search(seq[:m - 1])))
+        self.assertTrue(list(pssm.search(seq, 3.0)))
+
+    def test_search_many(self):
+        """Test searching many sequences with many PSSMs at once."""
+        from Bio.motifs.matrix import search_many
+        counts = self.m.counts
+        srf = counts.normalize(pseudocounts=0.25).log_odds()
+        with open("motifs/Arnt.sites") as handle:
+            arnt = motifs.read(handle, "sites")
+        # Arnt has no pseudocounts, so some log-odds scores are -inf
+        pssms = [srf, arnt.pssm, srf.reverse_complement()]
+        seqs = [Seq("CCATATAAGGTTTACCATATTAGGGCcATAtTaGGACGTNCCCTTCACGTG",
+                    self.m.alphabet),
+                Seq("", self.m.alphabet),
+                Seq("CACGTG", self.m.alphabet),
+                self.s]
+        both = True
+        for thresholds in ([0.0, 0.0, 0.0], [-20.0, 5.0, 3.0]):
+            expected = [[list(pssm.search(seq, threshold, both))
+                         for pssm, threshold in zip(pssms, thresholds)]
+                        for seq in seqs]
+            for processes, chunk_size in ((1, 1000), (1, 5), (2, 3)):
+                results = list(search_many(pssms, seqs, thresholds,
+                                           both, processes, chunk_size))
+                self.assertEqual(len(expected), len(results))
+                for old, new in zip(expected, results):
+                    self.assertEqual([[position for position, score in hits]
+                                      for hits in old],
+                                     [[position for position, score in hits]
+                                      for hits in new])
+                    for old_hits, new_hits in zip(old, new):
+                        for old_hit, new_hit in zip(old_hits, new_hits):
+                            self.assertAlmostEqual(old_hit[1], new_hit[1],
+                                                   places=5)
+            both = not both
+        self.assertRaises(ValueError, list,
+                          search_many(pssms, seqs, [0.0, 1.0]))
+
+    def test_distribution_cache(self):
+        """Test caching PSSM score distributions."""
+        pssm = self.m.counts.normalize(pseudocounts=0.25).log_odds()
+        background = {"A": 0.3, "C": 0.2, "G": 0.2, "T": 0.3}
+        expected = pssm.distribution(background, 100)
+        self.assertAlmostEqual(expected.threshold_fpr(0.01), -4.84006, places=4)
+        h, cache = tempfile.mkstemp(prefix="motif_test_", suffix=".sqlite")
+        os.close(h)
+        try:
+            for i in range(2):
+                distribution = pssm.distribution(background, 100, cache)
+                self.assertEqual(expected.mo_density, distribution.mo_density)
+                self.assertEqual(expected.bg_density, distribution.bg_density)
+                self.assertEqual(expected.threshold_fpr(0.01),
+                                 distribution.threshold_fpr(0.01))
+            # Different background, precision, or PSSM
+            for distribution in (pssm.distribution(None, 100, cache),
+                                 pssm.distribution(background, 10, cache),
+                                 pssm.reverse_complement().distribution(
+                                     background, 100, cache)):
+                self.assertNotEqual(expected.bg_density,
+                                    distribution.bg_density)
+        finally:
+            os.remove(cache)
+
     def test_mixed_alphabets(self):
         """Test creating motif with mixed alphabets."""
         # TODO - Can we support this?
@@ -609,6 +609,174 @@ AAAABBBAAAACCCCCCCCCCCCCCAAAABBBAAAA
 """)  # noqa: W291
 
 
+class TestBandedAndLinearMemory(unittest.TestCase):
+    """Test the banded and linear memory alignment modes."""
+
+    seqA = "GAACTTCGAGTTACGGATCCAGTTACCAGTACAGGATTCAGT"
+    seqB = "GAACTCGAGTTACGGATCAAGTTTACCAGTACAGATTCAG"
+
+    def test_banded(self):
+        """Test that a wide enough band gives the same alignments."""
+        for function in (pairwise2.align.globalms, pairwise2.align.localms):
+            expected = function(self.seqA, self.seqB, 2, -1, -2, -0.5)
+            alignments = function(self.seqA, self.seqB, 2, -1, -2, -0.5,
+                                  band=3)
+            self.assertEqual(sorted(alignments), sorted(expected))
+            score = function(self.seqA, self.seqB, 2, -1, -2, -0.5,
+                             band=3, score_only=True)
+            self.assertEqual(score, expected[0][2])
+
+    def test_narrow_band(self):
+        """Test that alignments leaving the band are not found."""
+        alignments = pairwise2.align.globalms("AAAACCCC", "CCCCAAAA", 1, -1,
+                                              -1, -1, band=0)
+        self.assertEqual(len(alignments), 1)
+        self.assertEqual(alignments[0][:3], ("AAAACCCC", "CCCCAAAA", -8))
+        score = pairwise2.align.globalms("AAAACCCC", "CCCCAAAA", 1, -1,
+                                         -1, -1, band=4, score_only=True)
+        self.assertEqual(score, -4)
+
+    def test_linear_memory_score(self):
+        """Test that linear memory gives the same scores."""
+        for function in (pairwise2.align.globalms, pairwise2.align.localms):
+            expected = function(self.seqA, self.seqB, 2, -1, -2, -0.5,
+                                score_only=True)
+            score = function(self.seqA, self.seqB, 2, -1, -2, -0.5,
+                             score_only=True, linear_memory=True)
+            self.assertEqual(score, expected)
+
+    def test_linear_memory_alignment(self):
+        """Test that linear memory finds one of the best alignments."""
+        original = pairwise2._LINEAR_MEMORY_CELLS
+        # Force several levels of divide and conquer
+        pairwise2._LINEAR_MEMORY_CELLS = 20
+        try:
+            for function in (pairwise2.align.globalds,
+                             pairwise2.align.localds):
+                expected = function("VKSDLLARTQEHQRKFGWIVESK",
+                                    "VKSDLARTEHLKGW", blosum62, -10, -1)
+                for band in (None, 10):
+                    alignments = function("VKSDLLARTQEHQRKFGWIVESK",
+                                          "VKSDLARTEHLKGW", blosum62, -10,
+                                          -1, linear_memory=True, band=band)
+                    self.assertEqual(len(alignments), 1)
+                    self.assertIn(alignments[0], expected)
+        finally:
+            pairwise2._LINEAR_MEMORY_CELLS = original
+
+    def test_needs_affine_gaps(self):
+        """Test that band and linear_memory need affine gap penalties."""
+        self.assertRaises(ValueError, pairwise2.align.globalxx, "ACGT",
+                          "AGT", band=2, force_generic=True)
+        self.assertRaises(ValueError, pairwise2.align.globalxx, "ACGT",
+                          "AGT", linear_memory=True, force_generic=True)
+        self.assertRaises(ValueError, pairwise2.align.globalxx, "ACGT",
+                          "AGT", band=-1)
+
+
+class TestAlignMany(unittest.TestCase):
+    """Test aligning one sequence against many others."""
+
+    query = "GAACTTCGAGTTACGGATCC"
+    targets = ["GAACTCGAGTTACGG", "TTACGGATCCAG", "A", "",
+               "GAACTTCGAGTTACGGATCC", "CCCCCGAGTTACCCCC"]
+
+    def test_many(self):
+        """Test the results are the same as aligning each pair."""
+        for function in (pairwise2.align.globalms, pairwise2.align.localms):
+            expected = [function(self.query, target, 2, -1, -2, -0.5)
+                        for target in self.targets]
+            results = function.many(self.query, self.targets, 2, -1, -2,
+                                    -0.5)
+            self.assertEqual(list(results), expected)
+        expected = [pairwise2.align.localds(self.query, target, blosum62,
+                                            -10, -1, score_only=True)
+                    for target in self.targets]
+        results = pairwise2.align.localds.many(self.query, iter(self.targets),
+                                               blosum62, -10, -1,
+                                               score_only=True)
+        self.assertEqual(list(results), expected)
+
+    def test_many_processes(self):
+        """Test aligning in parallel keeps the order of the sequences."""
+        targets = self.targets * 5
+        expected = [pairwise2.align.globalms(self.query, target, 2, -1, -2,
+                                             -0.5, one_alignment_only=True)
+                    for target in targets]
+        results = pairwise2.align.globalms.many(self.query, targets, 2, -1,
+                                                -2, -0.5, processes=2,
+                                                chunksize=3,
+                                                one_alignment_only=True)
+        self.assertEqual(list(results), expected)
+
+    def test_many_errors(self):
+        """Test invalid arguments."""
+        self.assertRaises(TypeError, pairwise2.align.globalms.many,
+                          self.query, self.targets, 2, -1)
+        self.assertRaises(ValueError, pairwise2.align.globalxx.many,
+                          self.query, self.targets, processes=0)
+
+
+class TestScoreVectorized(unittest.TestCase):
+    """Test the score only calculation using NumPy."""
+
+    def setUp(self):
+        if pairwise2.numpy is None:
+            self.skipTest("Install NumPy if you want to use "
+                          "the vectorized score calculation.")
+        self.cells = pairwise2._VECTORIZE_CELLS
+
+    def tearDown(self):
+        pairwise2._VECTORIZE_CELLS = self.cells
+
+    def compare(self, function, *args, **keywds):
+        """Compare the scores with and without NumPy."""
+        pairwise2._VECTORIZE_CELLS = float("inf")
+        expected = function(*args, score_only=True, **keywds)
+        pairwise2._VECTORIZE_CELLS = 0
+        score = function(*args, score_only=True, **keywds)
+        self.assertEqual(score, expected)
+
+    def test_substitution_matrix(self):
+        """Test scores with a substitution matrix."""
+        seqA, seqB = "VKSDLLARTQEHQRKFGWIVESK", "ASKDVLARTEHLKGWTVESKAA"
+        for function in (pairwise2.align.globalds, pairwise2.align.localds):
+            self.compare(function, seqA, seqB, blosum62, -10, -1)
+            self.compare(function, seqA, seqB, blosum62, -10, -1,
+                         penalize_extend_when_opening=True)
+            self.compare(function, seqA[:1], seqB, blosum62, -10, -1)
+        for function in (pairwise2.align.globaldd, pairwise2.align.localdd):
+            self.compare(function, seqB, seqA, blosum62, -11, -0.5, -3, -2)
+
+    def test_end_gaps(self):
+        """Test scores with and without penalizing end gaps."""
+        seqA, seqB = "GAACTTCGAGTTACGGATCC", "TCGAGTTTACGGAT"
+        for end_gaps in ((True, True), (True, False), (False, True),
+                         (False, False)):
+            self.compare(pairwise2.align.globalms, seqA, seqB, 2, -1.5,
+                         -2, -0.3, penalize_end_gaps=end_gaps)
+            self.compare(pairwise2.align.globalms, seqB, seqA, 2, -1.5,
+                         -2, -0.3, penalize_end_gaps=end_gaps)
+        self.compare(pairwise2.align.localms, seqA, seqB, 2, -1.5, -2, -0.3)
+        self.compare(pairwise2.align.localmd, ["AA", "C", "G"], ["C", "AA"],
+                     1, -1, -2, -0.5, -1, -1, gap_char=["-"])
+
+    def test_score_type(self):
+        """Test integer scores and penalties give an integer score."""
+        seqA, seqB = "ACGTTGCA" * 10, "ACGTGCA" * 10
+        self.assertTrue(len(seqA) * len(seqB) >= self.cells)
+        for function in (pairwise2.align.globalms, pairwise2.align.localms):
+            score = function(seqA, seqB, 2, -1, -3, -1, score_only=True)
+            self.assertEqual(score, 110)
+            self.assertIsInstance(score, int)
+            score = function(seqA, seqB, 2, -1, -3.0, -1, score_only=True)
+            self.assertEqual(score, 110)
+            self.assertIsInstance(score, float)
+        score = pairwise2.align.localds(seqA, seqB, blosum62, -10, -1,
+                                        score_only=True)
+        self.assertIsInstance(score, int)
+
+
 class TestOtherFunctions(unittest.TestCase):
     """Test remaining non-tested private methods."""
 
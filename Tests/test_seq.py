@@ -821,6 +821,106 @@ class TestUnknownSeq(unittest.TestCase):
         self.assertEqual("", seq.ungap("-"))
 
 
+class TestPackedSeq(unittest.TestCase):
+    def setUp(self):
+        self.letters = "ACGTMRWSYKVHDBN-"
+        self.s = Seq.PackedSeq("GATCRYN-ACGTA", IUPAC.ambiguous_dna)
+
+    def test_construction(self):
+        self.assertEqual(self.letters, str(Seq.PackedSeq(self.letters)))
+        self.assertEqual("", str(Seq.PackedSeq("")))
+        for data in ("ACGu", "acgt", "ACGTX", "ACG1", "ACGE"):
+            with self.assertRaises(ValueError):
+                Seq.PackedSeq(data)
+        with self.assertRaises(ValueError):
+            Seq.PackedSeq("ACGT", Alphabet.generic_protein)
+        with self.assertRaises(TypeError):
+            Seq.PackedSeq(Seq.Seq("ACGT"))
+
+    def test_repr(self):
+        self.assertEqual(
+            "PackedSeq('GATCRYN-ACGTA', IUPACAmbiguousDNA())", repr(self.s))
+        self.assertEqual(
+            "PackedSeq('%s...ACG', DNAAlphabet())" % ("ACG" * 18),
+            repr(Seq.PackedSeq("ACG" * 30)))
+
+    def test_getitem_method(self):
+        data = str(self.s)
+        for i in range(-len(data), len(data)):
+            self.assertEqual(data[i], self.s[i])
+        with self.assertRaises(IndexError):
+            self.s[len(data)]
+        for start in [None] + list(range(-15, 15)):
+            for stop in [None] + list(range(-15, 15)):
+                for step in (None, 1, -1, 2, -3):
+                    index = slice(start, stop, step)
+                    self.assertEqual(data[index], str(self.s[index]))
+
+    def test_views(self):
+        data = str(self.s)
+        view = self.s[3:][::-1].complement()
+        self.assertIs(view._packed, self.s._packed)
+        expected = str(Seq.Seq(data[3:][::-1]).complement())
+        self.assertEqual(expected, str(view))
+        for i in range(len(view)):
+            self.assertEqual(expected[i], view[i])
+            self.assertEqual(expected[i:], str(view[i:]))
+            self.assertEqual(expected[:i:-1], str(view[:i:-1]))
+
+    def test_complement(self):
+        for letter in self.letters:
+            self.assertEqual(ambiguous_dna_complement.get(letter, letter),
+                             str(Seq.PackedSeq(letter).complement()))
+        self.assertEqual(str(Seq.Seq(str(self.s)).reverse_complement()),
+                         str(self.s.reverse_complement()))
+        self.assertEqual(str(self.s),
+                         str(self.s.reverse_complement().reverse_complement()))
+
+    def test_other_methods(self):
+        self.assertEqual(Seq.Seq("GATCRYN-ACGTA"), self.s)
+        self.assertEqual("GATCRYN-ACGTAAC", str(self.s + "AC"))
+        self.assertEqual("ACGATCRYN-ACGTA", str("AC" + self.s))
+        self.assertEqual(3, self.s.count("A"))
+        self.assertEqual("GATCRYNACGTA", str(self.s.ungap("-")))
+        self.assertEqual("GAUCRYN-ACGUA", str(self.s.transcribe()))
+        self.assertEqual("D", str(self.s[:3].translate()))
+
+    def test_pickle(self):
+        import pickle
+        view = self.s[2:9].reverse_complement()
+        copied = pickle.loads(pickle.dumps(view))
+        self.assertEqual(str(view), str(copied))
+        self.assertEqual(repr(view.alphabet), repr(copied.alphabet))
+        self.assertEqual(len(copied), len(copied._packed) * 2 - 1)
+
+    def test_pickle_protocols(self):
+        """Check Seq objects (which now have __slots__) still pickle."""
+        import pickle
+        for seq in (Seq.Seq("ACGT", IUPAC.unambiguous_dna),
+                    Seq.UnknownSeq(5, character="N"), self.s, self.s[1:4],
+                    Seq.Seq("ACGT").reverse_complement()):
+            for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+                copied = pickle.loads(pickle.dumps(seq, protocol))
+                # Views of a PackedSeq are pickled as a plain PackedSeq
+                if isinstance(seq, Seq.PackedSeq):
+                    self.assertIs(type(copied), Seq.PackedSeq)
+                else:
+                    self.assertIs(type(copied), type(seq))
+                self.assertEqual(str(seq), str(copied))
+                self.assertEqual(repr(seq.alphabet), repr(copied.alphabet))
+            self.assertEqual(str(seq), str(copy.deepcopy(seq)))
+        # State as pickled before Seq had __slots__
+        seq = Seq.Seq.__new__(Seq.Seq)
+        seq.__setstate__({"_data": "ACGT", "alphabet": IUPAC.protein})
+        self.assertEqual("Seq('ACGT', IUPACProtein())", repr(seq))
+
+    def test_no_dict(self):
+        """Check PackedSeq objects have no per instance dictionary."""
+        for seq in (self.s, self.s[2:], self.s.reverse_complement()):
+            self.assertFalse(hasattr(seq, "__dict__"))
+        self.assertFalse(hasattr(Seq.Seq("ACGT"), "__dict__"))
+
+
 class TestAmbiguousComplements(unittest.TestCase):
     def test_ambiguous_values(self):
         """Test that other tests do not introduce characters to our values"""
@@ -1275,6 +1375,73 @@ class TestTranslating(unittest.TestCase):
             Seq.translate(seq, table=2, cds=True)
 
 
+class TestTranslateMany(unittest.TestCase):
+    def setUp(self):
+        self.sequences = ["GTGGCCATTGTAATGGGCCGCTGAAAGGGTGCCCGATAG",
+                          "atgNNNtarCCCgcTTAGcc", "", "AT",
+                          "AUGGCCAUUGUAAUGGGCCGCUGA"]
+
+    def frame(self, sequence, frame):
+        if frame < 0:
+            if isinstance(sequence, Seq.Seq):
+                sequence = sequence.reverse_complement()
+            else:
+                sequence = Seq.reverse_complement(sequence)
+        sequence = sequence[abs(frame) - 1:]
+        return sequence[:len(sequence) - len(sequence) % 3]
+
+    def test_strings(self):
+        frames = (1, 2, 3, -1, -2, -3)
+        for keywds in ({}, {"table": 2}, {"to_stop": True},
+                       {"stop_symbol": "@"}, {"table": "Vertebrate "
+                                              "Mitochondrial"}):
+            results = list(Seq.translate_many(self.sequences, **keywds))
+            self.assertEqual(len(self.sequences), len(results))
+            for sequence, result in zip(self.sequences, results):
+                self.assertEqual(
+                    [Seq.translate(self.frame(sequence, frame), **keywds)
+                     for frame in frames], result)
+
+    def test_seq_objects(self):
+        sequences = [Seq.Seq(self.sequences[0], IUPAC.unambiguous_dna),
+                     Seq.Seq("ATG---TAG", Gapped(IUPAC.ambiguous_dna)),
+                     Seq.MutableSeq("ATGCCTAG", Alphabet.generic_dna)]
+        for result, sequence in zip(
+                Seq.translate_many(sequences, frames=[1, -1]), sequences):
+            if isinstance(sequence, Seq.MutableSeq):
+                sequence = sequence.toseq()
+            for protein, frame in zip(result, [1, -1]):
+                expected = self.frame(sequence, frame).translate()
+                self.assertIsInstance(protein, Seq.Seq)
+                self.assertEqual(str(expected), str(protein))
+                self.assertEqual(repr(expected.alphabet),
+                                 repr(protein.alphabet))
+        with self.assertRaises(ValueError):
+            list(Seq.translate_many([Seq.Seq("MKV", IUPAC.protein)]))
+
+    def test_cds(self):
+        result = next(Seq.translate_many(["GTGGCCATTGTAATGGGCCGCTGAAAGTAG"],
+                                         table=2, cds=True, frames=[1]))
+        self.assertEqual(["MAIVMGRWK"], result)
+        for sequence in ("GTGGCCTAG", "ATGCCCTAGTAG", "ATGCCCTA",
+                         "ATGCCCTAC", "ATGTA?TAG"):
+            self.assertRaises(TranslationError, Seq.translate, sequence,
+                              cds=True)
+            self.assertRaises(TranslationError, list,
+                              Seq.translate_many([sequence], cds=True,
+                                                 frames=[1]))
+
+    def test_errors(self):
+        self.assertRaises(TranslationError, list,
+                          Seq.translate_many(["ATGTA?"]))
+        self.assertRaises(ValueError, list,
+                          Seq.translate_many(["ATG"], frames=[4]))
+        self.assertRaises(ValueError, list,
+                          Seq.translate_many(["ATG"], gap="--"))
+        self.assertEqual([["M-K"]], list(Seq.translate_many(
+            ["ATG---AAA"], gap="-", frames=[1])))
+
+
 class TestStopCodons(unittest.TestCase):
     def setUp(self):
         self.misc_stops = "TAATAGTGAAGAAGG"